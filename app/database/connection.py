@@ -1,4 +1,7 @@
-from sqlalchemy import create_engine
+import os
+from contextvars import ContextVar
+from fastapi import Request
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
 from pathlib import Path
 
@@ -6,23 +9,127 @@ from pathlib import Path
 # connection.py is at: <project>/app/database/connection.py
 # So project root is parents[2]
 BASE_DIR = Path(__file__).resolve().parents[2]
-DB_PATH = BASE_DIR / "intern_sys.db"
+TENANT_DIR = Path(os.environ.get("TENANT_DIR", str(BASE_DIR / "tenants")))
+DEFAULT = "default"
+# TENANT=<name> pins this process (web, job worker or scheduler) to one
+# tenant's file instead of intern_sys.db; see app/database/tenants.py
+HOME = os.environ.get("TENANT") or DEFAULT
+DB_PATH = BASE_DIR / "intern_sys.db" if HOME == DEFAULT else TENANT_DIR / f"{HOME}.db"
 SQLALCHEMY_DATABASE_URL = f"sqlite:///{DB_PATH.as_posix()}"
+DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 
-# Connect to SQLite
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False, "timeout": 30}
+# Read-only connections: GET handlers read through their own pool, so a slow
+# dashboard never holds a connection a writer is waiting for. On SQLite that
+# is the same file opened with mode=ro; in WAL mode readers and the writer
+# don't block each other. READ_DATABASE_URL can point at a replica instead.
+READ_DATABASE_URL = os.environ.get(
+    "READ_DATABASE_URL", f"sqlite:///file:{DB_PATH.as_posix()}?mode=ro&uri=true"
 )
+READ_POOL_SIZE = int(os.environ.get("READ_POOL_SIZE", "10"))
+READ_POOL_OVERFLOW = int(os.environ.get("READ_POOL_OVERFLOW", "10"))
+READ_METHODS = ("GET", "HEAD")
+
+
+def _connect_args(url: str) -> dict:
+    return {"check_same_thread": False, "timeout": 30} if url.startswith("sqlite") else {}
+
+
+class Database:
+    """One database: its writer and read-only engines and their session factories.
+
+    Sessions carry the database name in ``session.info["database"]`` and every
+    pooled connection in ``conn.info["database"]``, so caches and event
+    channels can tell tenants apart.
+    """
+
+    def __init__(self, name: str, url: str, read_url: str, path: Path = None,
+                 read_pool_size: int = READ_POOL_SIZE, read_pool_overflow: int = READ_POOL_OVERFLOW):
+        self.name = name
+        self.path = path
+        self.engine = create_engine(url, connect_args=_connect_args(url))
+        self.read_engine = create_engine(
+            read_url,
+            connect_args=_connect_args(read_url),
+            pool_size=read_pool_size,
+            max_overflow=read_pool_overflow,
+        )
+        for e in (self.engine, self.read_engine):
+            event.listen(e, "connect", self._tag)
+        if self.engine.dialect.name == "sqlite":
+            event.listen(self.engine, "connect", _enable_foreign_keys)
+            event.listen(self.engine, "connect", _enable_wal)
+        info = {"database": name}
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine, info=info)
+        self.ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.read_engine, info=info)
+
+    @classmethod
+    def sqlite(cls, name: str, path: Path, **pool) -> "Database":
+        return cls(name, f"sqlite:///{path.as_posix()}", f"sqlite:///file:{path.as_posix()}?mode=ro&uri=true", path, **pool)
+
+    @property
+    def archive_path(self) -> Path:
+        # intern_sys.db -> intern_sys_archive.db, tenants/uni-a.db -> tenants/uni-a_archive.db
+        return self.path.with_name(f"{self.path.stem}_archive.db")
+
+    def _tag(self, dbapi_connection, connection_record):
+        connection_record.info["database"] = self.name
+
+    def dispose(self) -> None:
+        self.engine.dispose()
+        self.read_engine.dispose()
+
+
+# SQLite only honours ON DELETE rules when foreign keys are switched on,
+# and the setting is per connection
+def _enable_foreign_keys(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+# WAL lets the read-only connections read while a write is in progress; the
+# mode is stored in the database file, so only the first connection changes it.
+# auto_vacuum has to come first: it only takes hold on a brand-new file, and
+# lets the maintenance jobs hand free pages back (PRAGMA incremental_vacuum)
+def _enable_wal(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.close()
+
+
+# Connect to SQLite
+home = Database(HOME, SQLALCHEMY_DATABASE_URL, READ_DATABASE_URL, DB_PATH)
+engine = home.engine
+read_engine = home.read_engine
+
+# Session factories
+SessionLocal = home.SessionLocal
+ReadSessionLocal = home.ReadSessionLocal
+
+# The database of the request being served; TenantMiddleware sets it
+_current: ContextVar = ContextVar("database", default=None)
+
+
+def current_db() -> Database:
+    return _current.get() or home
 
-# Session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Base class for models
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
+def get_db(request: Request):
+    """Session for the request: the read-only pool for GET/HEAD, the writer for everything else."""
+    database = current_db()
+    db = database.ReadSessionLocal() if request.method in READ_METHODS else database.SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+def insert_ignoring_conflicts(model, bind):
+    """INSERT for ``model`` that can take ``.on_conflict_do_nothing()`` on this dialect."""
+    if bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model)
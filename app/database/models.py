@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Date, TIMESTAMP, Boolean, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, Date, TIMESTAMP, Boolean, Text, Index, func
 from sqlalchemy.orm import relationship
 from .connection import Base
 
@@ -10,7 +10,7 @@ class Department(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, nullable=False)
 
-    users = relationship("User", back_populates="department")
+    users = relationship("User", back_populates="department", passive_deletes=True)
 
 
 # Users
@@ -24,19 +24,20 @@ class User(Base):
     password_hash = Column(String, nullable=False)
     role = Column(String, nullable=False)  # student / mentor / admin
     phone = Column(String)
-    department_id = Column(Integer, ForeignKey("departments.id"), nullable=True)
+    department_id = Column(Integer, ForeignKey("departments.id", ondelete="SET NULL"), nullable=True)
     created_at = Column(TIMESTAMP)
     updated_at = Column(TIMESTAMP)
     status = Column(String, default="active")
     profile_photo_url = Column(String)
     cv_url = Column(String)
+    unread_notifications = Column(Integer, default=0)  # kept by triggers, see app/database/schema.py
 
     department = relationship("Department", back_populates="users")
-    applications = relationship("Application", back_populates="student", foreign_keys="Application.student_id")
-    supervised_internships = relationship("InternshipSupervision", back_populates="mentor", foreign_keys="InternshipSupervision.mentor_id")
-    tasks_assigned = relationship("Task", back_populates="assigned_by_user", foreign_keys="Task.assigned_by")
-    notifications = relationship("Notification", back_populates="user")
-    reports = relationship("Report", back_populates="student")
+    applications = relationship("Application", back_populates="student", foreign_keys="Application.student_id", passive_deletes=True)
+    supervised_internships = relationship("InternshipSupervision", back_populates="mentor", foreign_keys="InternshipSupervision.mentor_id", passive_deletes=True)
+    tasks_assigned = relationship("Task", back_populates="assigned_by_user", foreign_keys="Task.assigned_by", passive_deletes=True)
+    notifications = relationship("Notification", back_populates="user", passive_deletes=True)
+    reports = relationship("Report", back_populates="student", passive_deletes=True)
 
 
 # Internships
@@ -53,25 +54,34 @@ class Internship(Base):
     start_date = Column(Date)
     end_date = Column(Date)
     slots = Column(Integer)
+    filled_slots = Column(Integer, default=0)  # approved applications, kept by app/services/approvals.py
     status = Column(String, default="draft")  # open/closed/draft
     created_at = Column(TIMESTAMP)
 
-    applications = relationship("Application", back_populates="internship")
-    supervisions = relationship("InternshipSupervision", back_populates="internship")
-    reports = relationship("Report", back_populates="internship")
+    applications = relationship("Application", back_populates="internship", passive_deletes=True)
+    supervisions = relationship("InternshipSupervision", back_populates="internship", passive_deletes=True)
+    reports = relationship("Report", back_populates="internship", passive_deletes=True)
+
+
+# duplicate check for bulk imports (app/services/imports.py) matches case-insensitively
+Index("ix_internships_title_company", func.lower(Internship.title), func.lower(Internship.company))
 
 
 # Applications
 # ---------------------
 class Application(Base):
     __tablename__ = "applications"
+    __table_args__ = (
+        # one application per student per internship
+        Index("uq_applications_student_internship", "student_id", "internship_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    student_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    internship_id = Column(Integer, ForeignKey("internships.id"), nullable=False)
+    student_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    internship_id = Column(Integer, ForeignKey("internships.id", ondelete="CASCADE"), nullable=False)
     status = Column(String, default="pending")  # pending/approved/rejected/withdrawn
     applied_at = Column(TIMESTAMP)
-    reviewed_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    reviewed_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
     reviewed_at = Column(TIMESTAMP)
     notes = Column(Text)
     cv_url = Column(String, nullable=True)
@@ -87,9 +97,9 @@ class InternshipSupervision(Base):
     __tablename__ = "internship_supervisions"
 
     id = Column(Integer, primary_key=True, index=True)
-    mentor_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    internship_id = Column(Integer, ForeignKey("internships.id"), nullable=False)
-    student_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    mentor_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    internship_id = Column(Integer, ForeignKey("internships.id", ondelete="CASCADE"), nullable=False)
+    student_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
     scope_notes = Column(Text)
     active = Column(Boolean, default=True)
     created_at = Column(TIMESTAMP)
@@ -97,7 +107,7 @@ class InternshipSupervision(Base):
     mentor = relationship("User", back_populates="supervised_internships", foreign_keys=[mentor_id])
     internship = relationship("Internship", back_populates="supervisions")
     student = relationship("User", foreign_keys=[student_id])
-    tasks = relationship("Task", back_populates="internship_sv")
+    tasks = relationship("Task", back_populates="internship_sv", passive_deletes=True)
 
 
 # Tasks
@@ -106,9 +116,9 @@ class Task(Base):
     __tablename__ = "tasks"
 
     id = Column(Integer, primary_key=True, index=True)
-    supervision_id = Column(Integer, ForeignKey("internship_supervisions.id"), nullable=True)
-    student_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    assigned_by = Column(Integer, ForeignKey("users.id"), nullable=False)
+    supervision_id = Column(Integer, ForeignKey("internship_supervisions.id", ondelete="CASCADE"), nullable=True, index=True)
+    student_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    assigned_by = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     title = Column(String, nullable=False)
     description = Column(Text)
     feedback = Column(Text)
@@ -126,12 +136,17 @@ class Task(Base):
 # ---------------------
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        Index("ix_notifications_inbox", "user_id", "read_at", "created_at"),
+        Index("ix_notifications_user_created", "user_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     title = Column(String, nullable=False)
     body = Column(Text)
     type = Column(String)
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), nullable=True, index=True)  # deadline reminders
     read_at = Column(TIMESTAMP)
     created_at = Column(TIMESTAMP)
 
@@ -144,11 +159,82 @@ class Report(Base):
     __tablename__ = "reports"
 
     id = Column(Integer, primary_key=True, index=True)
-    student_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    internship_id = Column(Integer, ForeignKey("internships.id"), nullable=False)
+    student_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    internship_id = Column(Integer, ForeignKey("internships.id", ondelete="CASCADE"), nullable=False)
     title = Column(String, nullable=False)
     file_url = Column(String)
     issued_at = Column(TIMESTAMP)
 
     student = relationship("User", back_populates="reports")
-    internship = relationship("Internship", back_populates="reports")
\ No newline at end of file
+    internship = relationship("Internship", back_populates="reports")
+
+
+# Background Jobs
+# ---------------------
+class Job(Base):
+    __tablename__ = "jobs"
+    __table_args__ = (
+        Index("ix_jobs_claim", "status", "priority", "run_after"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)
+    payload = Column(Text)  # JSON
+    priority = Column(Integer, default=0)  # higher runs first
+    status = Column(String, default="queued")  # queued/running/done/failed
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=5)
+    run_after = Column(TIMESTAMP)
+    leased_until = Column(TIMESTAMP)
+    locked_by = Column(String)
+    last_error = Column(Text)
+    created_at = Column(TIMESTAMP)
+    finished_at = Column(TIMESTAMP)
+
+
+# Scheduler
+# ---------------------
+class SchedulerRun(Base):
+    __tablename__ = "scheduler_runs"
+    __table_args__ = (
+        Index("ix_scheduler_runs_job_started", "job", "started_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    job = Column(String, nullable=False)
+    started_at = Column(TIMESTAMP, nullable=False)
+    finished_at = Column(TIMESTAMP)
+    duration_ms = Column(Integer)
+    rows_affected = Column(Integer)
+    status = Column(String)  # ok/error
+    error = Column(Text)
+
+
+# Change Log
+# ---------------------
+class Change(Base):
+    __tablename__ = "changes"
+    __table_args__ = (
+        Index("ix_changes_entity", "entity", "entity_id", "seq"),
+        # seq values are never reused, even after compaction deletes the newest rows
+        {"sqlite_autoincrement": True},
+    )
+
+    seq = Column(Integer, primary_key=True)
+    entity = Column(String, nullable=False)  # table name
+    entity_id = Column(Integer, nullable=False)
+    op = Column(String, nullable=False)  # insert/update/delete
+    data = Column(Text)  # JSON of the row after the change; NULL for deletes
+    changed_at = Column(TIMESTAMP)
+
+
+# CV Text
+# ---------------------
+class CvText(Base):
+    __tablename__ = "cv_texts"
+
+    # text extracted from one CV file, keyed by the file's SHA-256; see app/services/cvtext.py
+    sha256 = Column(String, primary_key=True)
+    text = Column(Text)
+    error = Column(Text)  # why nothing could be extracted
+    extracted_at = Column(TIMESTAMP)
@@ -0,0 +1,441 @@
+from typing import NamedTuple, Optional
+from datetime import date, datetime
+from sqlalchemy import select, func, case, and_, or_
+from sqlalchemy.orm import Session, aliased
+from .models import (
+    Department,
+    User,
+    Internship,
+    Application,
+    InternshipSupervision,
+    Task,
+    Notification,
+)
+
+# Read models for the dashboards
+# ---------------------
+# Column-only selects that return small named tuples. Nothing here goes
+# through the ORM identity map, so rows are never hydrated into full
+# entities and Text columns are only fetched where a template shows them.
+
+Mentor = aliased(User)
+Student = aliased(User)
+Assigner = aliased(User)
+
+
+def _rows(db: Session, stmt, row_type):
+    return [row_type(*r) for r in db.execute(stmt)]
+
+
+# Shared
+# ---------------------
+class DepartmentRow(NamedTuple):
+    id: int
+    name: str
+
+
+class ProfileRow(NamedTuple):
+    id: int
+    name: str
+    email: str
+    phone: Optional[str]
+    department_id: Optional[int]
+    profile_photo_url: Optional[str]
+    cv_url: Optional[str]
+
+
+def profile_row(db: Session, user_id: int) -> Optional[ProfileRow]:
+    stmt = select(
+        User.id, User.name, User.email, User.phone,
+        User.department_id, User.profile_photo_url, User.cv_url,
+    ).where(User.id == user_id)
+    r = db.execute(stmt).first()
+    return ProfileRow(*r) if r else None
+
+
+# Admin dashboard
+# ---------------------
+class AdminSupervisionRow(NamedTuple):
+    id: int
+    mentor_id: int
+    mentor_name: Optional[str]
+    student_id: Optional[int]
+    student_name: Optional[str]
+    internship_id: int
+    internship_title: Optional[str]
+    active: Optional[bool]
+    scope_notes: Optional[str]
+
+
+def admin_supervision_rows(db: Session):
+    sv = InternshipSupervision
+    stmt = (
+        select(
+            sv.id, sv.mentor_id, Mentor.name, sv.student_id, Student.name,
+            sv.internship_id, Internship.title, sv.active, sv.scope_notes,
+        )
+        .outerjoin(Mentor, Mentor.id == sv.mentor_id)
+        .outerjoin(Student, Student.id == sv.student_id)
+        .outerjoin(Internship, Internship.id == sv.internship_id)
+        .order_by(sv.id.asc())
+    )
+    return _rows(db, stmt, AdminSupervisionRow)
+
+
+class AdminApplicationRow(NamedTuple):
+    id: int
+    student_id: int
+    student_email: Optional[str]
+    internship_id: int
+    internship_title: Optional[str]
+    status: Optional[str]
+    student_cv_url: Optional[str]
+
+
+def admin_application_rows(db: Session):
+    stmt = (
+        select(
+            Application.id, Application.student_id, Student.email,
+            Application.internship_id, Internship.title,
+            Application.status, Student.cv_url,
+        )
+        .outerjoin(Student, Student.id == Application.student_id)
+        .outerjoin(Internship, Internship.id == Application.internship_id)
+        .order_by(Application.id.asc())
+    )
+    return _rows(db, stmt, AdminApplicationRow)
+
+
+class AdminTaskRow(NamedTuple):
+    id: int
+    title: str
+    internship_sv_id: Optional[int]
+    internship_title: Optional[str]
+    student_id: int
+    student_email: Optional[str]
+    assigned_by: int
+    assigned_by_email: Optional[str]
+    due_date: Optional[date]
+    description: Optional[str]
+    status: Optional[str]
+
+
+def admin_task_rows(db: Session):
+    sv = InternshipSupervision
+    stmt = (
+        select(
+            Task.id, Task.title, Task.supervision_id, Internship.title,
+            Task.student_id, Student.email, Task.assigned_by, Assigner.email,
+            Task.due_date, Task.description, Task.status,
+        )
+        .outerjoin(sv, sv.id == Task.supervision_id)
+        .outerjoin(Internship, Internship.id == sv.internship_id)
+        .outerjoin(Student, Student.id == Task.student_id)
+        .outerjoin(Assigner, Assigner.id == Task.assigned_by)
+        .order_by(Task.created_at.desc().nullslast())
+    )
+    return _rows(db, stmt, AdminTaskRow)
+
+
+class UserRow(NamedTuple):
+    id: int
+    name: str
+    email: str
+    role: str
+    status: Optional[str]
+
+
+def user_rows(db: Session, where=None, offset: int | None = None, limit: int | None = None):
+    stmt = select(User.id, User.name, User.email, User.role, User.status)
+    if where is not None:
+        stmt = stmt.where(where)
+    stmt = stmt.order_by(User.created_at.desc().nullslast())
+    if offset:
+        stmt = stmt.offset(offset)
+    if limit:
+        stmt = stmt.limit(limit)
+    return _rows(db, stmt, UserRow)
+
+
+class InternshipListRow(NamedTuple):
+    id: int
+    title: str
+    company: str
+    start_date: Optional[date]
+    end_date: Optional[date]
+    status: Optional[str]
+
+
+def internship_list_rows(db: Session, where=None):
+    stmt = select(
+        Internship.id, Internship.title, Internship.company,
+        Internship.start_date, Internship.end_date, Internship.status,
+    )
+    if where is not None:
+        stmt = stmt.where(where)
+    stmt = stmt.order_by(Internship.created_at.desc().nullslast())
+    return _rows(db, stmt, InternshipListRow)
+
+
+# Student dashboard
+# ---------------------
+class CatalogueRow(NamedTuple):
+    id: int
+    title: str
+    company: str
+    location: Optional[str]
+    description: Optional[str]
+    requirements: Optional[str]
+    start_date: Optional[date]
+    end_date: Optional[date]
+    slots: Optional[int]
+    status: Optional[str]
+
+
+def catalogue_rows(db: Session):
+    # description / requirements are rendered on the listing cards
+    stmt = select(
+        Internship.id, Internship.title, Internship.company, Internship.location,
+        Internship.description, Internship.requirements,
+        Internship.start_date, Internship.end_date, Internship.slots, Internship.status,
+    ).order_by(Internship.created_at.desc())
+    return _rows(db, stmt, CatalogueRow)
+
+
+class StudentApplicationRow(NamedTuple):
+    internship_id: int
+    title: str
+    company: str
+    location: Optional[str]
+    applied_at: Optional[datetime]
+    status: Optional[str]
+
+
+def student_application_rows(db: Session, student_id: int):
+    stmt = (
+        select(
+            Internship.id, Internship.title, Internship.company, Internship.location,
+            Application.applied_at, Application.status,
+        )
+        .join(Internship, Application.internship_id == Internship.id)
+        .where(Application.student_id == student_id)
+        .order_by(Application.applied_at.desc())
+    )
+    return _rows(db, stmt, StudentApplicationRow)
+
+
+class StudentTaskRow(NamedTuple):
+    title: str
+    description: Optional[str]
+    due_date: Optional[date]
+    status: Optional[str]
+    student_id: int
+    assigned_by: int
+    feedback: Optional[str]
+
+
+def student_task_rows(db: Session, student_id: int):
+    stmt = (
+        select(
+            Task.title, Task.description, Task.due_date, Task.status,
+            Task.student_id, Task.assigned_by, Task.feedback,
+        )
+        .where(Task.student_id == student_id)
+        .order_by(Task.due_date.asc())
+    )
+    return _rows(db, stmt, StudentTaskRow)
+
+
+class ActiveInternshipRow(NamedTuple):
+    title: str
+    company: str
+    supervisor: Optional[str]
+    location: Optional[str]
+    start_date: Optional[date]
+    end_date: Optional[date]
+
+
+def active_internship_row(db: Session, student_id: int) -> Optional[ActiveInternshipRow]:
+    # Only when the student's application to the supervised internship is approved
+    sv = InternshipSupervision
+    stmt = (
+        select(
+            Internship.title, Internship.company, Mentor.name, Internship.location,
+            Internship.start_date, Internship.end_date,
+        )
+        .select_from(sv)
+        .join(Internship, Internship.id == sv.internship_id)
+        .join(Application, Application.internship_id == Internship.id)
+        .outerjoin(Mentor, Mentor.id == sv.mentor_id)
+        .where(
+            sv.student_id == student_id,
+            Application.student_id == student_id,
+            sv.active == True,
+            func.lower(Application.status) == "approved",
+        )
+        .limit(1)
+    )
+    r = db.execute(stmt).first()
+    return ActiveInternshipRow(*r) if r else None
+
+
+# Mentor dashboard
+# ---------------------
+def _has_feedback():
+    return func.length(func.trim(func.coalesce(Task.feedback, ""), " \t\r\n")) > 0
+
+
+def _count_if(cond):
+    return func.coalesce(func.sum(case((cond, 1), else_=0)), 0)
+
+
+class MentorStatsRow(NamedTuple):
+    total_students: int
+    total_assigned_tasks: int
+    total_fb_pv: int
+    total_fb_rq: int
+
+
+def mentor_stats_row(db: Session, mentor_id: int) -> MentorStatsRow:
+    # Headline counters in a single aggregate over the mentor's tasks
+    has_fb = _has_feedback()
+    students = (
+        select(func.count(InternshipSupervision.id))
+        .where(InternshipSupervision.mentor_id == mentor_id)
+        .scalar_subquery()
+    )
+    stmt = select(
+        students,
+        func.count(Task.id),
+        _count_if(has_fb),
+        _count_if(and_(Task.status == "completed", ~has_fb)),
+    ).where(Task.assigned_by == mentor_id)
+    return MentorStatsRow(*db.execute(stmt).one())
+
+
+class MentorSupervisionRow(NamedTuple):
+    supervision_id: int
+    student_id: Optional[int]
+    internship_id: int
+    student_name: str
+    student_email: str
+    student_department: str
+    internship_title: str
+    internship_company: str
+    internship_start: Optional[date]
+    internship_end: Optional[date]
+    active: Optional[bool]
+    task_count: int
+    tasks_completed: int
+    tasks_overdue: int
+    feedback_required: int
+
+
+def mentor_supervision_rows(db: Session, mentor_id: int):
+    sv = InternshipSupervision
+    # Per-supervision task breakdown, grouped once and joined onto the rows
+    per_sv = (
+        select(
+            Task.supervision_id.label("supervision_id"),
+            func.count(Task.id).label("task_count"),
+            _count_if(Task.status == "completed").label("tasks_completed"),
+            _count_if(Task.status == "overdue").label("tasks_overdue"),
+            _count_if(and_(Task.status == "completed", ~_has_feedback())).label("feedback_required"),
+        )
+        .where(Task.assigned_by == mentor_id)
+        .group_by(Task.supervision_id)
+        .subquery()
+    )
+    stmt = (
+        select(
+            sv.id, sv.student_id, sv.internship_id,
+            func.coalesce(Student.name, "Unassigned"),
+            func.coalesce(Student.email, "N/A"),
+            func.coalesce(Department.name, "N/A"),
+            func.coalesce(Internship.title, "N/A"),
+            func.coalesce(Internship.company, "N/A"),
+            Internship.start_date, Internship.end_date, sv.active,
+            func.coalesce(per_sv.c.task_count, 0),
+            func.coalesce(per_sv.c.tasks_completed, 0),
+            func.coalesce(per_sv.c.tasks_overdue, 0),
+            func.coalesce(per_sv.c.feedback_required, 0),
+        )
+        .outerjoin(Student, Student.id == sv.student_id)
+        .outerjoin(Department, Department.id == Student.department_id)
+        .outerjoin(Internship, Internship.id == sv.internship_id)
+        .outerjoin(per_sv, per_sv.c.supervision_id == sv.id)
+        .where(sv.mentor_id == mentor_id)
+        .order_by(sv.id.asc())
+    )
+    return _rows(db, stmt, MentorSupervisionRow)
+
+
+class MentorTaskRow(NamedTuple):
+    id: int
+    title: str
+    student_id: int
+    student_email: Optional[str]
+    internship_sv_id: Optional[int]
+    assigned_by: int
+    due_date: Optional[date]
+    status: Optional[str]
+    feedback: Optional[str]
+    rating: Optional[str]
+
+
+def mentor_task_rows(db: Session, mentor_id: int, offset: int | None = None, limit: int | None = None):
+    # description is never shown on the mentor tables, so it is not selected
+    stmt = (
+        select(
+            Task.id, Task.title, Task.student_id, Student.email, Task.supervision_id,
+            Task.assigned_by, Task.due_date, Task.status, Task.feedback, Task.rating,
+        )
+        .outerjoin(Student, Student.id == Task.student_id)
+        .where(Task.assigned_by == mentor_id)
+        .order_by(Task.id.asc())
+    )
+    if offset:
+        stmt = stmt.offset(offset)
+    if limit:
+        stmt = stmt.limit(limit)
+    return _rows(db, stmt, MentorTaskRow)
+
+
+# Notification inbox
+# ---------------------
+class NotificationRow(NamedTuple):
+    id: int
+    title: str
+    body: Optional[str]
+    type: Optional[str]
+    read_at: Optional[datetime]
+    created_at: Optional[datetime]
+
+
+def notification_rows(
+    db: Session,
+    user_id: int,
+    before: tuple | None = None,
+    limit: int = 20,
+    unread_only: bool = False,
+):
+    # Keyset pagination on (created_at, id): every page is an index range scan,
+    # however deep the inbox goes. The whole inbox walks
+    # ix_notifications_user_created, the unread view ix_notifications_inbox
+    # (read_at IS NULL pins its second column); neither needs a sort.
+    stmt = select(
+        Notification.id, Notification.title, Notification.body, Notification.type,
+        Notification.read_at, Notification.created_at,
+    ).where(Notification.user_id == user_id)
+    if unread_only:
+        stmt = stmt.where(Notification.read_at.is_(None))
+    if before is not None:
+        ts, nid = before
+        stmt = stmt.where(
+            or_(
+                Notification.created_at < ts,
+                and_(Notification.created_at == ts, Notification.id < nid),
+            )
+        )
+    stmt = stmt.order_by(Notification.created_at.desc(), Notification.id.desc()).limit(limit)
+    return _rows(db, stmt, NotificationRow)
@@ -0,0 +1,252 @@
+from sqlalchemy import text
+from sqlalchemy.schema import CreateIndex
+from .connection import Base
+from . import models  # registers every table on Base.metadata
+
+# Delete rules for older database files
+# ---------------------
+# The ON DELETE clauses in models.py only reach tables created by
+# create_all. SQLite can't ALTER a foreign key, so tables from older files
+# get an equivalent BEFORE DELETE trigger on the parent for every rule
+# their own definition is missing.
+
+
+def ensure_delete_rules(conn) -> None:
+    for table in Base.metadata.sorted_tables:
+        rows = conn.execute(text(f"PRAGMA foreign_key_list('{table.name}')")).fetchall()
+        # (from column, parent table) -> on_delete as stored in the file
+        stored = {(r[3], r[2]): (r[6] or "NO ACTION").upper() for r in rows}
+        for fk in table.foreign_keys:
+            rule = (fk.ondelete or "").upper()
+            if not rule:
+                continue
+            col = fk.parent.name
+            parent = fk.column.table.name
+            if stored.get((col, parent), rule) == rule:
+                continue
+            if rule == "CASCADE":
+                action = f"DELETE FROM {table.name} WHERE {col} = OLD.{fk.column.name};"
+            elif rule == "SET NULL":
+                action = f"UPDATE {table.name} SET {col} = NULL WHERE {col} = OLD.{fk.column.name};"
+            else:
+                continue
+            name = f"fk_{table.name}_{col}_on_delete"
+            conn.execute(text(
+                f"CREATE TRIGGER IF NOT EXISTS {name} BEFORE DELETE ON {parent} "
+                f"FOR EACH ROW BEGIN {action} END"
+            ))
+
+
+# Unread notification counters
+# ---------------------
+# users.unread_notifications follows every insert, read and delete on
+# notifications, including rows written by INSERT ... SELECT and rows removed
+# by cascades, so the badge is a single column read.
+
+_UNREAD_TRIGGERS = {
+    "notifications_unread_insert": (
+        "AFTER INSERT ON notifications WHEN NEW.read_at IS NULL",
+        "UPDATE users SET unread_notifications = COALESCE(unread_notifications, 0) + 1 WHERE id = NEW.user_id;",
+    ),
+    "notifications_unread_read": (
+        "AFTER UPDATE OF read_at ON notifications WHEN OLD.read_at IS NULL AND NEW.read_at IS NOT NULL",
+        "UPDATE users SET unread_notifications = COALESCE(unread_notifications, 0) - 1 WHERE id = NEW.user_id;",
+    ),
+    "notifications_unread_unread": (
+        "AFTER UPDATE OF read_at ON notifications WHEN OLD.read_at IS NOT NULL AND NEW.read_at IS NULL",
+        "UPDATE users SET unread_notifications = COALESCE(unread_notifications, 0) + 1 WHERE id = NEW.user_id;",
+    ),
+    "notifications_unread_delete": (
+        "AFTER DELETE ON notifications WHEN OLD.read_at IS NULL",
+        "UPDATE users SET unread_notifications = COALESCE(unread_notifications, 0) - 1 WHERE id = OLD.user_id;",
+    ),
+}
+
+
+def ensure_unread_counters(conn, backfill: bool = False) -> None:
+    for name, (when, action) in _UNREAD_TRIGGERS.items():
+        conn.execute(text(f"CREATE TRIGGER IF NOT EXISTS {name} {when} BEGIN {action} END"))
+    if backfill:
+        conn.execute(text(
+            "UPDATE users SET unread_notifications = (SELECT COUNT(*) FROM notifications n "
+            "WHERE n.user_id = users.id AND n.read_at IS NULL)"
+        ))
+
+
+# Change log
+# ---------------------
+# Every insert, update and delete on the synced tables appends a row to
+# `changes` (see app/services/changes.py). Triggers rather than session
+# events, so Core bulk statements and cascades are logged too. The row image
+# is built with json_object() over the table's current columns; if the
+# columns change, the stored trigger SQL no longer matches and is replaced.
+
+CHANGE_LOG_TABLES = {
+    # table -> columns left out of the feed; an update touching only these isn't logged
+    "users": ("password_hash", "unread_notifications"),
+    "internships": (),
+    "applications": (),
+    "internship_supervisions": (),
+    "tasks": (),
+}
+
+
+def _change_log_triggers(conn, table: str, skipped) -> dict:
+    cols = [r[1] for r in conn.execute(text(f"PRAGMA table_info('{table}')")).fetchall()]
+    cols = [c for c in cols if c not in skipped]
+    image = "json_object(" + ", ".join(f"'{c}', NEW.{c}" for c in cols) + ")"
+    changed = " OR ".join(f"OLD.{c} IS NOT NEW.{c}" for c in cols)
+    log = "INSERT INTO changes (entity, entity_id, op, data, changed_at) VALUES ('{t}', {row}.id, '{op}', {data}, CURRENT_TIMESTAMP);"
+    return {
+        f"changes_{table}_insert": (
+            f"AFTER INSERT ON {table}",
+            log.format(t=table, row="NEW", op="insert", data=image),
+        ),
+        f"changes_{table}_update": (
+            f"AFTER UPDATE ON {table} WHEN {changed}",
+            log.format(t=table, row="NEW", op="update", data=image),
+        ),
+        f"changes_{table}_delete": (
+            f"AFTER DELETE ON {table}",
+            log.format(t=table, row="OLD", op="delete", data="NULL"),
+        ),
+    }
+
+
+def ensure_change_log(conn) -> None:
+    stored = dict(conn.execute(text("SELECT name, sql FROM sqlite_master WHERE type = 'trigger'")).fetchall())
+    for table, skipped in CHANGE_LOG_TABLES.items():
+        for name, (when, action) in _change_log_triggers(conn, table, skipped).items():
+            sql = f"CREATE TRIGGER {name} {when} BEGIN {action} END"
+            if stored.get(name) == sql:
+                continue
+            conn.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+            conn.execute(text(sql))
+
+
+# CV search
+# ---------------------
+# Full-text index over each student's current CV (app/services/cvtext.py):
+# rowid is the student's user id, sha256 names the file the text came from.
+# FTS5 tables aren't declared on Base, so create_all doesn't know about them.
+
+
+def ensure_cv_search(conn) -> None:
+    conn.execute(text(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS cv_search USING fts5("
+        "sha256 UNINDEXED, body, tokenize = 'porter unicode61 remove_diacritics 2')"
+    ))
+    conn.execute(text(
+        "CREATE TRIGGER IF NOT EXISTS cv_search_user_delete AFTER DELETE ON users "
+        "BEGIN DELETE FROM cv_search WHERE rowid = OLD.id; END"
+    ))
+
+
+# Duplicate applications
+# ---------------------
+# The apply route's INSERT ... ON CONFLICT needs the unique index on
+# (student_id, internship_id); without it SQLite rejects the statement. Files
+# from before that index can hold duplicate pairs, which would stop it being
+# created, so they are collapsed first: an approved row wins, then the oldest.
+# The internships involved get filled_slots counted again.
+
+def dedupe_applications(conn) -> int:
+    """Delete duplicate (student, internship) applications unless the unique index exists; returns rows deleted."""
+    has_index = conn.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'uq_applications_student_internship'"
+    )).first() is not None
+    if has_index:
+        return 0
+    duplicates = (
+        "SELECT id FROM (SELECT id, row_number() OVER ("
+        "PARTITION BY student_id, internship_id "
+        "ORDER BY lower(coalesce(status, '')) = 'approved' DESC, id) AS n FROM applications) WHERE n > 1"
+    )
+    internships = [r[0] for r in conn.execute(text(
+        f"SELECT DISTINCT internship_id FROM applications WHERE id IN ({duplicates})"
+    ))]
+    if not internships:
+        return 0
+    deleted = conn.execute(text(f"DELETE FROM applications WHERE id IN ({duplicates})")).rowcount
+    for internship_id in internships:
+        conn.execute(text(
+            "UPDATE internships SET filled_slots = (SELECT COUNT(*) FROM applications a "
+            "WHERE a.internship_id = internships.id AND lower(a.status) = 'approved') WHERE id = :id"
+        ), {"id": internship_id})
+    return deleted
+
+
+# Migrations
+# ---------------------
+# Brings one database file up to the current schema: new tables, columns
+# added since older files were created, triggers and indexes. Safe to run
+# again; the server runs it at startup and for every tenant file it opens.
+
+
+def migrate(bind) -> None:
+    Base.metadata.create_all(bind=bind)
+    try:
+        with bind.connect() as conn:
+            # Check columns in users table
+            cols = conn.execute(text("PRAGMA table_info('users')")).fetchall()
+            col_names = {c[1] for c in cols}
+            if 'profile_photo_url' not in col_names:
+                conn.execute(text("ALTER TABLE users ADD COLUMN profile_photo_url VARCHAR"))
+            if 'cv_url' not in col_names:
+                conn.execute(text("ALTER TABLE users ADD COLUMN cv_url VARCHAR"))
+            if 'unread_notifications' not in col_names:
+                conn.execute(text("ALTER TABLE users ADD COLUMN unread_notifications INTEGER DEFAULT 0"))
+            # counters are only trusted once the triggers exist; count from scratch the first time
+            has_counters = conn.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'notifications_unread_insert'"
+            )).first() is not None
+            # Check columns in internships table
+            cols_int = conn.execute(text("PRAGMA table_info('internships')")).fetchall()
+            int_col_names = {c[1] for c in cols_int}
+            if 'requirements' not in int_col_names:
+                conn.execute(text("ALTER TABLE internships ADD COLUMN requirements TEXT"))
+            if 'filled_slots' not in int_col_names:
+                conn.execute(text("ALTER TABLE internships ADD COLUMN filled_slots INTEGER DEFAULT 0"))
+                conn.execute(text(
+                    "UPDATE internships SET filled_slots = (SELECT COUNT(*) FROM applications a "
+                    "WHERE a.internship_id = internships.id AND lower(a.status) = 'approved')"
+                ))
+            # Check columns in notifications table
+            cols_ntf = conn.execute(text("PRAGMA table_info('notifications')")).fetchall()
+            if 'task_id' not in {c[1] for c in cols_ntf}:
+                conn.execute(text(
+                    "ALTER TABLE notifications ADD COLUMN task_id INTEGER REFERENCES tasks(id) ON DELETE CASCADE"
+                ))
+            ensure_delete_rules(conn)
+            ensure_unread_counters(conn, backfill=not has_counters)
+            ensure_change_log(conn)
+            conn.commit()
+    except Exception:
+        pass
+
+    try:
+        with bind.begin() as conn:
+            ensure_cv_search(conn)
+    except Exception as e:
+        # SQLite built without FTS5: CV search is unavailable
+        print(f"[Startup] Could not create CV search index: {e}")
+
+    try:
+        with bind.begin() as conn:
+            removed = dedupe_applications(conn)
+        if removed:
+            print(f"[Startup] Removed {removed} duplicate application(s) before indexing (student, internship)")
+    except Exception as e:
+        print(f"[Startup] Could not remove duplicate applications: {e}")
+
+    # create_all skips existing tables, so add any declared indexes they are missing
+    # (after the ALTERs above, since some index the new columns)
+    for table in Base.metadata.sorted_tables:
+        for idx in table.indexes:
+            try:
+                # IF NOT EXISTS instead of checkfirst, which can't reflect expression indexes
+                with bind.begin() as conn:
+                    conn.execute(CreateIndex(idx, if_not_exists=True))
+            except Exception as e:
+                # e.g. a unique index over rows that already hold duplicates
+                print(f"[Startup] Could not create index {idx.name}: {e}")
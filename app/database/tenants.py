@@ -0,0 +1,186 @@
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Optional
+from starlette.concurrency import run_in_threadpool
+from .connection import DEFAULT, HOME, TENANT_DIR, Database, _current, home
+from .schema import migrate
+
+# Tenants
+# ---------------------
+# Each institution gets its own SQLite file, tenants/<name>.db, so one
+# tenant's writes never wait on another's lock. TenantMiddleware picks the
+# tenant for a request from the hostname or a header; get_db() and the
+# caches then work on that tenant's Database.
+#
+# TENANT_MODE=host     uni-a.ims.example.com -> tenants/uni-a.db
+#                      (TENANT_DOMAIN=ims.example.com, required; the bare
+#                      domain, www. and any other host are the default
+#                      database)
+# TENANT_MODE=header   X-Tenant: uni-a (set by the proxy in front, never
+#                      trusted from browsers directly)
+# TENANT_MODE unset    one database, as before
+#
+# A tenant exists once its file does, or when it is listed in TENANTS; a
+# listed tenant's file is created and migrated on its first request. Open
+# tenants are kept in an LRU of MAX_OPEN_TENANTS; the least recently used
+# one's pools are closed when another is opened.
+#
+# Background job workers and the scheduler go round every database in turn
+# (databases() below): the default one and each tenant file on disk. A
+# process started with TENANT=<name> serves only that tenant, so tenants can
+# be spread across processes or nodes by routing each host to the processes
+# pinned to it.
+
+TENANT_MODE = os.environ.get("TENANT_MODE", "")
+TENANT_HEADER = os.environ.get("TENANT_HEADER", "X-Tenant").lower().encode("latin-1")
+TENANT_DOMAIN = os.environ.get("TENANT_DOMAIN", "").lower().strip(".")
+TENANTS = {t.strip() for t in os.environ.get("TENANTS", "").split(",") if t.strip()}
+MAX_OPEN_TENANTS = int(os.environ.get("MAX_OPEN_TENANTS", "32"))
+TENANT_READ_POOL_SIZE = int(os.environ.get("TENANT_READ_POOL_SIZE", "4"))
+NAME_RE = re.compile(r"^[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?$")
+
+if TENANT_MODE not in ("", "host", "header"):
+    raise RuntimeError(f"TENANT_MODE must be 'host' or 'header', not {TENANT_MODE!r}")
+if TENANT_MODE == "host" and not TENANT_DOMAIN:
+    # without it there's no telling uni-a.ims.example.com from www.example.com or 10.0.0.5
+    raise RuntimeError("TENANT_MODE=host needs TENANT_DOMAIN, e.g. TENANT_DOMAIN=ims.example.com")
+
+
+class UnknownTenant(Exception):
+    pass
+
+
+class TenantRegistry:
+    def __init__(self, max_open: int = MAX_OPEN_TENANTS):
+        self.max_open = max_open
+        self._open: OrderedDict = OrderedDict()  # name -> Database
+        self._migrated: set = set()  # files already migrated by this process
+        self._opening: dict = {}  # name -> lock held while that tenant is opened and migrated
+        self._lock = threading.Lock()  # guards _open and _opening; never held across a migration
+
+    def exists(self, name: str) -> bool:
+        return bool(NAME_RE.match(name)) and (name in TENANTS or (TENANT_DIR / f"{name}.db").exists())
+
+    def cached(self, name: str) -> Optional[Database]:
+        with self._lock:
+            database = self._open.get(name)
+            if database is not None:
+                self._open.move_to_end(name)
+            return database
+
+    def get(self, name: str) -> Database:
+        """The Database for tenant ``name``, opening (and migrating) it on first use."""
+        if name == DEFAULT or name == home.name:
+            return home
+        database = self.cached(name)
+        if database is not None:
+            return database
+        if not self.exists(name):
+            raise UnknownTenant(name)
+        with self._lock:
+            opening = self._opening.setdefault(name, threading.Lock())
+        # only requests for this tenant wait while its file is migrated
+        with opening:
+            database = self.cached(name)
+            if database is not None:
+                return database
+            TENANT_DIR.mkdir(parents=True, exist_ok=True)
+            database = Database.sqlite(
+                name, TENANT_DIR / f"{name}.db",
+                read_pool_size=TENANT_READ_POOL_SIZE, read_pool_overflow=TENANT_READ_POOL_SIZE,
+            )
+            if name not in self._migrated:
+                # the writer creates the file, so the read-only pool can open it afterwards
+                migrate(database.engine)
+                self._migrated.add(name)
+            evicted = []
+            with self._lock:
+                self._open[name] = database
+                while len(self._open) > self.max_open:
+                    evicted.append(self._open.popitem(last=False)[1])
+        for old in evicted:
+            # checked-out connections are closed when their requests return them
+            old.dispose()
+        return database
+
+    def open_names(self) -> list:
+        with self._lock:
+            return list(self._open)
+
+
+registry = TenantRegistry()
+
+
+def known_names() -> list:
+    """Tenants with a database file, excluding archives and the default database."""
+    if not TENANT_DIR.exists():
+        return []
+    return sorted(p.stem for p in TENANT_DIR.glob("*.db") if NAME_RE.match(p.stem) and p.stem != home.name)
+
+
+def databases() -> list:
+    """Every database this process serves: home, plus each tenant file in multi-tenant mode."""
+    if not TENANT_MODE or HOME != DEFAULT:
+        return [home]
+    out = [home]
+    for name in known_names():
+        try:
+            out.append(registry.get(name))
+        except UnknownTenant:
+            pass
+    return out
+
+
+@contextmanager
+def bound(database: Database):
+    """Make ``database`` the current one (see connection.current_db) inside the block."""
+    token = _current.set(database)
+    try:
+        yield database
+    finally:
+        _current.reset(token)
+
+
+def tenant_from_scope(scope) -> Optional[str]:
+    """Tenant name for an ASGI request, or None for the default database."""
+    headers = dict(scope.get("headers", ()))
+    if TENANT_MODE == "header":
+        value = headers.get(TENANT_HEADER, b"").decode("latin-1").strip().lower()
+        return value or None
+    if TENANT_MODE == "host":
+        host = headers.get(b"host", b"").decode("latin-1").split(":")[0].lower().strip(".")
+        if not host.endswith("." + TENANT_DOMAIN):
+            return None  # the bare domain, an IP literal or some other name
+        name = host[: -len(TENANT_DOMAIN) - 1]
+        return None if name == "www" else name
+    return None
+
+
+class TenantMiddleware:
+    """Serves each request against its tenant's database; unknown tenants get a 404."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not TENANT_MODE:
+            await self.app(scope, receive, send)
+            return
+        name = tenant_from_scope(scope)
+        try:
+            # opening a tenant may migrate its file: keep that off the event loop
+            database = home if not name else registry.cached(name) or await run_in_threadpool(registry.get, name)
+        except UnknownTenant:
+            body = json.dumps({"detail": "Unknown tenant"}).encode("utf-8")
+            await send({
+                "type": "http.response.start", "status": 404,
+                "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode("ascii"))],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+        with bound(database):
+            await self.app(scope, receive, send)
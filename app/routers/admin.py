@@ -1,16 +1,21 @@
 from sys import intern
-from fastapi import APIRouter, Request, Depends, Form, status, Query
+from fastapi import APIRouter, Request, Depends, Form, status, Query, UploadFile, File
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import RedirectResponse
+from fastapi.responses import JSONResponse, RedirectResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import func
-from sqlalchemy.exc import OperationalError
-from sqlalchemy.orm import joinedload
+from sqlalchemy.exc import OperationalError, IntegrityError
 import time
 import hashlib
 from datetime import datetime
-from typing import Optional
-from app.database.connection import get_db, engine
+from typing import List, Optional
+from app.database.connection import get_db, current_db
+from app.database import read_models as rm
+from app.services import approvals, archive, cvtext, events, exports, files, imports, jobs, maintenance, notifications, scheduler, sessions
+from app.services.tasks import task_assigned_message
+from app.services.singleflight import flights
+from app.services.refdata import refdata, LOOKUP_LIMIT, MAX_LOOKUP_LIMIT
+from app.routers.events import done
 from app.database.models import (
     InternshipSupervision,
     User,
@@ -18,11 +23,12 @@ from app.database.models import (
     Department,
     Application,
     Task,
-    Report,
 )
 
-router = APIRouter()
+# every admin route needs an admin session
+router = APIRouter(dependencies=[Depends(sessions.require("admin"))])
 templates = Jinja2Templates(directory="app/templates")
+templates.env.globals["cv_href"] = files.cv_href
 
 @router.get("/admin_dash")
 def admin_dash(
@@ -30,6 +36,10 @@ def admin_dash(
     edit: int | None = Query(None),
     edit_internship: int | None = Query(None),
     updated: int | None = Query(None),
+    full: int | None = Query(None),
+    archived: int | None = Query(None),
+    imported: int | None = Query(None),
+    archive_q: str | None = Query(None),
     i_search_field: str | None = Query(None),
     i_q: str | None = Query(None),
     search_email: str | None = Query(None),  # legacy param support
@@ -39,74 +49,49 @@ def admin_dash(
     page_size: int = Query(10, ge=1, le=100),
     db: Session = Depends(get_db),
 ):
-    # Load and enrich supervisions without complex ORM aliasing
-    supervisions = []
-    for sv in db.query(InternshipSupervision).all():
-        mentor = db.query(User).filter(User.id == sv.mentor_id).first()
-        student = db.query(User).filter(User.id == sv.student_id).first() if sv.student_id else None
-        internship = db.query(Internship).filter(Internship.id == sv.internship_id).first()
-        supervisions.append({
-            "id": sv.id,
-            "mentor_id": sv.mentor_id,
-            "mentor_name": mentor.name if mentor else None,
-            "student_id": sv.student_id,
-            "student_name": student.name if student else None,
-            "internship_id": sv.internship_id,
-            "internship_title": internship.title if internship else None,
-            "active": sv.active,
-            "scope_notes": sv.scope_notes,
-        })
-
-        applications = (
-            db.query(Application)
-            .options(
-                joinedload(Application.student),     # load student relationship
-                joinedload(Application.internship)   # load internship relationship
-            )
-            .all()
-        )
+    # Unified search handling (supports legacy search_email)
+    # Normalize incoming
+    q_norm = (q or "").strip()
+    field_norm = (search_field or "").strip().lower()
+    if search_email and str(search_email).strip():
+        q_norm = str(search_email).strip()
+        field_norm = "email"
 
-        application_list = [
-            {
-                "id": a.id,
-                "student_id": a.student_id,
-                "student_email": a.student.email if a.student else None,           # <-- added
-                "internship_id": a.internship_id,
-                "internship_title": a.internship.title if a.internship else None,  # <-- added
-                "status": a.status,
-                "student_cv_url": a.student.cv_url if a.student else None,
-            }
-            for a in applications
-        ]
-
-        tasks = (
-            db.query(Task)
-            .options(
-                joinedload(Task.student),                          # load student relationship
-                joinedload(Task.internship_sv).joinedload(         # load supervision -> internship
-                    InternshipSupervision.internship
-                )
-            )
-            .order_by(Task.created_at.desc().nullslast())
-            .all()
-        )
+    # Constrain page_size to a friendly set
+    if page_size not in (10, 20, 50):
+        page_size = 10
 
-        task_list = [
-            {
-                "id": t.id,
-                "title": t.title,
-                "internship_sv_id": t.supervision_id,
-                "internship_title": t.internship_sv.internship.title if t.internship_sv and t.internship_sv.internship else None,  # added
-                "student_id": t.student_id,
-                "student_email": t.student.email if t.student else None,  # added
-                "assigned_by": t.assigned_by,
-                "assigned_by_email": db.query(User).filter(User.id == t.assigned_by).first().email if db.query(User).filter(User.id == t.assigned_by).first() else None,  # added
-                "due_date": t.due_date,
-                "description": t.description,
-                "status": t.status,
-            }
-            for t in tasks
-        ]
+    i_q_norm = (i_q or "").strip()
+    i_field_norm = (i_search_field or "").strip().lower()
+
+    # admins landing on the same view together share one build (see app/services/singleflight.py)
+    params = (edit, edit_internship, archive_q, i_field_norm, i_q_norm, field_norm, q_norm, page, page_size)
+    data = flights.do(
+        "admin_dash", params,
+        lambda: _admin_dash_data(db, *params),
+    )
+
+    return templates.TemplateResponse(
+        "admin_dash.html",
+        {
+            "request": request,
+            **data,
+            "search_email": search_email,
+            "updated": bool(updated),
+            "slots_full": full or 0,
+            "archived": archived,
+            "imported": imported,
+        },
+    )
+
+
+def _admin_dash_data(
+    db: Session, edit, edit_internship, archive_q, i_field_norm, i_q_norm, field_norm, q_norm, page, page_size,
+) -> dict:
+    # Column-only read models; one select per dashboard section
+    supervisions = rm.admin_supervision_rows(db)
+    application_list = rm.admin_application_rows(db)
+    task_list = rm.admin_task_rows(db)
 
     edit_supervision = None
     if edit is not None:
@@ -122,33 +107,35 @@ def admin_dash(
             }
 
     # Load departments for user creation form
-    departments = db.query(Department).order_by(Department.name.asc()).all()
+    departments = refdata.departments()
     # Load users for users table
-    users = db.query(User).order_by(User.created_at.desc().nullslast()).all()
+    users = rm.user_rows(db)
     # Load internships for postings table with optional search
-    internships_query = db.query(Internship)
-    i_q_norm = (i_q or "").strip()
-    i_field_norm = (i_search_field or "").strip().lower()
+    internship_filter = None
     if i_q_norm:
         like = f"%{i_q_norm}%"
         if i_field_norm == "title":
-            internships_query = internships_query.filter(Internship.title.like(like))
+            internship_filter = Internship.title.like(like)
         elif i_field_norm == "company":
-            internships_query = internships_query.filter(Internship.company.like(like))
+            internship_filter = Internship.company.like(like)
         elif i_field_norm == "status":
-            internships_query = internships_query.filter(Internship.status.like(like))
+            internship_filter = Internship.status.like(like)
         else:
-            internships_query = internships_query.filter(
+            internship_filter = (
                 (Internship.title.like(like)) | (Internship.company.like(like)) | (Internship.status.like(like))
             )
-    internships = internships_query.order_by(Internship.created_at.desc().nullslast()).all()
-    applications = db.query(Application).order_by(Application.applied_at.desc().nullslast()).all()
-    tt_students = db.query(User).filter(User.role == "student").count()
-    tt_mentors = db.query(User).filter(User.role == "mentor").count()
+    internships = rm.internship_list_rows(db, internship_filter)
+    tt_students = len(refdata.users("student"))
+    tt_mentors = len(refdata.users("mentor"))
     tt_active_interns = db.query(InternshipSupervision).count()
     tt_pending_appli = db.query(Application).filter(func.lower(Application.status) == "pending").count()
 
 
+    # The archive file is only opened when an admin searches it
+    archive_results = None
+    if archive_q is not None:
+        archive_results = archive.search_archived_internships(archive_q)
+
     # Prefill data for Update Internship form if requested
     edit_intern_ctx = None
     if edit_internship is not None:
@@ -167,89 +154,125 @@ def admin_dash(
                 "requirements": getattr(i, "requirements", None),
             }
 
-    # Unified search handling (supports legacy search_email)
-    # Normalize incoming
-    q_norm = (q or "").strip()
-    field_norm = (search_field or "").strip().lower()
-    if search_email and str(search_email).strip():
-        q_norm = str(search_email).strip()
-        field_norm = "email"
-
-    # Constrain page_size to a friendly set
-    if page_size not in (10, 20, 50):
-        page_size = 10
-
     search_results = None
     search_total = None
     highlight_user_id: int | None = None
     effective_search = bool(q_norm)
     if effective_search:
         q_lower = q_norm.lower()
-        query = db.query(User)
         if field_norm == "name":
-            query = query.filter(func.lower(User.name).like(f"%{q_lower}%"))
+            user_filter = func.lower(User.name).like(f"%{q_lower}%")
         elif field_norm == "role":
             # exact role match among known roles
             if q_lower in ("student", "mentor", "admin"):
-                query = query.filter(func.lower(User.role) == q_lower)
+                user_filter = func.lower(User.role) == q_lower
             else:
                 # if role doesn't match allowed values, no results
-                query = query.filter(func.lower(User.role) == "__no_match__")
+                user_filter = func.lower(User.role) == "__no_match__"
         else:
             # default email partial match (case-insensitive)
-            query = query.filter(func.lower(User.email).like(f"%{q_lower}%"))
-
-        search_total = query.count()
-        matched = (
-            query.order_by(User.created_at.desc().nullslast())
-                 .offset((page - 1) * page_size)
-                 .limit(page_size)
-                 .all()
-        )
-        search_results = [
-            {"id": u.id, "name": u.name, "email": u.email, "role": u.role, "status": u.status}
-            for u in matched
-        ]
+            user_filter = func.lower(User.email).like(f"%{q_lower}%")
+
+        search_total = db.query(func.count(User.id)).filter(user_filter).scalar()
+        search_results = rm.user_rows(db, user_filter, offset=(page - 1) * page_size, limit=page_size)
+
+    return {
+        "supervisions": supervisions,
+        "edit_supervision": edit_supervision,
+        "departments": departments,
+        "users": users,
+        "internships": internships,
+        "applications": application_list,
+        "tasks": task_list,
+        "edit_internship": edit_intern_ctx,
+        "search_field": field_norm or None,
+        "q": q_norm or None,
+        "page": page,
+        "page_size": page_size,
+        "search_results": search_results,
+        "search_total": search_total,
+        "highlight_user_id": highlight_user_id,
+        "archive_q": archive_q,
+        "archive_results": archive_results,
+        "i_search_field": i_field_norm or None,
+        "i_q": i_q_norm or None,
+        "tt_students": tt_students,
+        "tt_mentors": tt_mentors,
+        "tt_active_interns": tt_active_interns,
+        "tt_pending_appli": tt_pending_appli,
+    }
+
+
+# Request Coalescing Metrics
+# ----------------------------
+@router.get("/admin/metrics/singleflight")
+def singleflight_metrics():
+    """Per view: builds run, requests that joined one in flight, and micro-TTL hits."""
+    return JSONResponse(flights.snapshot())
 
-    return templates.TemplateResponse(
-        "admin_dash.html",
-        {
-            "request": request,
-            "supervisions": supervisions,
-            "edit_supervision": edit_supervision,
-            "departments": [{"id": d.id, "name": d.name} for d in departments],
-            "users": [{"id": u.id, "name": u.name, "email": u.email, "role": u.role, "status": u.status} for u in users],
-            "internships": [
-                {
-                    "id": i.id,
-                    "title": i.title,
-                    "company": i.company,
-                    "start_date": i.start_date,
-                    "end_date": i.end_date,
-                    "status": i.status,
-                }
-                for i in internships
-            ],
-            "applications": application_list,
-            "tasks": task_list,
-            "edit_internship": edit_intern_ctx,
-            "search_email": search_email,
-            "search_field": field_norm or None,
-            "q": q_norm or None,
-            "page": page,
-            "page_size": page_size,
-            "search_results": search_results,
-            "search_total": search_total,
-            "highlight_user_id": highlight_user_id,
-            "updated": bool(updated),
-            "i_search_field": i_field_norm or None,
-            "i_q": i_q_norm or None,
-            "tt_students": tt_students,
-            "tt_mentors": tt_mentors,
-            "tt_active_interns": tt_active_interns,
-            "tt_pending_appli": tt_pending_appli,
-        },
-    )
+
+# Maintenance Metrics
+# ----------------------------
+@router.get("/admin/metrics/maintenance")
+def maintenance_metrics(limit: int = Query(50, ge=1, le=500), db: Session = Depends(get_db)):
+    """Recent maintenance runs with their timings, and the backups on disk."""
+    names = sorted(scheduler.OFF_PEAK | {"wal_checkpoint"})
+    runs = scheduler.recent_runs(db, limit=limit, jobs=names)
+    backups = maintenance.list_backups(current_db().path)
+    return JSONResponse({
+        "window": scheduler.MAINTENANCE_WINDOW,
+        "runs": [
+            {
+                "job": r.job,
+                "started_at": r.started_at.isoformat(sep=" ", timespec="seconds"),
+                "duration_ms": r.duration_ms,
+                "rows_affected": r.rows_affected,
+                "status": r.status,
+            }
+            for r in runs
+        ],
+        "backups": [
+            {"file": b.name, "bytes": b.stat().st_size, "modified": datetime.fromtimestamp(b.stat().st_mtime).isoformat(sep=" ", timespec="seconds")}
+            for b in backups
+        ],
+    })
+
+
+# User Lookup (typeahead)
+# ----------------------------
+@router.get("/admin/lookup/users")
+def lookup_users(
+    q: str = Query(""),
+    role: Optional[str] = Query(None),
+    limit: int = Query(LOOKUP_LIMIT, ge=1, le=MAX_LOOKUP_LIMIT),
+):
+    """Mentor and student pickers: answered from the reference-data cache, no query."""
+    role_norm = (role or "").strip().lower() or None
+    return JSONResponse([p._asdict() for p in refdata.lookup_users(q, role_norm, limit)])
+
+
+# CV Search
+# ----------------------------
+@router.get("/admin/applications/search")
+def search_applicants(
+    q: str = Query(""),
+    internship_id: Optional[int] = Query(None),
+    limit: int = Query(cvtext.SEARCH_LIMIT, ge=1, le=cvtext.MAX_SEARCH_LIMIT),
+    db: Session = Depends(get_db),
+):
+    """Applicants whose CV text matches ``q`` (every word, as a prefix), best match first."""
+    hits = cvtext.search(db, q, limit, internship_id)
+    return JSONResponse([
+        {**h._asdict(), "cv_url": files.cv_href(h.student_id, h.cv_url)} for h in hits
+    ])
+
+
+@router.post("/admin/applications/search/reindex")
+def reindex_cvs(db: Session = Depends(get_db)):
+    # every student's CV, parsing only files whose text isn't cached yet
+    jobs.enqueue(db, "index_cvs")
+    db.commit()
+    return RedirectResponse(url="/admin_dash#section-approvals", status_code=status.HTTP_303_SEE_OTHER)
 
 
 # Approve Application
@@ -260,17 +283,13 @@ def approve_application(
     application_id: int = Form(...),
     db: Session = Depends(get_db),
 ):
-    app = (
-        db.query(Application)
-        .filter(Application.id == application_id)
-        .first()
-    )
-    if app and (app.status or '').lower() == 'pending':
-        app.status = 'approved'
-        db.commit()
+    reviewer = sessions.current_principal(request)
+    result = approvals.approve_applications(db, [application_id], reviewer_id=reviewer.id)
 
-    target = f"/admin_dash#section-approvals"
-    return RedirectResponse(url=target, status_code=status.HTTP_303_SEE_OTHER)
+    target = "/admin_dash#section-approvals"
+    if result["full"]:
+        target = f"/admin_dash?full={len(result['full'])}#section-approvals"
+    return done(request, target, **result)
 
 
 # Reject Application
@@ -281,17 +300,120 @@ def reject_application(
     application_id: int = Form(...),
     db: Session = Depends(get_db),
 ):
-    app = (
-        db.query(Application)
-        .filter(Application.id == application_id)
-        .first()
-    )
-    if app and (app.status or '').lower() == 'pending':
-        app.status = 'rejected'
-        db.commit()
+    reviewer = sessions.current_principal(request)
+    result = approvals.reject_applications(db, [application_id], reviewer_id=reviewer.id)
 
     target = f"/admin_dash#section-approvals"
-    return RedirectResponse(url=target, status_code=status.HTTP_303_SEE_OTHER)
+    return done(request, target, **result)
+
+
+# Bulk Export
+# ----------------------------
+@router.get("/admin/export")
+def admin_export(
+    entity: str = Query("applications"),
+    format: str = Query("csv"),
+    since: Optional[str] = Query(None),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    role: Optional[str] = Query(None),
+    internship_id: Optional[int] = Query(None),
+    mentor_id: Optional[int] = Query(None),
+):
+    entity = (entity or "").strip().lower()
+    fmt = (format or "").strip().lower()
+    if entity not in exports.EXPORTS or fmt not in exports.FORMATS:
+        return RedirectResponse(url="/admin_dash#section-reports", status_code=status.HTTP_303_SEE_OTHER)
+    try:
+        since_dt = datetime.fromisoformat(since.strip()) if since and since.strip() else None
+    except ValueError:
+        since_dt = None
+
+    filters = {
+        "since": since_dt,
+        "status": (status_filter or "").strip() or None,
+        "role": (role or "").strip() or None,
+        "internship_id": internship_id,
+        "mentor_id": mentor_id,
+    }
+    filename = f"{entity}-{datetime.utcnow():%Y%m%d-%H%M%S}.{fmt}"
+    return StreamingResponse(
+        exports.export(entity, fmt, filters),
+        media_type=exports.FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+# CV Bundle
+# ----------------------------
+@router.get("/admin/applications/cvs")
+def admin_cv_bundle(
+    internship_id: Optional[int] = Query(None),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    application_ids: List[int] = Query([]),
+    db: Session = Depends(get_db),
+):
+    """One ZIP with the CVs of an internship's applicants, or of the selected applications."""
+    if not internship_id and not application_ids:
+        return RedirectResponse(url="/admin_dash#section-approvals", status_code=status.HTTP_303_SEE_OTHER)
+    entries = files.bundle_entries(db, internship_id, (status_filter or "").strip() or None, application_ids)
+    name = f"internship-{internship_id}" if internship_id else "applications"
+    filename = f"cvs-{name}-{datetime.utcnow():%Y%m%d-%H%M%S}.zip"
+    return StreamingResponse(
+        files.stream_bundle(entries),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+# Bulk Import
+# ----------------------------
+@router.post("/admin/import")
+def admin_import(
+    entity: str = Form("users"),
+    file: UploadFile = File(...),
+    default_password: Optional[str] = Form(None),
+):
+    entity = (entity or "").strip().lower()
+    if entity == "users":
+        result = imports.import_users(file.file, default_password=(default_password or "").strip() or None)
+    elif entity == "internships":
+        result = imports.import_internships(file.file)
+    else:
+        return RedirectResponse(url="/admin_dash#section-reports", status_code=status.HTTP_303_SEE_OTHER)
+
+    counts = {"X-Import-Created": str(result.created), "X-Import-Rejected": str(result.rejected)}
+    if result.rejected:
+        # hand back the rejected lines so they can be fixed and uploaded again
+        filename = f"{entity}-import-errors-{datetime.utcnow():%Y%m%d-%H%M%S}.csv"
+        return StreamingResponse(
+            result.report_csv(),
+            media_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="{filename}"', **counts},
+        )
+    return RedirectResponse(url=f"/admin_dash?imported={result.created}#section-reports", status_code=status.HTTP_303_SEE_OTHER)
+
+
+# Bulk Approve / Reject Applications
+# ----------------------------
+@router.post("/admin/applications/bulk")
+def bulk_review_applications(
+    request: Request,
+    action: str = Form(...),
+    application_ids: List[int] = Form([]),
+    db: Session = Depends(get_db),
+):
+    target = "/admin_dash#section-approvals"
+    action_norm = (action or "").strip().lower()
+    reviewer = sessions.current_principal(request)
+    result = {}
+    if action_norm == "approve":
+        result = approvals.approve_applications(db, application_ids, reviewer_id=reviewer.id)
+        if result["full"]:
+            target = f"/admin_dash?full={len(result['full'])}#section-approvals"
+    elif action_norm == "reject":
+        result = approvals.reject_applications(db, application_ids, reviewer_id=reviewer.id)
+
+    return done(request, target, **result)
 
 
 # Create Task Assignment
@@ -318,7 +440,12 @@ def create_task(
     )
 
     db.add(ct)
-    db.commit()
+    notifications.notify(db, [task_assigned_message(student_id, title, deadline)])
+    try:
+        db.commit()
+    except IntegrityError:
+        # foreign keys are enforced: unknown mentor, student or supervision id
+        db.rollback()
 
     return RedirectResponse(url="/admin_dash#section-assign", status_code=status.HTTP_303_SEE_OTHER)
 
@@ -337,11 +464,13 @@ def admin_task_delete(
         .first()
     )
     if tasks:
+        for user_id in {tasks.student_id, tasks.assigned_by}:
+            events.publish_after_commit(db, events.user_channel(user_id), "task", id=tasks.id, action="deleted")
         db.delete(tasks)
         db.commit()
 
     target = f"/admin_dash#section-assign"
-    return RedirectResponse(url=target, status_code=status.HTTP_303_SEE_OTHER)
+    return done(request, target, task_id=task_id)
 
 
 # Delete Internship
@@ -352,61 +481,12 @@ def admin_delete_internship(
     internship_id: int = Form(...),
     db: Session = Depends(get_db),
 ):
-    # Fetch the internship
-    intern = db.query(Internship).filter(Internship.id == internship_id).first()
-    if not intern:
-        return RedirectResponse(url="/admin_dash#section-internships", status_code=status.HTTP_303_SEE_OTHER)
-
-    try:
-        # 1️ Delete related supervisions
-        supervisions = db.query(InternshipSupervision).filter(
-            InternshipSupervision.internship_id == internship_id
-        ).all()
-        supervision_ids = [s.id for s in supervisions]
-
-        # 2️ Delete tasks linked to these supervisions
-        tasks = db.query(Task).filter(Task.supervision_id.in_(supervision_ids)).all()
-        task_ids = [t.id for t in tasks]
-
-        if task_ids:
-            # Delete feedback for task submissions
-            sub_ids = [sid for (sid,) in db.query(TaskSubmission.id).filter(TaskSubmission.task_id.in_(task_ids)).all()]
-            if sub_ids:
-                db.query(Feedback).filter(Feedback.task_submission_id.in_(sub_ids)).delete(synchronize_session=False)
-                db.query(TaskSubmission).filter(TaskSubmission.id.in_(sub_ids)).delete(synchronize_session=False)
-
-            # Delete tasks
-            db.query(Task).filter(Task.id.in_(task_ids)).delete(synchronize_session=False)
-
-        # 3️ Delete reports tied to the internship
-        db.query(Report).filter(Report.internship_id == internship_id).delete(synchronize_session=False)
-
-        # 4️ Delete applications for this internship
-        db.query(Application).filter(Application.internship_id == internship_id).delete(synchronize_session=False)
-
-        # 5️ Delete supervisions
-        db.query(InternshipSupervision).filter(InternshipSupervision.internship_id == internship_id).delete(synchronize_session=False)
-
-        # 6️ Finally delete the internship itself
-        db.delete(intern)
-
-        # Commit with retry (optional)
-        for attempt in range(5):
-            try:
-                db.commit()
-                break
-            except OperationalError:
-                db.rollback()
-                time.sleep(0.2 * (attempt + 1))
-        else:
-            raise
-
-    except Exception as e:
-        db.rollback()
-        print("Failed to delete internship:", e)  # log exception
+    # Runs in the job queue: one DELETE, applications, supervisions, tasks and reports cascade
+    jobs.enqueue(db, "delete_internship", {"internship_id": internship_id}, priority=10)
+    db.commit()
 
-    # Redirect back to admin dashboard
-    return RedirectResponse(url="/admin_dash#section-internships", status_code=status.HTTP_303_SEE_OTHER)
+    # Redirect back to admin dashboard; live pages drop the row when the job's event arrives
+    return done(request, "/admin_dash#section-internships", queued=True)
 
 
 @router.post("/admin/internships/update")
@@ -501,7 +581,7 @@ def admin_update_internship(
         try:
             db.commit()
             try:
-                print(f"[Update] Internship {iid} saved to DB: {engine.url.database}")
+                print(f"[Update] Internship {iid} saved to DB: {current_db().engine.url.database}")
             except Exception:
                 pass
             break
@@ -513,44 +593,24 @@ def admin_update_internship(
 
     return RedirectResponse(url=f"/admin_dash?edit_internship={iid}&updated=1#section-internships", status_code=status.HTTP_303_SEE_OTHER)
 
+
+# Archive Finished Internships
+# ----------------------------
+@router.post("/admin/archive/run")
+def admin_archive_run(
+    request: Request,
+    cutoff: str = Form(""),
+    db: Session = Depends(get_db),
+):
     try:
-        # Collect related tasks for cascading deletions
-        task_ids = [t.id for t in db.query(Task).filter(Task.internship_id == internship_id).all()]
-
-        if task_ids:
-            # Delete feedback linked to task submissions for these tasks
-            sub_ids = [sid for (sid,) in db.query(TaskSubmission.id).filter(TaskSubmission.task_id.in_(task_ids)).all()]
-            if sub_ids:
-                db.query(Feedback).filter(Feedback.task_submission_id.in_(sub_ids)).delete(synchronize_session=False)
-                db.query(TaskSubmission).filter(TaskSubmission.id.in_(sub_ids)).delete(synchronize_session=False)
-            # Delete task assignments
-            db.query(TaskAssignment).filter(TaskAssignment.task_id.in_(task_ids)).delete(synchronize_session=False)
-            # Delete tasks
-            db.query(Task).filter(Task.id.in_(task_ids)).delete(synchronize_session=False)
-
-        # Delete reports tied to the internship
-        db.query(Report).filter(Report.internship_id == internship_id).delete(synchronize_session=False)
-        # Delete applications for this internship
-        db.query(Application).filter(Application.internship_id == internship_id).delete(synchronize_session=False)
-        # Delete supervisions for this internship
-        db.query(InternshipSupervision).filter(InternshipSupervision.internship_id == internship_id).delete(synchronize_session=False)
-        # Finally delete the internship
-        db.delete(intern)
-
-        for attempt in range(5):
-            try:
-                db.commit()
-                break
-            except OperationalError:
-                db.rollback()
-                time.sleep(0.2 * (attempt + 1))
-        else:
-            raise
-    except Exception:
-        db.rollback()
-    
-    # Redirect back to postings table section
-    return RedirectResponse(url="/admin_dash#section-internships", status_code=status.HTTP_303_SEE_OTHER)
+        cutoff_d = datetime.strptime(cutoff.strip(), "%Y-%m-%d").date() if cutoff.strip() else None
+    except ValueError:
+        cutoff_d = None
+    # Archiving can move a lot of rows, so it runs in the job queue
+    jobs.enqueue(db, "archive_internships", {"cutoff": cutoff_d.isoformat() if cutoff_d else None})
+    db.commit()
+
+    return RedirectResponse(url="/admin_dash?archived=1#section-archive", status_code=status.HTTP_303_SEE_OTHER)
 
 
 @router.post("/admin/supervisions/create")
@@ -571,7 +631,22 @@ def create_supervision(
         scope_notes=(notes or None),
     )
     db.add(sv)
-    db.commit()
+    internship_title = db.query(Internship.title).filter(Internship.id == internship_id).scalar() or "an internship"
+    notifications.notify(db, [
+        notifications.message(
+            student_id, "Mentor assigned", f"A mentor now supervises your work on {internship_title}.",
+            type="supervision_created",
+        ),
+        notifications.message(
+            mentor_id, "New student to supervise", f"You have a new student on {internship_title}.",
+            type="supervision_created",
+        ),
+    ])
+    try:
+        db.commit()
+    except IntegrityError:
+        # foreign keys are enforced: unknown mentor, student or internship id
+        db.rollback()
 
     return RedirectResponse(url="/admin_dash#section-supervisions", status_code=status.HTTP_303_SEE_OTHER)
 
@@ -595,7 +670,10 @@ def update_supervision(
         sv.active = (active.lower() == "true")
         sv.scope_notes = (notes or None)
         db.add(sv)
-        db.commit()
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
 
     return RedirectResponse(url=f"/admin_dash#section-supervisions", status_code=status.HTTP_303_SEE_OTHER)
 
@@ -630,24 +708,9 @@ def admin_create_user(
     existing = db.query(User).filter(func.lower(User.email) == email_norm).first()
     if existing:
         # Rebuild context for admin_dash
-        supervisions = []
-        for sv in db.query(InternshipSupervision).all():
-            mentor = db.query(User).filter(User.id == sv.mentor_id).first()
-            student = db.query(User).filter(User.id == sv.student_id).first() if sv.student_id else None
-            internship = db.query(Internship).filter(Internship.id == sv.internship_id).first()
-            supervisions.append({
-                "id": sv.id,
-                "mentor_id": sv.mentor_id,
-                "mentor_name": mentor.name if mentor else None,
-                "student_id": sv.student_id,
-                "student_name": student.name if student else None,
-                "internship_id": sv.internship_id,
-                "internship_title": internship.title if internship else None,
-                "active": sv.active,
-                "scope_notes": sv.scope_notes,
-            })
-        departments = db.query(Department).order_by(Department.name.asc()).all()
-        users = db.query(User).order_by(User.created_at.desc().nullslast()).all()
+        supervisions = rm.admin_supervision_rows(db)
+        departments = refdata.departments()
+        users = rm.user_rows(db)
         return templates.TemplateResponse(
             "admin_dash.html",
             {
@@ -656,8 +719,8 @@ def admin_create_user(
                 "edit_supervision": None,
                 "add_user_error": "Email already exists.",
                 "add_user_prefill": {"name": name_norm, "email": email, "role": role, "department_id": dep_id, "department_name": (department_name or "")},
-                "departments": [{"id": d.id, "name": d.name} for d in departments],
-                "users": [{"id": u.id, "name": u.name, "email": u.email, "role": u.role, "status": u.status} for u in users],
+                "departments": departments,
+                "users": users,
             },
             status_code=status.HTTP_400_BAD_REQUEST,
         )
@@ -665,10 +728,12 @@ def admin_create_user(
     # If department_name provided, find-or-create
     dep_name_norm = (department_name or "").strip()
     if dep_name_norm:
-        existing_dep = db.query(Department).filter(func.lower(Department.name) == dep_name_norm.lower()).first()
-        if existing_dep:
-            dep_id = existing_dep.id
-        else:
+        dep_id = refdata.department_id(dep_name_norm)
+        if dep_id is None:
+            # a miss may just mean the cache hasn't seen another process's insert yet
+            existing_dep = db.query(Department).filter(func.lower(Department.name) == dep_name_norm.lower()).first()
+            dep_id = existing_dep.id if existing_dep else None
+        if dep_id is None:
             new_dep = Department(name=dep_name_norm)
             db.add(new_dep)
             # Use flush to get PK without committing the transaction to avoid locks
@@ -812,6 +877,8 @@ def admin_update_user(
             pass
 
     db.add(u)
+    # role, department and password all live in the cached principal
+    sessions.invalidate(db, u.id)
     for attempt in range(5):
         try:
             db.commit()
@@ -831,17 +898,8 @@ def admin_delete_user(
     user_id: int = Form(...),
     db: Session = Depends(get_db),
 ):
-    u = db.query(User).filter(User.id == user_id).first()
-    if u:
-        db.delete(u)
-        for attempt in range(5):
-            try:
-                db.commit()
-                break
-            except OperationalError:
-                db.rollback()
-                time.sleep(0.2 * (attempt + 1))
-        else:
-            raise
+    # Runs in the job queue: applications, supervisions, tasks, notifications and reports cascade
+    jobs.enqueue(db, "delete_user", {"user_id": user_id}, priority=10)
+    db.commit()
 
-    return RedirectResponse(url="/admin_dash#section-users", status_code=status.HTTP_303_SEE_OTHER)
+    return done(request, "/admin_dash#section-users", queued=True)
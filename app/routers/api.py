@@ -0,0 +1,265 @@
+from datetime import date, datetime
+from typing import Generic, List, Optional, TypeVar
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+from app.database.connection import get_db
+from app.database.models import Application, Internship, InternshipSupervision, Task, User
+from app.services import sessions
+
+# JSON API (v1)
+# ----------------------------
+# Read-only JSON view of the main tables for integrations and scripts. The
+# response models below are the contract: their fields are the columns a
+# resource exposes, `?fields=` selects a subset of them, and only those
+# columns are read. Rows go straight from the cursor to orjson, without an
+# ORM entity or a validation pass in between. Lists are keyset-paginated on
+# id: pass the returned `next` back as `cursor`. Callers need an admin
+# session cookie (POST /login).
+
+router = APIRouter(
+    prefix="/api/v1",
+    tags=["api"],
+    default_response_class=ORJSONResponse,
+    dependencies=[Depends(sessions.require("admin"))],
+)
+
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next: Optional[str] = None
+
+
+class UserOut(BaseModel):
+    id: Optional[int] = None
+    name: Optional[str] = None
+    email: Optional[str] = None
+    role: Optional[str] = None
+    phone: Optional[str] = None
+    department_id: Optional[int] = None
+    status: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+class InternshipOut(BaseModel):
+    id: Optional[int] = None
+    title: Optional[str] = None
+    company: Optional[str] = None
+    location: Optional[str] = None
+    description: Optional[str] = None
+    requirements: Optional[str] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    slots: Optional[int] = None
+    filled_slots: Optional[int] = None
+    status: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+
+class ApplicationOut(BaseModel):
+    id: Optional[int] = None
+    student_id: Optional[int] = None
+    internship_id: Optional[int] = None
+    status: Optional[str] = None
+    applied_at: Optional[datetime] = None
+    reviewed_by: Optional[int] = None
+    reviewed_at: Optional[datetime] = None
+    notes: Optional[str] = None
+    cv_url: Optional[str] = None
+
+
+class SupervisionOut(BaseModel):
+    id: Optional[int] = None
+    mentor_id: Optional[int] = None
+    internship_id: Optional[int] = None
+    student_id: Optional[int] = None
+    scope_notes: Optional[str] = None
+    active: Optional[bool] = None
+    created_at: Optional[datetime] = None
+
+
+class TaskOut(BaseModel):
+    id: Optional[int] = None
+    supervision_id: Optional[int] = None
+    student_id: Optional[int] = None
+    assigned_by: Optional[int] = None
+    title: Optional[str] = None
+    description: Optional[str] = None
+    feedback: Optional[str] = None
+    rating: Optional[str] = None
+    due_date: Optional[date] = None
+    status: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+
+def _columns(model, schema, fields: Optional[str]):
+    names = list(schema.model_fields)
+    if fields:
+        wanted = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = [f for f in wanted if f not in schema.model_fields]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+        names = wanted
+    if "id" not in names:
+        names = ["id"] + names  # the cursor needs it
+    return [getattr(model, n) for n in names]
+
+
+def _page(db: Session, model, schema, fields, cursor, limit, conditions) -> ORJSONResponse:
+    cols = _columns(model, schema, fields)
+    stmt = select(*cols).where(*conditions).order_by(model.id.asc()).limit(limit + 1)
+    if cursor:
+        try:
+            stmt = stmt.where(model.id > int(cursor))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Bad cursor")
+    rows = db.execute(stmt).all()
+    next_cursor = str(rows[limit - 1].id) if len(rows) > limit else None
+    keys = [c.key for c in cols]
+    items = [dict(zip(keys, r)) for r in rows[:limit]]
+    return ORJSONResponse({"items": items, "next": next_cursor})
+
+
+def _one(db: Session, model, schema, fields, item_id: int) -> ORJSONResponse:
+    cols = _columns(model, schema, fields)
+    row = db.execute(select(*cols).where(model.id == item_id)).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Not found")
+    return ORJSONResponse(dict(zip([c.key for c in cols], row)))
+
+
+def _lower_eq(col, value: Optional[str]):
+    return [func.lower(col) == value.strip().lower()] if value and value.strip() else []
+
+
+def _eq(col, value):
+    return [col == value] if value is not None else []
+
+
+# Users
+# ----------------------------
+@router.get("/users", response_model=Page[UserOut], response_model_exclude_unset=True)
+def api_users(
+    role: Optional[str] = Query(None),
+    status: Optional[str] = Query(None),
+    department_id: Optional[int] = Query(None),
+    fields: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+):
+    conditions = _lower_eq(User.role, role) + _lower_eq(User.status, status) + _eq(User.department_id, department_id)
+    return _page(db, User, UserOut, fields, cursor, limit, conditions)
+
+
+@router.get("/users/{user_id}", response_model=UserOut, response_model_exclude_unset=True)
+def api_user(user_id: int, fields: Optional[str] = Query(None), db: Session = Depends(get_db)):
+    return _one(db, User, UserOut, fields, user_id)
+
+
+# Internships
+# ----------------------------
+@router.get("/internships", response_model=Page[InternshipOut], response_model_exclude_unset=True)
+def api_internships(
+    status: Optional[str] = Query(None),
+    company: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+):
+    conditions = _lower_eq(Internship.status, status) + _lower_eq(Internship.company, company)
+    return _page(db, Internship, InternshipOut, fields, cursor, limit, conditions)
+
+
+@router.get("/internships/{internship_id}", response_model=InternshipOut, response_model_exclude_unset=True)
+def api_internship(internship_id: int, fields: Optional[str] = Query(None), db: Session = Depends(get_db)):
+    return _one(db, Internship, InternshipOut, fields, internship_id)
+
+
+# Applications
+# ----------------------------
+@router.get("/applications", response_model=Page[ApplicationOut], response_model_exclude_unset=True)
+def api_applications(
+    status: Optional[str] = Query(None),
+    student_id: Optional[int] = Query(None),
+    internship_id: Optional[int] = Query(None),
+    fields: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+):
+    conditions = (
+        _lower_eq(Application.status, status)
+        + _eq(Application.student_id, student_id)
+        + _eq(Application.internship_id, internship_id)
+    )
+    return _page(db, Application, ApplicationOut, fields, cursor, limit, conditions)
+
+
+@router.get("/applications/{application_id}", response_model=ApplicationOut, response_model_exclude_unset=True)
+def api_application(application_id: int, fields: Optional[str] = Query(None), db: Session = Depends(get_db)):
+    return _one(db, Application, ApplicationOut, fields, application_id)
+
+
+# Supervisions
+# ----------------------------
+@router.get("/supervisions", response_model=Page[SupervisionOut], response_model_exclude_unset=True)
+def api_supervisions(
+    mentor_id: Optional[int] = Query(None),
+    student_id: Optional[int] = Query(None),
+    internship_id: Optional[int] = Query(None),
+    active: Optional[bool] = Query(None),
+    fields: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+):
+    sv = InternshipSupervision
+    conditions = (
+        _eq(sv.mentor_id, mentor_id)
+        + _eq(sv.student_id, student_id)
+        + _eq(sv.internship_id, internship_id)
+        + _eq(sv.active, active)
+    )
+    return _page(db, sv, SupervisionOut, fields, cursor, limit, conditions)
+
+
+@router.get("/supervisions/{supervision_id}", response_model=SupervisionOut, response_model_exclude_unset=True)
+def api_supervision(supervision_id: int, fields: Optional[str] = Query(None), db: Session = Depends(get_db)):
+    return _one(db, InternshipSupervision, SupervisionOut, fields, supervision_id)
+
+
+# Tasks
+# ----------------------------
+@router.get("/tasks", response_model=Page[TaskOut], response_model_exclude_unset=True)
+def api_tasks(
+    status: Optional[str] = Query(None),
+    student_id: Optional[int] = Query(None),
+    mentor_id: Optional[int] = Query(None),
+    supervision_id: Optional[int] = Query(None),
+    fields: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+):
+    conditions = (
+        _lower_eq(Task.status, status)
+        + _eq(Task.student_id, student_id)
+        + _eq(Task.assigned_by, mentor_id)
+        + _eq(Task.supervision_id, supervision_id)
+    )
+    return _page(db, Task, TaskOut, fields, cursor, limit, conditions)
+
+
+@router.get("/tasks/{task_id}", response_model=TaskOut, response_model_exclude_unset=True)
+def api_task(task_id: int, fields: Optional[str] = Query(None), db: Session = Depends(get_db)):
+    return _one(db, Task, TaskOut, fields, task_id)
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, Form, HTTPException, Request, status
+from fastapi import APIRouter, Depends, Form, Request, status
 from fastapi.responses import RedirectResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from app.database.connection import get_db
-from app.database.models import User, Internship, Application
+from app.database.models import User
+from app.services import ratelimit, sessions
 import hashlib
 
 router = APIRouter()
@@ -51,12 +52,16 @@ def signup_post(
     db.add(u)
     db.commit()
     # Redirect to student dashboard so it can load full profile and context
-    return RedirectResponse(url=f"/student_dash?student_id={u.id}", status_code=status.HTTP_303_SEE_OTHER)
+    response = RedirectResponse(url="/student_dash", status_code=status.HTTP_303_SEE_OTHER)
+    if not sessions.issue(response, u.id):
+        # removed again before the session could start
+        return RedirectResponse(url="/login", status_code=status.HTTP_303_SEE_OTHER)
+    return response
 
 
 # Login
 # ---------------------
-@router.post("/login")
+@router.post("/login", dependencies=[Depends(ratelimit.limit_account("login_account"))])
 def login_post(
     request: Request,
     role: str = Form(...),
@@ -82,15 +87,29 @@ def login_post(
             status_code=status.HTTP_401_UNAUTHORIZED,
         )
 
-    # If student or mentor, redirect with ID so dashboards can prefill forms
+    # the dashboards read the caller from the session cookie
     role_l = (user.role or "").lower()
-    if role_l == "student":
-        return RedirectResponse(url=f"/student_dash?student_id={user.id}", status_code=status.HTTP_303_SEE_OTHER)
-    if role_l == "mentor":
-        return RedirectResponse(url=f"/mentor_dash?mentor_id={user.id}", status_code=status.HTTP_303_SEE_OTHER)
-
     redirect_map = {
+        "student": "/student_dash",
+        "mentor": "/mentor_dash",
         "admin": "/admin_dash",
     }
     target = redirect_map.get(role_l, "/")
-    return RedirectResponse(url=target, status_code=status.HTTP_303_SEE_OTHER)
+    response = RedirectResponse(url=target, status_code=status.HTTP_303_SEE_OTHER)
+    if not sessions.issue(response, user.id):
+        # deleted between the lookup above and now
+        return templates.TemplateResponse(
+            "login.html",
+            {"request": request, "error": "Invalid email or password.", "email": email, "role": role},
+            status_code=status.HTTP_401_UNAUTHORIZED,
+        )
+    return response
+
+
+# Logout
+# ---------------------
+@router.post("/logout")
+def logout_post():
+    response = RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+    sessions.clear(response)
+    return response
@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import Response
+from sqlalchemy.orm import Session
+from app.database.connection import get_db
+from app.services import changes, sessions
+from typing import Optional
+
+router = APIRouter(dependencies=[Depends(sessions.require("admin"))])
+
+
+# Change Feed
+# ----------------------------
+@router.get("/changes")
+def list_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(changes.PAGE_SIZE, ge=1, le=changes.MAX_PAGE_SIZE),
+    entity: Optional[str] = Query(None),
+    db: Session = Depends(get_db),
+):
+    """Changes after ``since``; pass the returned ``next`` back as ``since`` until ``more`` is false.
+
+    ``entity`` narrows the feed to a comma-separated list of tables.
+    """
+    entities = [e.strip().lower() for e in (entity or "").split(",") if e.strip()]
+    entities = [e for e in entities if e in changes.ENTITIES]
+    if entity and not entities:
+        return Response(status_code=400)
+    rows = changes.read_changes(db, since, limit + 1, entities)
+    return Response(changes.encode_page(rows, since, limit), media_type="application/json")
@@ -0,0 +1,63 @@
+import asyncio
+import json
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import JSONResponse, RedirectResponse, StreamingResponse
+from app.services import events, sessions
+from app.services.sessions import Principal
+
+router = APIRouter()
+
+KEEPALIVE_SECONDS = 15
+
+
+def is_live(request: Request) -> bool:
+    # forms marked data-live on the dashboards submit with fetch() and this header
+    return request.headers.get("x-live") == "1"
+
+
+def done(request: Request, url: str, **result):
+    """Redirect a plain form post; answer a live (fetch) post with JSON instead.
+
+    Live pages are patched by the event stream, so they don't need the
+    dashboard rebuilt after every action.
+    """
+    if is_live(request):
+        return JSONResponse({"ok": True, **result})
+    return RedirectResponse(url=url, status_code=303)
+
+
+async def _stream(request: Request, channels):
+    sub = events.hub.subscribe(*channels)
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                payload = await asyncio.wait_for(sub.queue.get(), KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ": keepalive\n\n"
+                continue
+            yield f"event: {payload.get('type', 'message')}\ndata: {json.dumps(payload, default=str)}\n\n"
+    finally:
+        events.hub.unsubscribe(sub)
+
+
+def _sse(request: Request, channels) -> StreamingResponse:
+    return StreamingResponse(
+        _stream(request, channels),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# Event Streams
+# ----------------------------
+@router.get("/events/me")
+async def user_events(request: Request, principal: Principal = Depends(sessions.require())):
+    return _sse(request, [events.user_channel(principal.id)])
+
+
+@router.get("/events/admin")
+async def admin_events(request: Request, principal: Principal = Depends(sessions.require("admin"))):
+    return _sse(request, [events.admin_channel()])
@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.orm import Session
+from app.database.connection import get_db
+from app.database.models import User
+from app.services import files, sessions
+from app.services.sessions import Principal
+
+router = APIRouter()
+
+
+# CV Downloads
+# ----------------------------
+@router.get("/files/cv/{student_id}/{filename}")
+def student_cv(
+    request: Request,
+    student_id: int,
+    filename: str,
+    principal: Principal = Depends(sessions.require("student", "mentor", "admin")),
+    db: Session = Depends(get_db),
+):
+    """A student's current CV: to the student, their mentors and admins (see files.may_view_cv)."""
+    if not files.may_view_cv(db, principal, student_id):
+        raise sessions.NotAuthenticated(forbidden=True)
+    stored = db.query(User.cv_url).filter(User.id == student_id).scalar()
+    # only the current upload: a replaced CV's link stops working
+    path = files.cv_path(student_id, stored)
+    if path is None or path.name != filename:
+        raise HTTPException(status_code=404, detail="Not found")
+    return files.serve(request, path, filename)
@@ -2,11 +2,17 @@ from fastapi import APIRouter, Request, Depends, Query, Form, UploadFile, File,
 from fastapi.templating import Jinja2Templates
 from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
-from sqlalchemy.orm import joinedload
 from app.database.connection import get_db
 from datetime import datetime
-from app.database.models import User, Department, Task, InternshipSupervision
-from typing import Optional
+from app.database.models import User, Task, InternshipSupervision
+from app.database import read_models as rm
+from app.services import notifications, tasks as task_service
+from app.routers.notifications import inbox_context
+from app.routers.events import done
+from app.services import events, sessions
+from app.services.sessions import Principal
+from app.services.refdata import refdata
+from typing import List, Optional
 import hashlib
 import os
 from uuid import uuid4
@@ -15,92 +21,49 @@ router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
 
 @router.get("/mentor_dash")
-def mentor_dash(request: Request, mentor_id: Optional[int] = Query(None), db: Session = Depends(get_db)):
+def mentor_dash(
+    request: Request,
+    task_page: int = Query(1, ge=1),
+    task_page_size: int = Query(50, ge=1, le=200),
+    bulk_created: Optional[int] = Query(None),
+    bulk_skipped: Optional[int] = Query(None),
+    notif_before: Optional[str] = Query(None),
+    notif_unread: bool = Query(False),
+    principal: Principal = Depends(sessions.require("mentor")),
+    db: Session = Depends(get_db),
+):
+    mentor_id = principal.id
     user_ctx = {"name": "Mentor"}
     departments = []
+    rows = []
+    tasks = []
+    total_students = 0
+    total_assigned_tasks = 0
+    total_fb_pv = 0
+    total_fb_rq = 0
+    inbox = {}
+
+    mentor = rm.profile_row(db, mentor_id)
+    if mentor:
+        user_ctx = mentor._asdict()
+        departments = refdata.departments()
+
+        # student, department, internship and per-supervision task counts in one select
+        rows = rm.mentor_supervision_rows(db, mentor_id)
 
-    if mentor_id is not None:
-        mentor = db.query(User).filter(User.id == mentor_id).first()
-        if mentor:
-            user_ctx = {
-                "id": mentor.id,
-                "name": mentor.name,
-                "email": mentor.email,
-                "phone": mentor.phone,
-                "department_id": mentor.department_id,
-                "profile_photo_url": mentor.profile_photo_url,
-            }
-            departments = db.query(Department).order_by(Department.name.asc()).all()
-
-            total_students = 0
-            supervisions = db.query(InternshipSupervision).filter(InternshipSupervision.mentor_id == mentor_id).all()
-            for s in supervisions:
-                total_students += 1
-
-            # load student and internship in same query
-            act_intern = (
-                db.query(InternshipSupervision)
-                .options(joinedload(InternshipSupervision.student)
-                                .joinedload(User.department),
-                        joinedload(InternshipSupervision.internship))
-                .filter(InternshipSupervision.mentor_id == mentor_id)
-                .all()
-            )
-
-            rows = []
-            for s in act_intern:
-                student = s.student
-                internship = s.internship
-
-                row = {
-                    "supervision_id": s.id,
-                    "student_name": student.name if student else "Unassigned",
-                    "student_email": student.email if student else "N/A",
-                    "student_department": (student.department.name if (student and student.department) else "N/A"),
-                    "internship_title": internship.title if internship else "N/A",
-                    "internship_company": internship.company if internship else "N/A",
-                    "internship_start": internship.start_date.isoformat() if (internship and internship.start_date) else None,
-                    "internship_end": internship.end_date.isoformat() if (internship and internship.end_date) else None,
-                    "active": s.active,
-                }
-                rows.append(row)
-
-            tasks = []
-            Tasks = (
-                db.query(Task)
-                .options(
-                    joinedload(Task.student),                                 # load student relationship
-                    joinedload(Task.internship_sv).joinedload(                # load supervision -> internship
-                        InternshipSupervision.internship
-                    )
-                )
-                .filter(Task.assigned_by == mentor_id)
-                .all()
-            )
-
-            for t in Tasks:
-                task = {
-                    "id": t.id,
-                    "title": t.title,
-                    "student_id": t.student_id,
-                    "student_email": t.student.email if t.student else None,
-                    "internship_sv_id": t.supervision_id,  
-                    "assigned_by": t.assigned_by,
-                    "due_date": t.due_date,
-                    "description": t.description,
-                    "status": t.status,
-                    "created_at": t.created_at,
-                    "feedback": t.feedback,
-                    "rating": t.rating,
-                }
-                tasks.append(task)
-
-            total_assigned_tasks = 0
-            tasks = db.query(Task).filter(Task.assigned_by == mentor_id).all()
-            total_fb_pv = sum(1 for t in tasks if t.feedback and t.feedback.strip() != "")
-            total_fb_rq = sum(1 for t in tasks if t.status == "completed" and (not t.feedback or t.feedback.strip() == ""))
-            for t in tasks:
-                total_assigned_tasks += 1 
+        # headline counters come from one aggregate query
+        stats = rm.mentor_stats_row(db, mentor_id)
+        total_students = stats.total_students
+        total_assigned_tasks = stats.total_assigned_tasks
+        total_fb_pv = stats.total_fb_pv
+        total_fb_rq = stats.total_fb_rq
+
+        # only the requested page of tasks is loaded
+        tasks = rm.mentor_task_rows(
+            db, mentor_id, offset=(task_page - 1) * task_page_size, limit=task_page_size
+        )
+
+        inbox = inbox_context(db, mentor_id, notif_before, notif_unread)
 
     return templates.TemplateResponse(
         "mentor_dash.html", 
@@ -109,22 +72,18 @@ def mentor_dash(request: Request, mentor_id: Optional[int] = Query(None), db: Se
             "user": user_ctx, 
             "departments": departments,
             "tasks": tasks,
-            "supervisions": [
-                {
-                    "id": s.id  ,
-                    "internship_id": s.internship_id,
-                    "mentor_id": s.mentor_id,
-                    "student_id": s.student_id,
-                }
-                for s in db.query(InternshipSupervision).filter(InternshipSupervision.mentor_id == mentor_id).all()
-            ] if mentor_id else [],
-            
+            "supervisions": rows,
             "mentor_id": mentor_id,  
             "total_students": total_students, 
             "total_assigned_tasks": total_assigned_tasks, 
             "total_fb_pv": total_fb_pv,
             "total_fb_rq": total_fb_rq,
             "active_internships": rows,
+            "task_page": task_page,
+            "task_page_size": task_page_size,
+            "bulk_created": bulk_created,
+            "bulk_skipped": bulk_skipped,
+            **inbox,
         },
     )
 
@@ -140,14 +99,15 @@ from datetime import datetime
 
 @router.post("/mentor/task_create")
 def mentor_task_create(
-    mentor_id: int = Form(...),
     student_id: int = Form(...),
     internship_sv_id: int = Form(...),
     title: str = Form(...),
     desc: str = Form(...),
     deadline: Optional[str] = Form(None),
+    principal: Principal = Depends(sessions.require("mentor")),
     db: Session = Depends(get_db),
 ):
+    mentor_id = principal.id
     # Ensure the supervision exists and belongs to this mentor
     supervision = db.query(InternshipSupervision).filter(
         InternshipSupervision.id == internship_sv_id,
@@ -157,7 +117,7 @@ def mentor_task_create(
 
     if not supervision:
         # not allowed — either wrong SV id, mentor mismatch, or student mismatch
-        return RedirectResponse(url=f"/mentor_dash?mentor_id={mentor_id}", status_code=303)
+        return RedirectResponse(url="/mentor_dash", status_code=303)
 
     task = Task(
         title=title.strip(),
@@ -170,9 +130,56 @@ def mentor_task_create(
         created_at=datetime.utcnow()
     )
     db.add(task)
+    db.flush()  # assigns task.id for the live event
+    notifications.notify(db, [task_service.task_assigned_message(student_id, task.title, task.due_date)])
+    task_service.publish_task_assigned(db, {
+        "id": task.id, "student_id": student_id, "title": task.title,
+        "description": task.description, "status": task.status, "due_date": task.due_date,
+    })
     db.commit()
 
-    target = f"/mentor_dash?mentor_id={mentor_id}#assign-tasks"
+    target = "/mentor_dash#assign-tasks"
+    return RedirectResponse(url=target, status_code=303)
+
+
+# Bulk Task Assignment
+# ----------------------------
+@router.post("/mentor/task_bulk_create")
+def mentor_task_bulk_create(
+    title: str = Form(...),
+    desc: str = Form(""),
+    deadline: Optional[str] = Form(None),
+    supervision_ids: List[int] = Form([]),
+    due_csv: Optional[UploadFile] = File(None),
+    principal: Principal = Depends(sessions.require("mentor")),
+    db: Session = Depends(get_db),
+):
+    mentor_id = principal.id
+    errors = []
+    due_dates = {}
+    if due_csv and due_csv.filename:
+        due_dates, errors = task_service.parse_due_date_csv(due_csv.file.read())
+
+    result = {"created": 0, "skipped": 0}
+    try:
+        due_date = datetime.fromisoformat(deadline).date() if deadline else None
+    except ValueError:
+        errors.append("Default deadline is not a valid date.")
+    else:
+        result = task_service.bulk_assign_tasks(
+            db,
+            mentor_id,
+            title,
+            desc,
+            supervision_ids=supervision_ids,
+            due_date=due_date,
+            due_dates=due_dates,
+        )
+
+    target = (
+        f"/mentor_dash?bulk_created={result['created']}"
+        f"&bulk_skipped={result['skipped'] + len(errors)}#assign-tasks"
+    )
     return RedirectResponse(url=target, status_code=303)
 
 
@@ -182,20 +189,23 @@ def mentor_task_create(
 def mentor_task_delete(
     request: Request,
     task_id: int = Form(...),
-    mentor_id: int = Form(...),
+    principal: Principal = Depends(sessions.require("mentor")),
     db: Session = Depends(get_db),
 ):
+    # mentors can only delete tasks they assigned
     tasks = (
         db.query(Task)
-        .filter(Task.id == task_id)
+        .filter(Task.id == task_id, Task.assigned_by == principal.id)
         .first()
     )
     if tasks:
+        for user_id in {tasks.student_id, tasks.assigned_by}:
+            events.publish_after_commit(db, events.user_channel(user_id), "task", id=tasks.id, action="deleted")
         db.delete(tasks)
         db.commit()
 
-    target = f"/mentor_dash?mentor_id={mentor_id}#assign-tasks"
-    return RedirectResponse(url=target, status_code=status.HTTP_303_SEE_OTHER)
+    target = "/mentor_dash#assign-tasks"
+    return done(request, target, task_id=task_id)
 
 
 # Update Mentor Profile
@@ -203,16 +213,16 @@ def mentor_task_delete(
 @router.post("/mentor/profile/update")
 def update_profile(
     request: Request,
-    mentor_id: int = Form(...),
     name: Optional[str] = Form(None),
     email: Optional[str] = Form(None),
     phone: Optional[str] = Form(None),
     department_id: Optional[int] = Form(None),
     password: Optional[str] = Form(None),
     photo: Optional[UploadFile] = File(None),
+    principal: Principal = Depends(sessions.require("mentor")),
     db: Session = Depends(get_db),
 ):
-    user = db.query(User).filter(User.id == mentor_id).first()
+    user = db.query(User).filter(User.id == principal.id).first()
     if not user:
         return RedirectResponse(url="/mentor_dash", status_code=status.HTTP_303_SEE_OTHER)
 
@@ -239,7 +249,9 @@ def update_profile(
         user.profile_photo_url = f"/static/uploads/mentors/{user.id}/{filename}"
 
     db.add(user)
+    # a new password or department changes the cached principal
+    sessions.invalidate(db, user.id)
     db.commit()
 
-    target = f"/mentor_dash?mentor_id={mentor_id}#profile"
+    target = "/mentor_dash#profile"
     return RedirectResponse(url=target, status_code=status.HTTP_303_SEE_OTHER)
@@ -0,0 +1,78 @@
+from fastapi import APIRouter, Request, Depends, Form, Query
+from fastapi.responses import JSONResponse, RedirectResponse
+from sqlalchemy.orm import Session
+from app.database.connection import get_db
+from app.database import read_models as rm
+from app.services import notifications, sessions
+from app.services.sessions import Principal
+from typing import List, Optional
+
+router = APIRouter()
+
+
+def inbox_context(db: Session, user_id: int, before: Optional[str] = None, unread_only: bool = False) -> dict:
+    """Template context for the inbox section shared by the dashboards."""
+    limit = notifications.PAGE_SIZE
+    # one extra row tells us whether there is a next page
+    rows = rm.notification_rows(db, user_id, notifications.parse_cursor(before), limit + 1, unread_only)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = notifications.make_cursor(rows[-1].created_at, rows[-1].id)
+    return {
+        "notifications": rows,
+        "notif_next": next_cursor,
+        "notif_unread_only": unread_only,
+        "unread_notifications": notifications.unread_count(db, user_id),
+    }
+
+
+# Inbox (JSON)
+# ----------------------------
+@router.get("/notifications")
+def list_notifications(
+    before: Optional[str] = Query(None),
+    unread: bool = Query(False),
+    principal: Principal = Depends(sessions.require()),
+    db: Session = Depends(get_db),
+):
+    ctx = inbox_context(db, principal.id, before, unread)
+    return {
+        "items": [
+            {
+                **n._asdict(),
+                "read_at": n.read_at.isoformat() if n.read_at else None,
+                "created_at": n.created_at.isoformat() if n.created_at else None,
+            }
+            for n in ctx["notifications"]
+        ],
+        "next": ctx["notif_next"],
+        "unread": ctx["unread_notifications"],
+    }
+
+
+@router.get("/notifications/unread_count")
+def notifications_unread_count(
+    principal: Principal = Depends(sessions.require()),
+    db: Session = Depends(get_db),
+):
+    return JSONResponse({"unread": notifications.unread_count(db, principal.id)})
+
+
+# Mark Read
+# ----------------------------
+@router.post("/notifications/mark_read")
+def mark_notifications_read(
+    request: Request,
+    notification_ids: List[int] = Form([]),
+    mark_all: str = Form(""),
+    next: str = Form("/"),
+    principal: Principal = Depends(sessions.require()),
+    db: Session = Depends(get_db),
+):
+    ids = None if mark_all.lower() == "true" else notification_ids
+    notifications.mark_read(db, principal.id, ids)
+
+    # only redirect back into this site
+    target = next if next.startswith("/") and not next.startswith("//") else "/"
+    return RedirectResponse(url=target, status_code=303)
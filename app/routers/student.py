@@ -1,10 +1,18 @@
 from fastapi import APIRouter, Request, Depends, Form, status, Query, UploadFile, File
 from fastapi.templating import Jinja2Templates
 from fastapi.responses import RedirectResponse
-from sqlalchemy import func
+from sqlalchemy import func, select, exists, literal, Integer
 from sqlalchemy.orm import Session
-from app.database.connection import get_db
-from app.database.models import Internship, Application, User, Department, InternshipSupervision, Task
+from app.database.connection import get_db, insert_ignoring_conflicts
+from app.database.models import Internship, Application, User
+from app.database import read_models as rm
+from app.services.idempotency import IdempotencyCache
+from app.routers.notifications import inbox_context
+from app.routers.events import done
+from app.services import events, files, jobs, sessions
+from app.services.sessions import Principal
+from app.services.singleflight import flights
+from app.services.refdata import refdata
 from typing import Optional
 import os
 from uuid import uuid4
@@ -12,10 +20,18 @@ import hashlib
 
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
+templates.env.globals["cv_href"] = files.cv_href
 
 @router.get("/student_dash")
-def student_dash(request: Request, student_id: Optional[int] = Query(None), db: Session = Depends(get_db)):
-    internships = db.query(Internship).order_by(Internship.created_at.desc()).all()
+def student_dash(
+    request: Request,
+    notif_before: Optional[str] = Query(None),
+    notif_unread: bool = Query(False),
+    principal: Principal = Depends(sessions.require("student")),
+    db: Session = Depends(get_db),
+):
+    # the catalogue is the same for every student; concurrent loads share one query
+    internships = flights.do("catalogue", (), lambda: rm.catalogue_rows(db))
     user_ctx = {"name": "Student"}
     applications = []
     applied_ids = []
@@ -23,95 +39,44 @@ def student_dash(request: Request, student_id: Optional[int] = Query(None), db:
     total_pending = 0
     total_approved = 0
     total_rejected = 0
+    tasks = []
     total_tasks = 0
     total_tasks_completed = 0
+    total_tasks_overdue = 0
     departments = []
     active_internship = None
-
-    if student_id is not None:
-        student = db.query(User).filter(User.id == student_id).first()
-        if student:
-            user_ctx = {
-                "id": student.id,
-                "name": student.name,
-                "email": student.email,
-                "phone": student.phone,
-                "department_id": student.department_id,
-                "profile_photo_url": student.profile_photo_url,
-                "cv_url": student.cv_url,
-            }
-            app_rows = (
-                db.query(Application, Internship)
-                .join(Internship, Application.internship_id == Internship.id)
-                .filter(Application.student_id == student.id)
-                .order_by(Application.applied_at.desc())
-                .all()
-            )
-            applications = [
-                {
-                    "internship_id": i.id,
-                    "title": i.title,
-                    "company": i.company,
-                    "location": i.location,
-                    "applied_at": a.applied_at,
-                    "status": a.status,
-                }
-                for a, i in app_rows
-            ]
-            applied_ids = [i.id for a, i in app_rows]
-            # Stats
-            total_applied = len(applications)
-            for a, _ in app_rows:
-                st = (a.status or '').lower()
-                if st == 'approved':
-                    total_approved += 1
-                elif st == 'rejected':
-                    total_rejected += 1
-                else:
-                    total_pending += 1
-            departments = db.query(Department).order_by(Department.name.asc()).all()
-            
-            tasks = [
-                {
-                    "title": t.title,
-                    "description": t.description,
-                    "due_date": t.due_date,
-                    "status": t.status,
-                    "student_id": t.student_id,
-                    "assigned_by": t.assigned_by, 
-                    "feedback": t.feedback, 
-                }
-                for t in db.query(Task).filter(Task.student_id == student_id).order_by(Task.due_date.asc()).all()
-            ]
-            for t in tasks:
-                if student_id == t['student_id']:
-                    total_tasks += 1
-                    if (t['status'] or '').lower() == 'completed' or (t['status'] or '').lower() == 'overdue':
-                        total_tasks_completed += 1
-
-            # Active internship via supervision (only when student's application is approved)
-            sup = (
-                db.query(InternshipSupervision, Internship)
-                .join(Internship, Internship.id == InternshipSupervision.internship_id)
-                .join(Application, Application.internship_id == Internship.id)
-                .filter(
-                    InternshipSupervision.student_id == student.id,
-                    Application.student_id == student.id,
-                    InternshipSupervision.active == True,
-                    func.lower(Application.status) == 'approved',
-                )
-                .first()
-            )
-            if sup:
-                supervision, intern = sup
-                active_internship = {
-                    "title": intern.title,
-                    "company": intern.company,
-                    "supervisor": (supervision.mentor.name if supervision.mentor else None),
-                    "location": intern.location,
-                    "start_date": intern.start_date,
-                    "end_date": intern.end_date,
-                }
+    inbox = {}
+
+    student = rm.profile_row(db, principal.id)
+    if student:
+        user_ctx = student._asdict()
+        applications = rm.student_application_rows(db, student.id)
+        applied_ids = [a.internship_id for a in applications]
+        # Stats
+        total_applied = len(applications)
+        for a in applications:
+            st = (a.status or '').lower()
+            if st == 'approved':
+                total_approved += 1
+            elif st == 'rejected':
+                total_rejected += 1
+            else:
+                total_pending += 1
+        departments = refdata.departments()
+
+        tasks = rm.student_task_rows(db, student.id)
+        total_tasks = len(tasks)
+        for t in tasks:
+            st = (t.status or '').lower()
+            if st == 'completed':
+                total_tasks_completed += 1
+            elif st == 'overdue':  # missed deadline (scheduler.mark_overdue_tasks), not finished work
+                total_tasks_overdue += 1
+
+        # Active internship via supervision (only when student's application is approved)
+        active_internship = rm.active_internship_row(db, student.id)
+
+        inbox = inbox_context(db, student.id, notif_before, notif_unread)
 
     return templates.TemplateResponse(
         "student_dash.html",
@@ -129,42 +94,71 @@ def student_dash(request: Request, student_id: Optional[int] = Query(None), db:
             "tasks": tasks,
             "total_tasks": total_tasks,
             "total_tasks_completed": total_tasks_completed,
+            "total_tasks_overdue": total_tasks_overdue,
             "active_internship": active_internship,
+            "form_key": uuid4().hex,
+            **inbox,
         },
     )
 
 
+apply_keys = IdempotencyCache()
+
+
 @router.post("/student/apply")
 def apply_to_internship(
     request: Request,
     internship_id: int = Form(...),
-    student_id: int = Form(...),
+    idempotency_key: Optional[str] = Form(None),
+    principal: Principal = Depends(sessions.require("student")),
     db: Session = Depends(get_db),
 ):
-    internship = db.query(Internship).filter(Internship.id == internship_id).first()
-    student = db.query(User).filter(User.id == student_id).first()
-    if not internship or not student:
-        return RedirectResponse(url="/student_dash", status_code=status.HTTP_303_SEE_OTHER)
-
-    existing = (
-        db.query(Application)
-        .filter(Application.student_id == student_id, Application.internship_id == internship_id)
-        .first()
+    student_id = principal.id
+    # Redirect to Applications section on the dashboard without using JS
+    target = "/student_dash#section-applications"
+    if not apply_keys.claim(idempotency_key):
+        return RedirectResponse(url=target, status_code=status.HTTP_303_SEE_OTHER)
+
+    # Existence checks and the insert in one statement; the unique index on
+    # (student_id, internship_id) turns a concurrent duplicate into a no-op
+    source = select(
+        literal(student_id, Integer),
+        literal(internship_id, Integer),
+        literal("pending"),
+        func.now(),
+    ).where(
+        exists().where(Internship.id == internship_id, func.lower(func.coalesce(Internship.status, "draft")) != "closed"),
+        exists().where(User.id == student_id),
     )
-    if not existing:
-        app = Application(student_id=student_id, internship_id=internship_id, status="pending", applied_at=func.now())
-        db.add(app)
+    stmt = (
+        insert_ignoring_conflicts(Application, db.get_bind())
+        .from_select(["student_id", "internship_id", "status", "applied_at"], source)
+        .on_conflict_do_nothing(index_elements=["student_id", "internship_id"])
+    )
+    try:
+        if db.execute(stmt).rowcount:
+            app = db.execute(
+                select(Application.id, User.email, Internship.title)
+                .join(User, User.id == Application.student_id)
+                .join(Internship, Internship.id == Application.internship_id)
+                .where(Application.student_id == student_id, Application.internship_id == internship_id)
+            ).one()
+            events.publish_after_commit(
+                db, events.admin_channel(), "application", id=app.id, status="pending", action="created",
+                student_email=app.email, internship_title=app.title,
+            )
         db.commit()
+    except Exception:
+        db.rollback()
+        apply_keys.release(idempotency_key)
+        raise
 
-    # Redirect to Applications section on the dashboard without using JS
-    target = f"/student_dash?student_id={student_id}#section-applications"
-    return RedirectResponse(url=target, status_code=status.HTTP_303_SEE_OTHER)
+    return done(request, target)
 
 
 @router.post("/student/profile/update")
 def update_profile(
     request: Request,
-    student_id: int = Form(...),
     name: Optional[str] = Form(None),
     email: Optional[str] = Form(None),
     phone: Optional[str] = Form(None),
@@ -172,9 +166,10 @@ def update_profile(
     password: Optional[str] = Form(None),
     photo: Optional[UploadFile] = File(None),
     cv: Optional[UploadFile] = File(None),
+    principal: Principal = Depends(sessions.require("student")),
     db: Session = Depends(get_db),
 ):
-    user = db.query(User).filter(User.id == student_id).first()
+    user = db.query(User).filter(User.id == principal.id).first()
     if not user:
         return RedirectResponse(url="/student_dash", status_code=status.HTTP_303_SEE_OTHER)
 
@@ -204,18 +199,21 @@ def update_profile(
         user.profile_photo_url = f"/static/uploads/students/{user.id}/{filename}"
 
     # Save CV if provided
+    # (kept out of /static: CVs are served by app/routers/files.py after a role check)
+    target = "/student_dash#section-profile"
     if cv and cv.filename:
-        ext = os.path.splitext(cv.filename)[1]
-        filename = f"cv_{uuid4().hex}{ext}"
-        path = os.path.join(base_dir, filename)
-        with open(path, "wb") as f:
-            f.write(cv.file.read())
-        user.cv_url = f"/static/uploads/students/{user.id}/{filename}"
+        if files.allowed_cv(cv.filename):
+            user.cv_url = files.save_cv(user.id, cv)
+            # text extraction for the admins' CV search happens in the background
+            jobs.enqueue(db, "index_cv", {"student_id": user.id})
+        else:
+            target = "/student_dash?cv_rejected=1#section-profile"
 
     db.add(user)
+    # a new password or department changes the cached principal
+    sessions.invalidate(db, user.id)
     db.commit()
 
-    target = f"/student_dash?student_id={student_id}#section-profile"
     return RedirectResponse(url=target, status_code=status.HTTP_303_SEE_OTHER)
 
 
@@ -223,18 +221,20 @@ def update_profile(
 def withdraw_application(
     request: Request,
     internship_id: int = Form(...),
-    student_id: int = Form(...),
+    principal: Principal = Depends(sessions.require("student")),
     db: Session = Depends(get_db),
 ):
+    student_id = principal.id
     app = (
         db.query(Application)
         .filter(Application.student_id == student_id, Application.internship_id == internship_id)
         .first()
     )
     if app and (app.status or '').lower() == 'pending':
+        events.publish_after_commit(db, events.admin_channel(), "application", id=app.id, status="withdrawn")
         db.delete(app)
         db.commit()
 
-    target = f"/student_dash?student_id={student_id}#section-applications"
-    return RedirectResponse(url=target, status_code=status.HTTP_303_SEE_OTHER)
+    target = "/student_dash#section-applications"
+    return done(request, target)
 
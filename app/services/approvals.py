@@ -0,0 +1,155 @@
+from datetime import datetime
+from typing import Iterable, Optional
+from sqlalchemy import select, update, func, case, and_, or_
+from sqlalchemy.orm import Session
+from app.database.models import Application, Internship
+from app.services import events, notifications
+
+# Application approval engine
+# ---------------------
+# Every state change is a conditional UPDATE, so two admins approving at the
+# same time can never both win the same application or the last free slot.
+# Internships with no slot count (NULL or 0) are treated as uncapped.
+
+_SYNC = {"synchronize_session": False}
+
+
+def _filled():
+    return func.coalesce(Internship.filled_slots, 0)
+
+
+def _reserve_slot(db: Session, internship_id: int, auto_close: bool) -> bool:
+    values = {"filled_slots": _filled() + 1}
+    if auto_close:
+        # SET expressions see the pre-update row, so +1 is the new fill level
+        values["status"] = case(
+            (and_(Internship.slots > 0, _filled() + 1 >= Internship.slots), "closed"),
+            else_=Internship.status,
+        )
+    stmt = (
+        update(Internship)
+        .where(
+            Internship.id == internship_id,
+            or_(Internship.slots.is_(None), Internship.slots <= 0, _filled() < Internship.slots),
+        )
+        .values(**values)
+    )
+    return db.execute(stmt, execution_options=_SYNC).rowcount == 1
+
+
+def _claim_pending(db: Session, application_id: int, new_status: str, reviewer_id: Optional[int], now: datetime) -> bool:
+    stmt = (
+        update(Application)
+        .where(Application.id == application_id, func.lower(Application.status) == "pending")
+        .values(status=new_status, reviewed_by=reviewer_id, reviewed_at=now)
+    )
+    return db.execute(stmt, execution_options=_SYNC).rowcount == 1
+
+
+def _decision_message(row, decision: str, now: datetime) -> dict:
+    return notifications.message(
+        row.student_id,
+        f"Application {decision}",
+        f"Your application for {row.title or 'an internship'} was {decision}.",
+        type=f"application_{decision}",
+        now=now,
+    )
+
+
+def _publish_decision(db: Session, row, decision: str) -> None:
+    for channel in (events.admin_channel(), events.user_channel(row.student_id)):
+        events.publish_after_commit(
+            db, channel, "application", id=row.id, internship_id=row.internship_id, status=decision
+        )
+
+
+def approve_applications(
+    db: Session,
+    application_ids: Iterable[int],
+    reviewer_id: Optional[int] = None,
+    auto_close: bool = True,
+) -> dict:
+    """Approve pending applications in one transaction, reserving a slot for each.
+
+    Returns ids grouped as ``approved``, ``full`` (no slot left, left pending)
+    and ``skipped`` (unknown or no longer pending).
+    """
+    ids = list(dict.fromkeys(int(i) for i in application_ids))
+    result = {"approved": [], "full": [], "skipped": []}
+    if not ids:
+        return result
+
+    targets = {
+        r.id: r
+        for r in db.execute(
+            select(Application.id, Application.internship_id, Application.student_id, Internship.title)
+            .outerjoin(Internship, Internship.id == Application.internship_id)
+            .where(Application.id.in_(ids))
+        )
+    }
+    now = datetime.utcnow()
+    messages = []
+    try:
+        for app_id in ids:
+            target = targets.get(app_id)
+            if target is None or not _claim_pending(db, app_id, "approved", reviewer_id, now):
+                result["skipped"].append(app_id)
+                continue
+            if _reserve_slot(db, target.internship_id, auto_close):
+                result["approved"].append(app_id)
+                messages.append(_decision_message(target, "approved", now))
+                _publish_decision(db, target, "approved")
+            else:
+                # Posting is full: put the application back in the queue
+                db.execute(
+                    update(Application)
+                    .where(Application.id == app_id)
+                    .values(status="pending", reviewed_by=None, reviewed_at=None),
+                    execution_options=_SYNC,
+                )
+                result["full"].append(app_id)
+        notifications.notify(db, messages)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return result
+
+
+def reject_applications(
+    db: Session,
+    application_ids: Iterable[int],
+    reviewer_id: Optional[int] = None,
+) -> dict:
+    """Reject pending applications with a single set-based UPDATE."""
+    ids = list(dict.fromkeys(int(i) for i in application_ids))
+    result = {"rejected": [], "skipped": []}
+    if not ids:
+        return result
+
+    now = datetime.utcnow()
+    try:
+        db.execute(
+            update(Application)
+            .where(Application.id.in_(ids), func.lower(Application.status) == "pending")
+            .values(status="rejected", reviewed_by=reviewer_id, reviewed_at=now),
+            execution_options=_SYNC,
+        )
+        # The UPDATE holds the write lock, so this only sees rows it just changed
+        rows = db.execute(
+            select(Application.id, Application.internship_id, Application.student_id, Internship.title)
+            .outerjoin(Internship, Internship.id == Application.internship_id)
+            .where(Application.id.in_(ids), Application.status == "rejected", Application.reviewed_at == now)
+        ).all()
+        rejected = {r.id for r in rows}
+        notifications.notify(db, [_decision_message(r, "rejected", now) for r in rows])
+        for r in rows:
+            _publish_decision(db, r, "rejected")
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    result["rejected"] = [i for i in ids if i in rejected]
+    result["skipped"] = [i for i in ids if i not in rejected]
+    return result
+
@@ -0,0 +1,154 @@
+from datetime import date
+from typing import Optional
+from sqlalchemy import create_engine, text
+from app.database.connection import current_db
+from app.database.models import Application, Internship, InternshipSupervision, Report, Task
+
+# Cold storage for finished internships
+# ---------------------
+# Internships past their end_date are moved, with their applications,
+# supervisions, tasks and reports, into a separate SQLite file. Each batch
+# copies the rows into the attached archive and deletes the internship from
+# the hot tables, where the ON DELETE rules clear out everything that hung
+# off it, then commits once.
+#
+# That commit is atomic per file but not across the two: in WAL mode SQLite
+# commits an ATTACHed transaction file by file. If the process dies in
+# between, the batch can be left in both files. Each archive table has a
+# unique index on id and rows are copied with INSERT OR IGNORE, so the next
+# run skips what is already archived and finishes the delete.
+
+BATCH_SIZE = 50
+
+# table -> rows belonging to the internships listed in temp.archive_ids
+_ARCHIVED = [
+    (Internship.__table__.name, "id IN (SELECT id FROM temp.archive_ids)"),
+    (Application.__table__.name, "internship_id IN (SELECT id FROM temp.archive_ids)"),
+    (InternshipSupervision.__table__.name, "internship_id IN (SELECT id FROM temp.archive_ids)"),
+    (
+        Task.__table__.name,
+        "supervision_id IN (SELECT id FROM main.internship_supervisions "
+        "WHERE internship_id IN (SELECT id FROM temp.archive_ids))",
+    ),
+    (Report.__table__.name, "internship_id IN (SELECT id FROM temp.archive_ids)"),
+]
+
+
+def _columns(conn, schema: str, table: str) -> list:
+    return [r[1] for r in conn.exec_driver_sql(f"PRAGMA {schema}.table_info('{table}')")]
+
+
+def _sync_archive_table(conn, table: str) -> list:
+    # Archive tables carry the columns but none of the constraints: archived
+    # rows still point at users that live in the main database
+    hot = _columns(conn, "main", table)
+    cold = _columns(conn, "archive", table)
+    if not cold:
+        conn.exec_driver_sql(f"CREATE TABLE archive.{table} AS SELECT * FROM main.{table} WHERE 0")
+        if "internship_id" in hot:
+            conn.exec_driver_sql(
+                f"CREATE INDEX IF NOT EXISTS archive.ix_{table}_internship_id ON {table} (internship_id)"
+            )
+        cold = hot
+    has_unique = conn.exec_driver_sql(
+        f"SELECT 1 FROM archive.sqlite_master WHERE type = 'index' AND name = 'ux_{table}_id'"
+    ).first()
+    if not has_unique:
+        # archives written before the unique index may hold a batch copied twice
+        conn.exec_driver_sql(
+            f"DELETE FROM archive.{table} WHERE rowid NOT IN (SELECT MIN(rowid) FROM archive.{table} GROUP BY id)"
+        )
+        conn.exec_driver_sql(f"DROP INDEX IF EXISTS archive.ix_{table}_id")
+        conn.exec_driver_sql(f"CREATE UNIQUE INDEX archive.ux_{table}_id ON {table} (id)")
+    for col in hot:
+        if col not in cold:
+            conn.exec_driver_sql(f"ALTER TABLE archive.{table} ADD COLUMN {col}")
+    return hot
+
+
+def archive_finished_internships(
+    cutoff: Optional[date] = None,
+    batch_size: int = BATCH_SIZE,
+    bind=None,
+    archive_path=None,
+) -> dict:
+    """Move internships that ended before ``cutoff`` (default today) to the archive.
+
+    Returns the number of rows moved per table.
+    """
+    cutoff = cutoff or date.today()
+    moved = {table: 0 for table, _ in _ARCHIVED}
+    bind = bind or current_db().engine
+    archive_path = archive_path or current_db().archive_path
+    with bind.connect() as conn:
+        conn.exec_driver_sql("ATTACH DATABASE ? AS archive", (str(archive_path),))
+        try:
+            columns = {table: _sync_archive_table(conn, table) for table, _ in _ARCHIVED}
+            conn.exec_driver_sql("CREATE TEMP TABLE IF NOT EXISTS archive_ids (id INTEGER PRIMARY KEY)")
+            conn.commit()
+            while True:
+                conn.exec_driver_sql("DELETE FROM temp.archive_ids")
+                conn.execute(
+                    text(
+                        "INSERT INTO temp.archive_ids (id) SELECT id FROM main.internships "
+                        "WHERE end_date IS NOT NULL AND end_date < :cutoff ORDER BY id LIMIT :n"
+                    ),
+                    {"cutoff": cutoff.isoformat(), "n": batch_size},
+                )
+                if not conn.exec_driver_sql("SELECT COUNT(*) FROM temp.archive_ids").scalar():
+                    conn.commit()
+                    break
+                for table, where in _ARCHIVED:
+                    cols = ", ".join(columns[table])
+                    moved[table] += conn.exec_driver_sql(
+                        f"INSERT OR IGNORE INTO archive.{table} ({cols}) SELECT {cols} FROM main.{table} WHERE {where}"
+                    ).rowcount
+                conn.exec_driver_sql("DELETE FROM main.internships WHERE id IN (SELECT id FROM temp.archive_ids)")
+                conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.exec_driver_sql("DETACH DATABASE archive")
+    return moved
+
+
+# Read path
+# ---------------------
+def _archive_engine(archive_path):
+    # read-only: browsing the archive never takes a write lock
+    return create_engine(
+        f"sqlite:///file:{archive_path.as_posix()}?mode=ro&uri=true",
+        connect_args={"check_same_thread": False},
+    )
+
+
+def search_archived_internships(q: str = "", limit: int = 50, archive_path=None) -> list:
+    """Archived internships matching ``q`` on title or company, newest first."""
+    archive_path = archive_path or current_db().archive_path
+    if not archive_path.exists():
+        return []
+    archive = _archive_engine(archive_path)
+    try:
+        with archive.connect() as conn:
+            tables = {r[0] for r in conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type='table'")}
+            if "internships" not in tables:
+                return []
+            like = f"%{(q or '').strip()}%"
+            rows = conn.execute(
+                text(
+                    "SELECT i.id, i.title, i.company, i.start_date, i.end_date, i.status, "
+                    "(SELECT COUNT(*) FROM applications a WHERE a.internship_id = i.id) AS applications, "
+                    "(SELECT COUNT(*) FROM internship_supervisions s WHERE s.internship_id = i.id) AS supervisions "
+                    "FROM internships i WHERE i.title LIKE :like OR i.company LIKE :like "
+                    "ORDER BY i.end_date DESC LIMIT :limit"
+                ),
+                {"like": like, "limit": limit},
+            ).mappings().all()
+            return [dict(r) for r in rows]
+    finally:
+        archive.dispose()
+
+
+if __name__ == "__main__":
+    print(archive_finished_internships())
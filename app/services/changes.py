@@ -0,0 +1,87 @@
+import json
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+from sqlalchemy import select, delete, func, exists
+from sqlalchemy.orm import Session, aliased
+from app.database.models import Change
+from app.database.schema import CHANGE_LOG_TABLES
+
+# Change feed
+# ---------------------
+# `changes` is an append-only log written by triggers (app/database/schema.py).
+# `seq` only grows, and SQLite takes one writer at a time, so seq order is
+# commit order: a consumer that stores the last seq it applied and asks for
+# everything after it never skips a committed change.
+#
+# Compaction: rows older than COMPACT_AFTER_DAYS are dropped once a newer row
+# exists for the same entity and id. Recent history stays complete, older
+# history shrinks to the latest image of every row (deletes included), so a
+# consumer starting again from seq 0 still ends up with the current state.
+
+PAGE_SIZE = 500
+MAX_PAGE_SIZE = 5000
+COMPACT_AFTER_DAYS = 7
+COMPACT_WINDOW = 5000  # seq range deleted per transaction
+FIELDS = ["seq", "entity", "id", "op", "at", "data"]
+ENTITIES = tuple(CHANGE_LOG_TABLES)
+
+
+def read_changes(db: Session, since: int = 0, limit: int = PAGE_SIZE, entities: Optional[Iterable[str]] = None):
+    """Up to ``limit`` changes with seq above ``since``, oldest first."""
+    stmt = (
+        select(Change.seq, Change.entity, Change.entity_id, Change.op, Change.changed_at, Change.data)
+        .where(Change.seq > since)
+        .order_by(Change.seq.asc())
+        .limit(limit)
+    )
+    if entities:
+        stmt = stmt.where(Change.entity.in_(list(entities)))
+    return db.execute(stmt).all()
+
+
+def encode_page(rows, since: int, limit: int) -> str:
+    """Compact JSON page: one array per change in FIELDS order.
+
+    ``rows`` holds up to ``limit + 1`` changes; the extra one only says that
+    there is more. The stored row images are spliced in as they are, never
+    parsed and re-encoded.
+    """
+    more = len(rows) > limit
+    rows = rows[:limit]
+    next_seq = rows[-1].seq if rows else since
+    out = []
+    for seq, entity, entity_id, op, at, data in rows:
+        head = json.dumps([seq, entity, entity_id, op, at.isoformat(sep=" ") if at else None], separators=(",", ":"))
+        out.append(head[:-1] + "," + (data or "null") + "]")
+    return (
+        '{"fields":' + json.dumps(FIELDS, separators=(",", ":"))
+        + ',"next":' + str(next_seq)
+        + ',"more":' + ("true" if more else "false")
+        + ',"changes":[' + ",".join(out) + "]}"
+    )
+
+
+def compact_changes(db: Session, older_than_days: int = COMPACT_AFTER_DAYS) -> int:
+    """Drop old changes that a newer change to the same row supersedes."""
+    horizon = datetime.utcnow() - timedelta(days=older_than_days)
+    first, last = db.execute(
+        select(func.min(Change.seq), func.max(Change.seq)).where(Change.changed_at < horizon)
+    ).one()
+    if first is None:
+        return 0
+    newer = aliased(Change)
+    superseded = exists().where(
+        newer.entity == Change.entity,
+        newer.entity_id == Change.entity_id,
+        newer.seq > Change.seq,
+    )
+    removed = 0
+    # one short transaction per seq window, so writers are never held up for long
+    for lo in range(first - 1, last, COMPACT_WINDOW):
+        result = db.execute(
+            delete(Change).where(Change.seq > lo, Change.seq <= min(lo + COMPACT_WINDOW, last), superseded),
+            execution_options={"synchronize_session": False},
+        )
+        db.commit()
+        removed += result.rowcount
+    return removed
@@ -0,0 +1,213 @@
+import atexit
+import hashlib
+import html
+import multiprocessing
+import os
+import re
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import NamedTuple, Optional
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+from app.database.models import CvText, User
+from app.services import files
+
+# CV text and search
+# ---------------------
+# Text is pulled out of uploaded CVs by the job queue ("index_cv" after an
+# upload, "index_cvs" to backfill every student) and stored in the FTS5
+# table cv_search, one row per student (see schema.ensure_cv_search). The
+# approvals section searches it through GET /admin/applications/search.
+#
+# Parsing a PDF is CPU-bound pure Python, so it runs in a process pool of
+# EXTRACT_PROCESSES, off the job worker threads and the web process's GIL.
+# Extracted text is cached in cv_texts under the file's SHA-256: uploading
+# the same file again, or reindexing, costs a hash and no parsing.
+#
+# PDFs need pypdf; .docx is read with the standard library. Anything else
+# (old .doc files, scans without a text layer) is indexed as empty.
+
+EXTRACT_PROCESSES = int(os.environ.get("CV_EXTRACT_PROCESSES", str(max(1, (os.cpu_count() or 2) // 2))))
+EXTRACT_TIMEOUT = 120  # seconds for one file; a stuck parse fails the job, which is retried
+MAX_TEXT_CHARS = 200_000
+SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+HASH_CHUNK = 1024 * 1024
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+DOCX_BREAK_RE = re.compile(r"</w:p>|<w:tab/>|<w:br/>")
+XML_TAG_RE = re.compile(r"<[^>]+>")
+
+
+# Extraction (runs in the pool's processes)
+# ---------------------
+def _pdf_text(path: str) -> str:
+    from pypdf import PdfReader
+    reader = PdfReader(path)
+    parts, size = [], 0
+    for page in reader.pages:
+        chunk = page.extract_text() or ""
+        parts.append(chunk)
+        size += len(chunk)
+        if size >= MAX_TEXT_CHARS:
+            break
+    return "\n".join(parts)
+
+
+def _docx_text(path: str) -> str:
+    with zipfile.ZipFile(path) as z:
+        xml = z.read("word/document.xml").decode("utf-8", "replace")
+    # paragraph ends, tabs and breaks become whitespace; every other tag goes
+    return html.unescape(XML_TAG_RE.sub("", DOCX_BREAK_RE.sub(" ", xml)))
+
+
+def extract_text(path: str) -> tuple:
+    """(text, error) for the file at ``path``; exactly one of them is None."""
+    suffix = Path(path).suffix.lower()
+    try:
+        if suffix == ".pdf":
+            raw = _pdf_text(path)
+        elif suffix == ".docx":
+            raw = _docx_text(path)
+        else:
+            return None, f"no text extractor for {suffix or 'files without an extension'}"
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+    return " ".join(raw.split())[:MAX_TEXT_CHARS], None
+
+
+# Process pool
+# ---------------------
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, like the job workers: forking a process that holds SQLite connections isn't safe
+            _pool = ProcessPoolExecutor(EXTRACT_PROCESSES, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def shutdown() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+
+atexit.register(shutdown)
+
+
+# Cache and index
+# ---------------------
+def file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cached(db: Session, digests: list) -> dict:
+    if not digests:
+        return {}
+    rows = db.execute(select(CvText.sha256, CvText.text).where(CvText.sha256.in_(digests))).all()
+    return {r.sha256: r.text or "" for r in rows}
+
+
+def _index(db: Session, student_id: int, digest: Optional[str], body: Optional[str]) -> None:
+    db.execute(text("DELETE FROM cv_search WHERE rowid = :id"), {"id": student_id})
+    if digest is not None:
+        db.execute(
+            text("INSERT INTO cv_search (rowid, sha256, body) VALUES (:id, :sha, :body)"),
+            {"id": student_id, "sha": digest, "body": body or ""},
+        )
+
+
+def index_students(db: Session, student_ids: Optional[list] = None) -> int:
+    """Bring cv_search up to date for ``student_ids`` (every student when None); returns files parsed.
+
+    Students whose indexed sha256 already matches their current CV are
+    skipped. Uncached files are parsed in the pool in parallel; texts are
+    committed to the cache and the index together at the end.
+    """
+    stmt = select(User.id, User.cv_url).where(User.cv_url.isnot(None))
+    if student_ids is not None:
+        stmt = select(User.id, User.cv_url).where(User.id.in_(student_ids))
+    students = db.execute(stmt).all()
+    indexed = dict(db.execute(text("SELECT rowid, sha256 FROM cv_search")).all())
+
+    current = {}  # student id -> (sha256, path), or None when there is no readable CV
+    for s in students:
+        path = files.cv_path(s.id, s.cv_url)
+        current[s.id] = (file_hash(path), path) if path is not None else None
+    stale = {sid: cur for sid, cur in current.items() if (cur and cur[0]) != indexed.get(sid)}
+    if not stale:
+        return 0
+
+    texts = _cached(db, [cur[0] for cur in stale.values() if cur])
+    todo = {}  # sha256 -> path, each distinct file parsed once
+    for cur in stale.values():
+        if cur and cur[0] not in texts:
+            todo.setdefault(cur[0], cur[1])
+    now = datetime.utcnow()
+    futures = {digest: pool().submit(extract_text, str(path)) for digest, path in todo.items()}
+    for digest, future in futures.items():
+        body, error = future.result(timeout=EXTRACT_TIMEOUT)
+        db.merge(CvText(sha256=digest, text=body, error=error, extracted_at=now))
+        texts[digest] = body or ""
+
+    for sid, cur in stale.items():
+        _index(db, sid, cur[0] if cur else None, texts.get(cur[0]) if cur else None)
+    db.commit()
+    return len(futures)
+
+
+# Search
+# ---------------------
+class CvHit(NamedTuple):
+    student_id: int
+    name: Optional[str]
+    email: Optional[str]
+    cv_url: Optional[str]
+    snippet: str
+    application_ids: list
+
+
+def match_query(q: str) -> Optional[str]:
+    """FTS5 query for free text: every word must appear, as a prefix ("pyth" finds python)."""
+    words = WORD_RE.findall(q or "")
+    if not words:
+        return None
+    return " ".join(f'"{w}"*' for w in words[:10])
+
+
+def search(db: Session, q: str, limit: int = SEARCH_LIMIT, internship_id: int = None) -> list:
+    """Students whose CV matches ``q``, best first, with their application ids."""
+    query = match_query(q)
+    if query is None:
+        return []
+    where = "AND a.internship_id = :internship_id" if internship_id else ""
+    rows = db.execute(text(f"""
+        SELECT s.rowid AS student_id, u.name, u.email, u.cv_url,
+               snippet(cv_search, 1, '[', ']', '…', 12) AS snippet,
+               (SELECT group_concat(a.id) FROM applications a
+                WHERE a.student_id = s.rowid {where}) AS application_ids
+        FROM cv_search s
+        JOIN users u ON u.id = s.rowid
+        WHERE cv_search MATCH :q
+          AND EXISTS (SELECT 1 FROM applications a WHERE a.student_id = s.rowid {where})
+        ORDER BY bm25(cv_search)
+        LIMIT :limit
+    """), {"q": query, "limit": limit, "internship_id": internship_id}).all()
+    return [
+        CvHit(r.student_id, r.name, r.email, r.cv_url, r.snippet or "",
+              sorted(int(i) for i in (r.application_ids or "").split(",") if i))
+        for r in rows
+    ]
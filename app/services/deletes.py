@@ -0,0 +1,58 @@
+from sqlalchemy import delete, select, update, func, case
+from sqlalchemy.orm import Session
+from app.database.models import Application, Internship, User
+
+# Set-based deletes
+# ---------------------
+# Each root entity goes with one DELETE; the ON DELETE rules declared in
+# models.py (or the equivalent triggers from app/database/schema.py on
+# older files) remove or detach everything that hangs off it.
+
+_SYNC = {"synchronize_session": False}
+
+
+def delete_internship(db: Session, internship_id: int) -> bool:
+    """Delete an internship with its applications, supervisions, tasks and reports."""
+    try:
+        deleted = db.execute(
+            delete(Internship).where(Internship.id == internship_id), execution_options=_SYNC
+        ).rowcount
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return deleted == 1
+
+
+def delete_user(db: Session, user_id: int) -> bool:
+    """Delete a user and everything owned by them.
+
+    Their approved applications are cascaded away too, so the slots those
+    applications held are handed back to the internships first.
+    """
+    approved = (
+        select(func.count(Application.id))
+        .where(
+            Application.internship_id == Internship.id,
+            Application.student_id == user_id,
+            func.lower(Application.status) == "approved",
+        )
+        .scalar_subquery()
+    )
+    held = select(Application.internship_id).where(
+        Application.student_id == user_id, func.lower(Application.status) == "approved"
+    )
+    remaining = func.coalesce(Internship.filled_slots, 0) - approved
+    try:
+        db.execute(
+            update(Internship)
+            .where(Internship.id.in_(held))
+            .values(filled_slots=case((remaining > 0, remaining), else_=0)),
+            execution_options=_SYNC,
+        )
+        deleted = db.execute(delete(User).where(User.id == user_id), execution_options=_SYNC).rowcount
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return deleted == 1
@@ -0,0 +1,201 @@
+import asyncio
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import event as sa_event
+from sqlalchemy.orm import Session
+from app.database.connection import BASE_DIR, DEFAULT, current_db
+
+# Live update hub
+# ---------------------
+# Small delta events ("application 42 approved", "task 17 created") go to
+# per-principal channels: "admin" and "user:<id>". With a path set, every
+# publish is one appended JSON line and each web process tails the file, so
+# events raised in another worker, or in a job worker process, still reach
+# the browsers connected here. Without a path the hub is purely in-process.
+#
+# Events are hints for the open page, not a record: a client that falls
+# behind gets a "resync" event and reloads.
+
+EVENTS_PATH = os.environ.get("EVENTS_FILE", str(BASE_DIR / "events.ndjson")) or None
+MAX_BYTES = 1 << 20  # rotate to <path>.1 past this size
+POLL_SECONDS = 0.25
+QUEUE_SIZE = 256
+
+
+class Subscription:
+    def __init__(self, channels, loop: asyncio.AbstractEventLoop):
+        self.channels = tuple(channels)
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(QUEUE_SIZE)
+
+    def _put(self, payload: dict) -> None:
+        # runs on the event loop thread
+        try:
+            self.queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"type": "resync"})
+
+    def deliver(self, payload: dict) -> None:
+        self.loop.call_soon_threadsafe(self._put, payload)
+
+
+class EventHub:
+    def __init__(self, path: Optional[str] = EVENTS_PATH, poll_seconds: float = POLL_SECONDS):
+        self.path = path
+        self.poll_seconds = poll_seconds
+        self._subs: dict[str, set] = {}
+        self._listeners: dict[str, list] = {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._stop = None
+        self._thread = None
+
+    # Subscribers
+    def subscribe(self, *channels: str) -> Subscription:
+        sub = Subscription(channels, asyncio.get_running_loop())
+        with self._lock:
+            for ch in sub.channels:
+                self._subs.setdefault(ch, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            for ch in sub.channels:
+                subs = self._subs.get(ch)
+                if subs:
+                    subs.discard(sub)
+                    if not subs:
+                        del self._subs[ch]
+
+    def listen(self, channel: str, fn) -> None:
+        """Call ``fn(payload)`` for every event on ``channel``, e.g. to drop a cache entry."""
+        with self._lock:
+            self._listeners.setdefault(channel, []).append(fn)
+
+    def _dispatch(self, channel: str, payload: dict) -> None:
+        with self._lock:
+            subs = list(self._subs.get(channel, ()))
+            listeners = list(self._listeners.get(channel, ()))
+        for fn in listeners:
+            try:
+                fn(payload)
+            except Exception as e:
+                print("Event listener failed:", e)
+        for sub in subs:
+            sub.deliver(payload)
+
+    # Publishers
+    def publish(self, channel: str, payload: dict) -> None:
+        if not self.path:
+            self._dispatch(channel, payload)
+            return
+        line = json.dumps({"channel": channel, "event": payload}, default=str, separators=(",", ":"))
+        with self._write_lock:
+            try:
+                if os.path.getsize(self.path) > MAX_BYTES:
+                    os.replace(self.path, self.path + ".1")
+            except OSError:
+                pass
+            # one O_APPEND write per event, so lines from several processes never interleave
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, (line + "\n").encode("utf-8"))
+            finally:
+                os.close(fd)
+
+    # File tailer
+    def _open_at_end(self):
+        f = open(self.path, "a+b")
+        f.seek(0, os.SEEK_END)
+        return f
+
+    def _tail(self) -> None:
+        f = self._open_at_end()
+        partial = b""
+        try:
+            while not self._stop.is_set():
+                chunk = f.read()
+                if chunk:
+                    lines = (partial + chunk).split(b"\n")
+                    partial = lines.pop()
+                    for raw in lines:
+                        try:
+                            msg = json.loads(raw)
+                            self._dispatch(msg["channel"], msg["event"])
+                        except (ValueError, KeyError):
+                            continue
+                    continue
+                # fully drained: follow a rotation to the new file
+                try:
+                    rotated = os.stat(self.path).st_ino != os.fstat(f.fileno()).st_ino
+                except FileNotFoundError:
+                    rotated = True
+                if rotated:
+                    f.close()
+                    f = open(self.path, "a+b")
+                    f.seek(0)
+                    partial = b""
+                    continue
+                self._stop.wait(self.poll_seconds)
+        finally:
+            f.close()
+
+    def start(self) -> None:
+        if not self.path or self._thread is not None:
+            return
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._tail, name="event-hub", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+        self._stop = None
+
+
+hub = EventHub()
+
+
+# Publishing from a database session
+# ---------------------
+def publish_after_commit(db: Session, channel: str, event_type: str, **data) -> None:
+    """Send an event once ``db`` commits; dropped if the transaction rolls back."""
+    payload = {"type": event_type, "at": datetime.utcnow().isoformat(timespec="seconds"), **data}
+    db.info.setdefault("pending_events", []).append((channel, payload))
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _publish_pending(session: Session) -> None:
+    for channel, payload in session.info.pop("pending_events", ()):
+        try:
+            hub.publish(channel, payload)
+        except Exception as e:
+            print("Failed to publish event:", e)
+
+
+@sa_event.listens_for(Session, "after_soft_rollback")
+def _drop_pending(session: Session, previous_transaction) -> None:
+    session.info.pop("pending_events", None)
+
+
+# Channel names are per database, so tenants served by one process (or
+# sharing one events file) never see each other's events
+def _scoped(channel: str) -> str:
+    name = current_db().name
+    return channel if name == DEFAULT else f"{name}/{channel}"
+
+
+def user_channel(user_id: int) -> str:
+    return _scoped(f"user:{user_id}")
+
+
+def admin_channel() -> str:
+    return _scoped("admin")
@@ -0,0 +1,153 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Iterator, Optional
+from sqlalchemy import select, func
+from sqlalchemy.orm import aliased
+from app.database.connection import current_db
+from app.database.models import Application, Department, Internship, InternshipSupervision, Task, User
+
+# Bulk exports
+# ---------------------
+# Rows are streamed from the database to the response. Each export walks
+# the table in primary-key order, CHUNK_ROWS at a time. A chunk is fetched
+# through a yield_per cursor on its own short-lived connection, so memory is
+# bounded by one chunk for any table size, and no read transaction stays open
+# while a slow client downloads (on SQLite that would keep writers waiting on
+# the file lock).
+
+CHUNK_ROWS = 5000
+YIELD_PER = 500
+FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+Student = aliased(User)
+Mentor = aliased(User)
+
+
+def _applications(filters: dict):
+    stmt = (
+        select(
+            Application.id, Application.status, Application.applied_at, Application.reviewed_at,
+            Application.student_id, Student.name.label("student_name"), Student.email.label("student_email"),
+            Application.internship_id, Internship.title.label("internship_title"),
+            Internship.company.label("internship_company"),
+        )
+        .outerjoin(Student, Student.id == Application.student_id)
+        .outerjoin(Internship, Internship.id == Application.internship_id)
+    )
+    if filters.get("status"):
+        stmt = stmt.where(func.lower(Application.status) == filters["status"].lower())
+    if filters.get("internship_id"):
+        stmt = stmt.where(Application.internship_id == filters["internship_id"])
+    if filters.get("since"):
+        stmt = stmt.where(Application.applied_at >= filters["since"])
+    return stmt, Application.id
+
+
+def _tasks(filters: dict):
+    sv = InternshipSupervision
+    stmt = (
+        select(
+            Task.id, Task.title, Task.status, Task.due_date, Task.rating, Task.created_at,
+            Task.student_id, Student.email.label("student_email"),
+            Task.supervision_id, sv.internship_id, Internship.title.label("internship_title"),
+            Task.assigned_by.label("mentor_id"), Mentor.name.label("mentor_name"), Mentor.email.label("mentor_email"),
+        )
+        .outerjoin(Student, Student.id == Task.student_id)
+        .outerjoin(Mentor, Mentor.id == Task.assigned_by)
+        .outerjoin(sv, sv.id == Task.supervision_id)
+        .outerjoin(Internship, Internship.id == sv.internship_id)
+    )
+    if filters.get("status"):
+        stmt = stmt.where(func.lower(Task.status) == filters["status"].lower())
+    if filters.get("mentor_id"):
+        stmt = stmt.where(Task.assigned_by == filters["mentor_id"])
+    if filters.get("since"):
+        stmt = stmt.where(Task.created_at >= filters["since"])
+    return stmt, Task.id
+
+
+def _users(filters: dict):
+    # never export password hashes
+    stmt = (
+        select(
+            User.id, User.name, User.email, User.role, User.status, User.phone,
+            User.department_id, Department.name.label("department"), User.created_at,
+        )
+        .outerjoin(Department, Department.id == User.department_id)
+    )
+    if filters.get("role"):
+        stmt = stmt.where(func.lower(User.role) == filters["role"].lower())
+    if filters.get("status"):
+        stmt = stmt.where(func.lower(User.status) == filters["status"].lower())
+    if filters.get("since"):
+        stmt = stmt.where(User.created_at >= filters["since"])
+    return stmt, User.id
+
+
+EXPORTS = {
+    "applications": _applications,
+    "tasks": _tasks,
+    "users": _users,
+}
+
+
+def iter_rows(entity: str, filters: Optional[dict] = None, bind=None) -> Iterator:
+    """Yield every matching row of ``entity`` as a Row, in id order."""
+    stmt, key = EXPORTS[entity](filters or {})
+    bind = bind or current_db().engine
+    last_id = None
+    while True:
+        page = stmt if last_id is None else stmt.where(key > last_id)
+        page = page.order_by(key.asc()).limit(CHUNK_ROWS)
+        with bind.connect() as conn:
+            result = conn.execution_options(yield_per=YIELD_PER).execute(page)
+            chunk = [row for part in result.partitions() for row in part]
+        # the connection is back in the pool before a slow client gets the rows
+        yield from chunk
+        if len(chunk) < CHUNK_ROWS:
+            return
+        last_id = chunk[-1].id
+
+
+def _csv_value(v):
+    if v is None:
+        return ""
+    if isinstance(v, datetime):
+        return v.isoformat(sep=" ")
+    return v
+
+
+def encode_csv(rows: Iterator, columns: list, batch: int = YIELD_PER) -> Iterator[str]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(columns)
+    n = 0
+    for row in rows:
+        writer.writerow([_csv_value(v) for v in row])
+        n += 1
+        if n % batch == 0:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue()
+
+
+def encode_ndjson(rows: Iterator, columns: list, batch: int = YIELD_PER) -> Iterator[str]:
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(dict(zip(columns, row)), default=str))
+        if len(lines) == batch:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def export(entity: str, fmt: str = "csv", filters: Optional[dict] = None, bind=None) -> Iterator[str]:
+    """Text chunks of ``entity`` encoded as ``fmt`` (``csv`` or ``ndjson``)."""
+    stmt, _ = EXPORTS[entity](filters or {})
+    columns = [c.name for c in stmt.selected_columns]
+    encode = encode_csv if fmt == "csv" else encode_ndjson
+    return encode(iter_rows(entity, filters, bind), columns)
@@ -0,0 +1,382 @@
+import csv
+import io
+import os
+import re
+import shutil
+import zipfile
+from email.utils import formatdate
+from pathlib import Path, PurePosixPath
+from typing import Iterator, NamedTuple, Optional
+from uuid import uuid4
+import anyio
+from fastapi import Request
+from fastapi.responses import FileResponse, Response
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.database.connection import BASE_DIR, DEFAULT, Database, current_db
+from app.database.models import Application, Internship, InternshipSupervision, User
+
+# Private files
+# ---------------------
+# CVs are kept under UPLOAD_DIR, outside the public /static mount, and are
+# only served by GET /files/cv/<student id>/<file name> after a role check
+# (app/routers/files.py). Every upload gets a new file name, so a URL always
+# names the same bytes: the ETag is strong and browsers may cache for
+# CV_CACHE_CONTROL without revalidating.
+#
+# Responses honour If-None-Match (304) and a single Range (206/416), so a PDF
+# viewer can fetch just the pages it shows. Whole files go out through
+# FileResponse, which hands the path to the server (ASGI pathsend) when it
+# supports that. Behind nginx or Apache, FILE_OFFLOAD lets the proxy send the
+# file itself, with sendfile and its own range handling:
+#
+# FILE_OFFLOAD=x-accel-redirect   nginx; FILE_OFFLOAD_PREFIX is an `internal`
+#                                 location aliased to UPLOAD_DIR
+# FILE_OFFLOAD=x-sendfile         Apache mod_xsendfile / lighttpd; the header
+#                                 carries the absolute path
+# FILE_OFFLOAD unset              the app streams the file
+
+UPLOAD_DIR = Path(os.environ.get("UPLOAD_DIR", str(BASE_DIR / "uploads")))
+LEGACY_DIR = Path("static") / "uploads" / "students"  # where CVs used to go, publicly served
+CV_PREFIX = "/files/cv/"
+LEGACY_PREFIX = "/static/uploads/students/"
+CV_CACHE_CONTROL = os.environ.get("CV_CACHE_CONTROL", "private, max-age=86400")
+FILE_OFFLOAD = os.environ.get("FILE_OFFLOAD", "").lower()
+FILE_OFFLOAD_PREFIX = "/" + os.environ.get("FILE_OFFLOAD_PREFIX", "/protected-uploads/").strip("/") + "/"
+CHUNK_SIZE = 64 * 1024
+# the only CV types accepted, with the media type they are served as; anything
+# else (.html, .svg) would run as script on this origin when opened
+CV_TYPES = {
+    ".pdf": "application/pdf",
+    ".doc": "application/msword",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+INLINE_TYPES = {"application/pdf"}
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _root(database: Database) -> Path:
+    return UPLOAD_DIR if database.name == DEFAULT else UPLOAD_DIR / "tenants" / database.name
+
+
+def student_dir(user_id: int, database: Database = None) -> Path:
+    return _root(database or current_db()) / "students" / str(user_id)
+
+
+def cv_url(user_id: int, filename: str) -> str:
+    return f"{CV_PREFIX}{user_id}/{filename}"
+
+
+def cv_href(user_id: Optional[int], stored: Optional[str]) -> Optional[str]:
+    """Download link for a student's stored ``cv_url``, old /static paths included."""
+    if not user_id or not stored:
+        return None
+    return cv_url(user_id, PurePosixPath(stored).name)
+
+
+def allowed_cv(filename: Optional[str]) -> bool:
+    return os.path.splitext(filename or "")[1].lower() in CV_TYPES
+
+
+def save_cv(user_id: int, upload) -> str:
+    """Write an uploaded CV to the student's private folder; returns its cv_url.
+
+    Raises ValueError for a file type outside CV_TYPES.
+    """
+    ext = os.path.splitext(upload.filename)[1].lower()
+    if ext not in CV_TYPES:
+        raise ValueError(f"CV must be one of {', '.join(CV_TYPES)}")
+    filename = f"cv_{uuid4().hex}{ext}"
+    folder = student_dir(user_id)
+    folder.mkdir(parents=True, exist_ok=True)
+    with open(folder / filename, "wb") as f:
+        shutil.copyfileobj(upload.file, f, CHUNK_SIZE)
+    return cv_url(user_id, filename)
+
+
+def cv_path(user_id: int, stored: Optional[str]) -> Optional[Path]:
+    """File behind a student's stored ``cv_url``, or None if it isn't there."""
+    if not stored:
+        return None
+    name = PurePosixPath(stored).name
+    if stored.startswith(CV_PREFIX):
+        path = student_dir(user_id) / name
+    elif stored.startswith(LEGACY_PREFIX):
+        path = LEGACY_DIR / str(user_id) / name
+    else:
+        return None
+    return path if path.is_file() else None
+
+
+def may_view_cv(db: Session, principal, student_id: int) -> bool:
+    """Admins see every CV, students their own, mentors those of students they supervise."""
+    if principal.role == "admin":
+        return True
+    if principal.role == "student":
+        return principal.id == student_id
+    if principal.role == "mentor":
+        return db.execute(
+            select(InternshipSupervision.id)
+            .where(InternshipSupervision.mentor_id == principal.id, InternshipSupervision.student_id == student_id)
+            .limit(1)
+        ).first() is not None
+    return False
+
+
+def move_legacy_cvs(database: Database = None) -> int:
+    """Move CVs still under /static into UPLOAD_DIR and repoint cv_url; returns how many moved."""
+    database = database or current_db()
+    moved = 0
+    with database.SessionLocal() as db:
+        users = db.execute(select(User).where(User.cv_url.like(LEGACY_PREFIX + "%"))).scalars().all()
+        for user in users:
+            source = cv_path(user.id, user.cv_url)
+            if source is None:
+                continue
+            folder = student_dir(user.id, database)
+            folder.mkdir(parents=True, exist_ok=True)
+            shutil.move(str(source), str(folder / source.name))
+            user.cv_url = cv_url(user.id, source.name)
+            moved += 1
+        db.commit()
+    return moved
+
+
+# Responses
+# ---------------------
+def etag(st: os.stat_result) -> str:
+    # a new upload is a new file, so size and mtime are enough to tell versions apart
+    return f'"{st.st_size:x}-{st.st_mtime_ns:x}"'
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[tuple]:
+    """(first, last) byte of a single ``bytes=`` range, or None to send the whole file.
+
+    Raises ValueError when the range lies beyond the end of the file (416).
+    Multiple ranges are answered with the whole file, which RFC 9110 allows.
+    """
+    m = RANGE_RE.match((header or "").strip())
+    if not m or m.group(1) == m.group(2) == "":
+        return None
+    if size == 0:
+        raise ValueError(header)
+    first, last = m.group(1), m.group(2)
+    if first == "":
+        # bytes=-500: the last 500 bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+    first = int(first)
+    if first >= size:
+        raise ValueError(header)
+    if last and int(last) < first:
+        return None  # bytes=500-100 is malformed: ignore it
+    last = min(int(last), size - 1) if last else size - 1
+    return first, last
+
+
+class FileRange(Response):
+    """206 response for bytes ``first``..``last`` of ``path``, streamed in CHUNK_SIZE pieces."""
+
+    def __init__(self, path: Path, first: int, last: int, headers: dict, media_type: str):
+        self.path = path
+        self.first = first
+        self.last = last
+        self.status_code = 206
+        self.media_type = media_type
+        self.background = None
+        self.init_headers(headers)
+
+    async def __call__(self, scope, receive, send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope["method"].upper() == "HEAD":
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        remaining = self.last - self.first + 1
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(self.first)
+            while remaining > 0:
+                chunk = await file.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+        if remaining > 0:
+            # the file shrank under us: end the body rather than hang the client
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+def _offload_headers(path: Path) -> dict:
+    if FILE_OFFLOAD == "x-accel-redirect":
+        relative = path.resolve().relative_to(UPLOAD_DIR.resolve()).as_posix()
+        return {"X-Accel-Redirect": FILE_OFFLOAD_PREFIX + relative}
+    if FILE_OFFLOAD == "x-sendfile":
+        return {"X-Sendfile": str(path.resolve())}
+    return {}
+
+
+def serve(request: Request, path: Path, filename: str, media_type: str = None,
+          cache_control: str = CV_CACHE_CONTROL) -> Response:
+    """Send ``path`` with validators, Range support and (optionally) proxy offload.
+
+    The media type comes from CV_TYPES (octet-stream for anything else, such
+    as files uploaded before the allow-list); only PDFs open inline.
+    """
+    st = path.stat()
+    tag = etag(st)
+    media_type = media_type or CV_TYPES.get(path.suffix.lower(), "application/octet-stream")
+    disposition = "inline" if media_type in INLINE_TYPES else "attachment"
+    headers = {
+        "ETag": tag,
+        "Last-Modified": formatdate(st.st_mtime, usegmt=True),
+        "Cache-Control": cache_control,
+        "Accept-Ranges": "bytes",
+        "X-Content-Type-Options": "nosniff",
+    }
+    inm = request.headers.get("if-none-match")
+    if inm and (inm.strip() == "*" or tag in [t.strip() for t in inm.split(",")]):
+        return Response(status_code=304, headers=headers)
+
+    response = FileResponse(path, headers=headers, media_type=media_type, filename=filename,
+                            stat_result=st, content_disposition_type=disposition)
+    # legacy files under /static can't be offloaded: the proxy only maps UPLOAD_DIR
+    if FILE_OFFLOAD and UPLOAD_DIR.resolve() in path.resolve().parents:
+        offload = Response(status_code=200, headers={**headers, **_offload_headers(path)}, media_type=response.media_type)
+        offload.headers["content-disposition"] = response.headers["content-disposition"]
+        return offload
+
+    # If-Range: only honour Range when the client's copy is still this version
+    if_range = request.headers.get("if-range")
+    if if_range and if_range.strip() != tag:
+        return response
+    try:
+        span = parse_range(request.headers.get("range"), st.st_size)
+    except ValueError:
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{st.st_size}"})
+    if span is None:
+        return response
+    first, last = span
+    headers.update({
+        "Content-Range": f"bytes {first}-{last}/{st.st_size}",
+        "Content-Length": str(last - first + 1),
+        "Content-Disposition": response.headers["content-disposition"],
+    })
+    return FileRange(path, first, last, headers, response.media_type)
+
+
+# CV bundles
+# ---------------------
+# All the CVs for an internship (or any filtered set of applications) as one
+# ZIP, written straight into the response: each file is read CHUNK_SIZE at a
+# time and every chunk goes out as soon as zipfile has framed it, so memory
+# stays at a chunk however many applicants there are, and nothing touches
+# disk. PDFs don't shrink, so entries are stored, not deflated. A
+# manifest.csv lists every application, including those without a CV.
+
+SLUG_RE = re.compile(r"[^A-Za-z0-9]+")
+
+
+class BundleEntry(NamedTuple):
+    application_id: int
+    student_id: Optional[int]
+    student_name: Optional[str]
+    student_email: Optional[str]
+    internship_id: int
+    internship_title: Optional[str]
+    status: Optional[str]
+    arcname: Optional[str]  # path inside the ZIP, None without a CV
+    path: Optional[Path]
+
+
+def _slug(text: Optional[str], fallback: str) -> str:
+    return SLUG_RE.sub("-", text or "").strip("-")[:60] or fallback
+
+
+def bundle_entries(db: Session, internship_id: int = None, status: str = None,
+                   application_ids: list = None) -> list:
+    """The applications to bundle, in id order, with their CV file paths resolved."""
+    stmt = (
+        select(
+            Application.id, Application.student_id, User.name, User.email, User.cv_url,
+            Application.internship_id, Internship.title, Application.status,
+        )
+        .outerjoin(User, User.id == Application.student_id)
+        .outerjoin(Internship, Internship.id == Application.internship_id)
+        .order_by(Application.id.asc())
+    )
+    if internship_id:
+        stmt = stmt.where(Application.internship_id == internship_id)
+    if status:
+        stmt = stmt.where(func.lower(Application.status) == status.lower())
+    if application_ids:
+        stmt = stmt.where(Application.id.in_(application_ids))
+    entries = []
+    for row in db.execute(stmt).all():
+        path = cv_path(row.student_id, row.cv_url) if row.student_id else None
+        arcname = None
+        if path is not None:
+            folder = f"{row.internship_id}-{_slug(row.title, 'internship')}"
+            arcname = f"{folder}/{row.id}-{_slug(row.name, 'student')}{path.suffix}"
+        entries.append(BundleEntry(
+            row.id, row.student_id, row.name, row.email, row.internship_id, row.title, row.status, arcname, path,
+        ))
+    return entries
+
+
+class _Sink:
+    """Write-only file for zipfile that hands back whatever was written since the last drain."""
+
+    def __init__(self):
+        self._parts = []
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def _manifest(entries: list) -> bytes:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(["application_id", "student_id", "student_name", "student_email",
+                     "internship_id", "internship_title", "status", "file"])
+    for e in entries:
+        writer.writerow([e.application_id, e.student_id, e.student_name or "", e.student_email or "",
+                         e.internship_id, e.internship_title or "", e.status or "", e.arcname or ""])
+    return buf.getvalue().encode("utf-8")
+
+
+def stream_bundle(entries: list, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """ZIP of ``entries``' CVs plus manifest.csv, as a stream of byte chunks."""
+    sink = _Sink()
+    # the sink can't seek, so zipfile writes sizes and CRCs after each file's data
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as zf:
+        zf.writestr("manifest.csv", _manifest(entries))
+        yield sink.drain()
+        for e in entries:
+            if e.path is None:
+                continue
+            try:
+                source = open(e.path, "rb")
+            except OSError:
+                continue  # replaced or removed since the listing: the manifest still names it
+            with source:
+                info = zipfile.ZipInfo.from_file(e.path, e.arcname)
+                with zf.open(info, "w") as dest:
+                    while True:
+                        chunk = source.read(chunk_size)
+                        if not chunk:
+                            break
+                        dest.write(chunk)
+                        yield sink.drain()
+            yield sink.drain()
+    # central directory
+    yield sink.drain()
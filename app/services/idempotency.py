@@ -0,0 +1,41 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+# Idempotency keys for form posts
+# ---------------------
+# Forms carry a one-off key rendered with the page. A replayed post (double
+# click, browser resubmit) with a key we've already handled is answered
+# without touching the database. The database constraints stay the real
+# guard; this only absorbs the burst in front of them.
+
+
+class IdempotencyCache:
+    def __init__(self, maxsize: int = 10000, ttl: float = 600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._keys: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def claim(self, key: Optional[str]) -> bool:
+        """Return True the first time ``key`` is seen, False for a replay."""
+        if not key:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            seen_at = self._keys.get(key)
+            if seen_at is not None and now - seen_at < self.ttl:
+                return False
+            self._keys[key] = now
+            self._keys.move_to_end(key)
+            while len(self._keys) > self.maxsize:
+                self._keys.popitem(last=False)
+        return True
+
+    def release(self, key: Optional[str]) -> None:
+        """Forget ``key`` so a failed request can be retried with it."""
+        if not key:
+            return
+        with self._lock:
+            self._keys.pop(key, None)
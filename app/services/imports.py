@@ -0,0 +1,298 @@
+import csv
+import hashlib
+import io
+import re
+from datetime import date, datetime
+from typing import BinaryIO, Iterator, Optional
+from sqlalchemy import select, insert, func
+from sqlalchemy.exc import IntegrityError
+from app.database.connection import current_db, insert_ignoring_conflicts
+from app.database.models import Department, Internship, InternshipSupervision, User
+
+# Bulk CSV import
+# ---------------------
+# The upload is read as a stream and handled CHUNK_ROWS rows at a time. Per
+# chunk: rows are validated in Python, existing emails / departments /
+# mentors are resolved with one IN query each, and the good rows go in with
+# batched INSERTs in a single transaction. Rejected rows are collected as
+# (line, key, message) for the error report; the rest of the file still
+# imports.
+
+CHUNK_ROWS = 2000
+ROLES = ("student", "mentor", "admin")
+USER_STATUSES = ("active", "inactive")
+INTERNSHIP_STATUSES = ("open", "closed", "draft")
+EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+
+def _hash(password: str) -> str:
+    # same scheme as app/routers/auth.py
+    return hashlib.sha256(password.strip().encode("utf-8")).hexdigest()
+
+
+def _read_csv(fileobj: BinaryIO, result: "ImportResult") -> Iterator[tuple[int, dict]]:
+    """Rows as (line, dict); a file that isn't UTF-8 CSV ends the stream with a file-level error."""
+    # decoded line by line, so a bad byte is reported on its own line
+    lines = (raw.decode("utf-8-sig" if n == 0 else "utf-8") for n, raw in enumerate(fileobj))
+    reader = csv.DictReader(lines)
+    try:
+        reader.fieldnames = [(f or "").strip().lower() for f in (reader.fieldnames or [])]
+        for row in reader:
+            yield reader.line_num, {k: (v or "").strip() for k, v in row.items() if k}
+    except UnicodeDecodeError:
+        result.errors.append((reader.line_num + 1, "", "file is not UTF-8 text; stopped reading here"))
+    except csv.Error as e:
+        result.errors.append((reader.line_num, "", f"unreadable CSV ({e}); stopped reading here"))
+
+
+def _chunks(rows: Iterator, size: int) -> Iterator[list]:
+    chunk = []
+    for item in rows:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _parse_date(value: str):
+    return date.fromisoformat(value) if value else None
+
+
+class ImportResult:
+    def __init__(self):
+        self.created = 0
+        self.errors: list[tuple[int, str, str]] = []
+
+    @property
+    def rejected(self) -> int:
+        return len(self.errors)
+
+    def report_csv(self) -> Iterator[str]:
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(["line", "key", "error"])
+        for err in self.errors:
+            writer.writerow(err)
+            if buf.tell() > 64 * 1024:
+                yield buf.getvalue()
+                buf.seek(0)
+                buf.truncate()
+        yield buf.getvalue()
+
+
+def _resolve_departments(conn, names: set, cache: dict) -> None:
+    """Fill ``cache`` (lower name -> id) for ``names``, creating the missing departments."""
+    missing = {n for n in names if n.lower() not in cache}
+    if not missing:
+        return
+    stmt = select(func.lower(Department.name), Department.id).where(
+        func.lower(Department.name).in_({n.lower() for n in missing})
+    )
+    cache.update(conn.execute(stmt).all())
+    new = {}
+    for n in missing:
+        new.setdefault(n.lower(), n)  # first spelling in the file wins
+    new = [{"name": n} for key, n in new.items() if key not in cache]
+    if new:
+        conn.execute(
+            insert_ignoring_conflicts(Department, conn).values(new).on_conflict_do_nothing()
+        )
+        cache.update(conn.execute(stmt).all())
+
+
+# Users
+# ---------------------
+def _insert_users(bind, rows: list, emails: set, departments: dict, now) -> tuple:
+    """Insert one chunk of validated rows in one transaction; returns (created, errors)."""
+    errors = []
+    with bind.begin() as conn:
+        taken = set(conn.execute(
+            select(func.lower(User.email)).where(func.lower(User.email).in_(emails))
+        ).scalars())
+        _resolve_departments(conn, {r["department"] for _, r, *_ in rows if r.get("department")}, departments)
+
+        values = []
+        for line, r, email, role, password, user_status in rows:
+            if email in taken:
+                errors.append((line, email, "email already exists"))
+                continue
+            dep = r.get("department")
+            values.append({
+                "name": r["name"],
+                "email": email,
+                "password_hash": _hash(password),
+                "role": role,
+                "phone": r.get("phone") or None,
+                "department_id": departments.get(dep.lower()) if dep else None,
+                "status": user_status,
+                "created_at": now,
+            })
+        if values:
+            conn.execute(insert(User), values)
+    return len(values), errors
+
+
+def import_users(
+    fileobj: BinaryIO,
+    default_password: Optional[str] = None,
+    chunk_size: int = CHUNK_ROWS,
+    bind=None,
+) -> ImportResult:
+    """Create users from a CSV with name, email, role and optional password, phone, department.
+
+    Rows without a password get ``default_password``; rows with an email
+    that already exists (case-insensitive) are rejected.
+    """
+    result = ImportResult()
+    departments: dict = {}
+    now = datetime.utcnow()
+    for chunk in _chunks(_read_csv(fileobj, result), chunk_size):
+        rows = []
+        seen = set()
+        for line, r in chunk:
+            email = r.get("email", "").lower()
+            role = (r.get("role") or "student").lower()
+            password = r.get("password") or default_password or ""
+            user_status = (r.get("status") or "active").lower()
+            if not r.get("name"):
+                result.errors.append((line, email, "name is required"))
+            elif not EMAIL_RE.match(email):
+                result.errors.append((line, email, "invalid email"))
+            elif role not in ROLES:
+                result.errors.append((line, email, f"role must be one of {', '.join(ROLES)}"))
+            elif user_status not in USER_STATUSES:
+                result.errors.append((line, email, f"status must be one of {', '.join(USER_STATUSES)}"))
+            elif not password.strip():
+                result.errors.append((line, email, "password is required"))
+            elif email in seen:
+                result.errors.append((line, email, "duplicate email in file"))
+            else:
+                seen.add(email)
+                rows.append((line, r, email, role, password, user_status))
+        if not rows:
+            continue
+
+        try:
+            created, errors = _insert_users(bind or current_db().engine, rows, seen, departments, now)
+        except IntegrityError:
+            # e.g. the same email created by someone else since the check; nothing from this chunk went in
+            departments.clear()
+            errors = [(line, email, "conflicts with a row written meanwhile; import it again")
+                      for line, _, email, *_ in rows]
+            created = 0
+        result.errors.extend(errors)
+        result.created += created
+    result.errors.sort()
+    return result
+
+
+# Internships
+# ---------------------
+def _insert_internships(bind, rows: list, now) -> tuple:
+    """Insert one chunk of validated rows (and their supervisions) in one transaction; returns (created, errors)."""
+    errors = []
+    with bind.begin() as conn:
+        # lower(title) IN (...) walks ix_internships_title_company; the
+        # company and start date are compared on the few rows it returns
+        existing = set(conn.execute(
+            select(func.lower(Internship.title), func.lower(Internship.company), Internship.start_date)
+            .where(func.lower(Internship.title).in_({k[0] for _, _, k, *_ in rows}))
+        ).all())
+        mentor_emails = {r["mentor_email"].lower() for _, r, *_ in rows if r.get("mentor_email")}
+        mentors = dict(conn.execute(
+            select(func.lower(User.email), User.id)
+            .where(func.lower(User.email).in_(mentor_emails), func.lower(User.role) == "mentor")
+        ).all()) if mentor_emails else {}
+
+        values, mentor_for = [], {}
+        for line, r, key, key_text, start, end, slots, internship_status in rows:
+            if key in existing:
+                errors.append((line, key_text, "internship already exists"))
+                continue
+            mentor_email = (r.get("mentor_email") or "").lower()
+            if mentor_email and mentor_email not in mentors:
+                errors.append((line, key_text, f"no mentor with email {mentor_email}"))
+                continue
+            values.append({
+                "title": r["title"],
+                "company": r["company"],
+                "location": r.get("location") or None,
+                "description": r.get("description") or None,
+                "requirements": r.get("requirements") or None,
+                "start_date": start,
+                "end_date": end,
+                "slots": slots,
+                "filled_slots": 0,
+                "status": internship_status,
+                "created_at": now,
+            })
+            mentor_for[key] = mentors.get(mentor_email)
+        if not values:
+            return 0, errors
+        # multi-row INSERT ... RETURNING gives no row order, so the new ids
+        # are matched back to their mentors by the (unique) import key
+        created = conn.execute(
+            insert(Internship).returning(
+                Internship.id, func.lower(Internship.title), func.lower(Internship.company), Internship.start_date
+            ),
+            values,
+        ).all()
+        supervisions = [
+            {"mentor_id": mentor_for[tuple(key)], "internship_id": new_id, "active": True, "created_at": now}
+            for new_id, *key in created if mentor_for.get(tuple(key))
+        ]
+        if supervisions:
+            conn.execute(insert(InternshipSupervision), supervisions)
+        return len(values), errors
+
+
+def import_internships(fileobj: BinaryIO, chunk_size: int = CHUNK_ROWS, bind=None) -> ImportResult:
+    """Create internships from a CSV with title and company, plus optional location,
+    description, requirements, start_date, end_date (YYYY-MM-DD), slots, status
+    and mentor_email (adds an active supervision).
+
+    A row matching an existing internship on title, company and start date
+    (case-insensitive) is rejected as a duplicate.
+    """
+    result = ImportResult()
+    now = datetime.utcnow()
+    for chunk in _chunks(_read_csv(fileobj, result), chunk_size):
+        rows = []
+        seen = set()
+        for line, r in chunk:
+            key_text = f"{r.get('title', '')} @ {r.get('company', '')}"
+            try:
+                start = _parse_date(r.get("start_date", ""))
+                end = _parse_date(r.get("end_date", ""))
+                slots = int(r["slots"]) if r.get("slots") else 0
+            except ValueError:
+                result.errors.append((line, key_text, "bad date (YYYY-MM-DD) or slots value"))
+                continue
+            key = (r.get("title", "").lower(), r.get("company", "").lower(), start)
+            internship_status = (r.get("status") or "open").lower()
+            if not r.get("title") or not r.get("company"):
+                result.errors.append((line, key_text, "title and company are required"))
+            elif internship_status not in INTERNSHIP_STATUSES:
+                result.errors.append((line, key_text, f"status must be one of {', '.join(INTERNSHIP_STATUSES)}"))
+            elif start and end and end < start:
+                result.errors.append((line, key_text, "end_date is before start_date"))
+            elif key in seen:
+                result.errors.append((line, key_text, "duplicate internship in file"))
+            else:
+                seen.add(key)
+                rows.append((line, r, key, key_text, start, end, slots, internship_status))
+        if not rows:
+            continue
+
+        try:
+            created, errors = _insert_internships(bind or current_db().engine, rows, now)
+        except IntegrityError:
+            errors = [(line, key_text, "conflicts with a row written meanwhile; import it again")
+                      for line, _, _, key_text, *_ in rows]
+            created = 0
+        result.errors.extend(errors)
+        result.created += created
+    result.errors.sort()
+    return result
@@ -0,0 +1,39 @@
+from datetime import date
+from sqlalchemy.orm import Session
+from app.services import archive, cvtext, deletes, events, sessions
+from app.services.jobs import handler
+
+# Job handlers
+# ---------------------
+# Slow work the routers hand off to the queue. Payloads are plain JSON.
+
+
+@handler("delete_internship")
+def delete_internship(db: Session, payload: dict) -> None:
+    internship_id = int(payload["internship_id"])
+    events.publish_after_commit(db, events.admin_channel(), "internship", id=internship_id, action="deleted")
+    deletes.delete_internship(db, internship_id)
+
+
+@handler("delete_user")
+def delete_user(db: Session, payload: dict) -> None:
+    user_id = int(payload["user_id"])
+    events.publish_after_commit(db, events.admin_channel(), "user", id=user_id, action="deleted")
+    sessions.invalidate(db, user_id)
+    deletes.delete_user(db, user_id)
+
+
+@handler("archive_internships")
+def archive_internships(db: Session, payload: dict) -> None:
+    cutoff = payload.get("cutoff")
+    archive.archive_finished_internships(cutoff=date.fromisoformat(cutoff) if cutoff else None)
+
+
+@handler("index_cv")
+def index_cv(db: Session, payload: dict) -> None:
+    cvtext.index_students(db, [int(payload["student_id"])])
+
+
+@handler("index_cvs")
+def index_cvs(db: Session, payload: dict) -> None:
+    cvtext.index_students(db)
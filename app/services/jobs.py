@@ -0,0 +1,283 @@
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+from sqlalchemy import select, update, or_, and_
+from sqlalchemy.orm import Session
+from app.database import tenants
+from app.database.connection import current_db
+from app.database.models import Job
+
+# Background job queue
+# ---------------------
+# Jobs live in the `jobs` table of the main database, so there is no broker
+# to run. A worker claims one job at a time with a conditional UPDATE that
+# sets a lease; if the worker dies, the lease runs out and another worker
+# picks the job up again. While a handler runs, a heartbeat thread pushes the
+# lease forward every HEARTBEAT_SECONDS, so a slow job keeps its lease for as
+# long as its worker is alive. Failures are retried with exponential backoff
+# until max_attempts, then left as `failed` with the last traceback.
+#
+# In multi-tenant mode each tenant's file has its own `jobs` table; a worker
+# polls them all in turn (tenants.databases()), running each job bound to
+# the database it was queued in.
+
+LEASE_SECONDS = 60
+HEARTBEAT_SECONDS = LEASE_SECONDS / 3  # renew well before the lease runs out
+POLL_SECONDS = 1.0
+BACKOFF_BASE_SECONDS = 2
+BACKOFF_MAX_SECONDS = 600
+
+HANDLERS: dict[str, Callable[[Session, dict], None]] = {}
+
+
+def handler(kind: str):
+    """Register ``fn(db, payload)`` as the handler for jobs of ``kind``."""
+    def register(fn):
+        HANDLERS[kind] = fn
+        return fn
+    return register
+
+
+def enqueue(
+    db: Session,
+    kind: str,
+    payload: Optional[dict] = None,
+    priority: int = 0,
+    delay_seconds: float = 0,
+    max_attempts: int = 5,
+) -> Job:
+    """Add a job to ``db``'s transaction; it becomes visible when the caller commits."""
+    now = datetime.utcnow()
+    job = Job(
+        kind=kind,
+        payload=json.dumps(payload or {}),
+        priority=priority,
+        status="queued",
+        attempts=0,
+        max_attempts=max_attempts,
+        run_after=now + timedelta(seconds=delay_seconds),
+        created_at=now,
+    )
+    db.add(job)
+    return job
+
+
+def _claimable(now: datetime):
+    return or_(
+        and_(Job.status == "queued", Job.run_after <= now),
+        and_(Job.status == "running", Job.leased_until < now),  # lease expired
+    )
+
+
+def claim(db: Session, worker_id: str, lease_seconds: int = LEASE_SECONDS) -> Optional[Job]:
+    """Lease the most urgent runnable job to ``worker_id``, or return None."""
+    for _ in range(5):
+        now = datetime.utcnow()
+        job_id = db.execute(
+            select(Job.id)
+            .where(_claimable(now))
+            .order_by(Job.priority.desc(), Job.run_after.asc(), Job.id.asc())
+            .limit(1)
+        ).scalar()
+        if job_id is None:
+            db.rollback()
+            return None
+        won = db.execute(
+            update(Job)
+            .where(Job.id == job_id, _claimable(now))
+            .values(
+                status="running",
+                locked_by=worker_id,
+                leased_until=now + timedelta(seconds=lease_seconds),
+                attempts=Job.attempts + 1,
+            ),
+            execution_options={"synchronize_session": False},
+        ).rowcount
+        db.commit()
+        if won:
+            return db.get(Job, job_id, populate_existing=True)
+        # another worker took it between the select and the update; try the next one
+    return None
+
+
+def _finish(db: Session, job_id: int, worker_id: str, attempts: int, max_attempts: int, error: Optional[str]) -> None:
+    now = datetime.utcnow()
+    values = {"leased_until": None, "locked_by": None}
+    if error is None:
+        values.update(status="done", finished_at=now, last_error=None)
+    elif attempts >= (max_attempts or 1):
+        values.update(status="failed", finished_at=now, last_error=error)
+    else:
+        backoff = min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS)
+        values.update(status="queued", run_after=now + timedelta(seconds=backoff), last_error=error)
+    # only the lease holder may settle the job
+    settled = db.execute(
+        update(Job).where(Job.id == job_id, Job.locked_by == worker_id).values(**values),
+        execution_options={"synchronize_session": False},
+    ).rowcount
+    db.commit()
+    if not settled:
+        print(f"[Jobs] Job {job_id} is no longer leased to {worker_id}; dropped its result ({values['status']})")
+
+
+def _renew(database, job_id: int, worker_id: str, lease_seconds: int) -> bool:
+    with database.SessionLocal() as db:
+        renewed = db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.locked_by == worker_id, Job.status == "running")
+            .values(leased_until=datetime.utcnow() + timedelta(seconds=lease_seconds)),
+            execution_options={"synchronize_session": False},
+        ).rowcount
+        db.commit()
+    return renewed == 1
+
+
+@contextmanager
+def _heartbeat(job_id: int, worker_id: str, lease_seconds: int = LEASE_SECONDS):
+    """Keep renewing the lease on ``job_id`` until the block exits."""
+    every = min(HEARTBEAT_SECONDS, lease_seconds / 3)
+    database = current_db()  # the thread below doesn't inherit the tenant binding
+    stop = threading.Event()
+
+    def beat():
+        while not stop.wait(every):
+            try:
+                if not _renew(database, job_id, worker_id, lease_seconds):
+                    print(f"[Jobs] Lost the lease on job {job_id} ({worker_id}); another worker may run it again")
+                    return
+            except Exception:
+                # e.g. the handler holds the write lock; try again next beat
+                traceback.print_exc()
+
+    thread = threading.Thread(target=beat, name=f"job-heartbeat-{job_id}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def run_one(worker_id: str, lease_seconds: int = LEASE_SECONDS) -> bool:
+    """Claim and run a single job from the current database. Returns False when its queue had nothing runnable."""
+    db = current_db().SessionLocal()
+    try:
+        job = claim(db, worker_id, lease_seconds)
+        if job is None:
+            return False
+        job_id, kind, attempts, max_attempts = job.id, job.kind, job.attempts, job.max_attempts
+        payload = json.loads(job.payload or "{}")
+        fn = HANDLERS.get(kind)
+        error = None
+        if fn is None:
+            error = f"no handler registered for {kind!r}"
+        else:
+            try:
+                with _heartbeat(job_id, worker_id, lease_seconds):
+                    fn(db, payload)
+            except Exception:
+                db.rollback()
+                error = traceback.format_exc()
+        _finish(db, job_id, worker_id, attempts, max_attempts, error)
+        return True
+    finally:
+        db.close()
+
+
+def work(worker_id: str, stop: threading.Event, poll_seconds: float = POLL_SECONDS) -> None:
+    while not stop.is_set():
+        busy = False
+        for database in tenants.databases():
+            with tenants.bound(database):
+                try:
+                    busy = run_one(worker_id) or busy
+                except Exception:
+                    # e.g. "database is locked" while claiming; back off and poll again
+                    traceback.print_exc()
+        if not busy:
+            stop.wait(poll_seconds)
+
+
+def _process_main(worker_id: str, stop, poll_seconds: float) -> None:
+    # spawned processes start with an empty registry
+    from app.services import job_handlers  # noqa: F401
+    work(worker_id, stop, poll_seconds)
+
+
+# Worker pool
+# ---------------------
+class WorkerPool:
+    """``size`` workers polling the queue, as threads or as separate processes."""
+
+    def __init__(self, size: int = 1, mode: str = "thread", poll_seconds: float = POLL_SECONDS):
+        if mode not in ("thread", "process"):
+            raise ValueError("mode must be 'thread' or 'process'")
+        self.size = size
+        self.mode = mode
+        self.poll_seconds = poll_seconds
+        self._workers = []
+        self._stop = None
+
+    def start(self) -> None:
+        from app.services import job_handlers  # noqa: F401
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        if self.mode == "thread":
+            self._stop = threading.Event()
+            for n in range(self.size):
+                t = threading.Thread(
+                    target=work, args=(f"{prefix}:t{n}", self._stop, self.poll_seconds),
+                    name=f"job-worker-{n}", daemon=True,
+                )
+                t.start()
+                self._workers.append(t)
+        else:
+            ctx = multiprocessing.get_context("spawn")
+            self._stop = ctx.Event()
+            for n in range(self.size):
+                p = ctx.Process(
+                    target=_process_main, args=(f"{prefix}:p{n}", self._stop, self.poll_seconds),
+                    name=f"job-worker-{n}", daemon=True,
+                )
+                p.start()
+                self._workers.append(p)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        if self._stop is None:
+            return
+        self._stop.set()
+        for w in self._workers:
+            w.join(timeout)
+        self._workers = []
+        self._stop = None
+
+
+def pool_from_env() -> Optional[WorkerPool]:
+    """Pool configured by JOB_WORKERS (0 disables) and JOB_WORKER_MODE."""
+    size = int(os.environ.get("JOB_WORKERS", "1") or 0)
+    if size <= 0:
+        return None
+    return WorkerPool(size=size, mode=os.environ.get("JOB_WORKER_MODE", "thread"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run background job workers without the web app.")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--mode", choices=("thread", "process"), default="thread")
+    parser.add_argument("--poll", type=float, default=POLL_SECONDS)
+    args = parser.parse_args()
+    pool = WorkerPool(size=args.workers, mode=args.mode, poll_seconds=args.poll)
+    pool.start()
+    print(f"[Jobs] {args.workers} {args.mode} worker(s) running; Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pool.stop()
@@ -0,0 +1,125 @@
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from sqlalchemy.orm import Session
+from app.database.connection import BASE_DIR
+
+# Database maintenance
+# ---------------------
+# Jobs for app/services/scheduler.py that keep a SQLite file healthy:
+# planner statistics (PRAGMA optimize, ANALYZE), WAL checkpoints, returning
+# free pages to the filesystem, and online backups.
+#
+# Backups go through SQLite's backup API, BACKUP_PAGES pages per step with a
+# short sleep in between. The source connection holds one read transaction
+# for the whole copy: in WAL mode that is a fixed snapshot, so writers carry
+# on meanwhile and their commits don't make SQLite restart the copy (which,
+# step by step with fresh snapshots, it would do after every write). The
+# copy is written to a .part file and renamed when complete, so BACKUP_DIR
+# only ever holds whole backups.
+
+BACKUP_DIR = Path(os.environ.get("BACKUP_DIR", str(BASE_DIR / "backups")))
+BACKUP_PAGES = int(os.environ.get("BACKUP_PAGES", "256"))
+BACKUP_SLEEP = float(os.environ.get("BACKUP_SLEEP", "0.005"))
+BACKUP_KEEP = int(os.environ.get("BACKUP_KEEP", "7"))
+VACUUM_PAGES = 2000  # freelist pages released per incremental vacuum run
+
+
+def _run(db: Session, sql: str) -> list:
+    result = db.connection().exec_driver_sql(sql)
+    rows = result.fetchall() if result.returns_rows else []
+    db.commit()
+    return rows
+
+
+def optimize(db: Session) -> int:
+    """PRAGMA optimize: re-analyze only the tables whose statistics have gone stale."""
+    _run(db, "PRAGMA optimize")
+    return 0
+
+
+def analyze(db: Session) -> int:
+    """Full ANALYZE; returns the number of indexes with statistics."""
+    _run(db, "ANALYZE")
+    return len(_run(db, "SELECT DISTINCT idx FROM sqlite_stat1 WHERE idx IS NOT NULL"))
+
+
+def wal_checkpoint(db: Session, mode: str = "PASSIVE") -> int:
+    """Copy WAL frames back into the database file; returns frames checkpointed.
+
+    PASSIVE never waits for readers or writers; TRUNCATE also empties the WAL
+    file but waits for readers to finish, so it belongs in an off-peak window.
+    """
+    rows = _run(db, f"PRAGMA wal_checkpoint({mode})")
+    busy, log_frames, checkpointed = rows[0] if rows else (0, 0, 0)
+    return max(checkpointed, 0)
+
+
+def truncate_wal(db: Session) -> int:
+    return wal_checkpoint(db, "TRUNCATE")
+
+
+def incremental_vacuum(db: Session, pages: int = VACUUM_PAGES) -> int:
+    """Release up to ``pages`` free pages; files without auto_vacuum=INCREMENTAL are skipped.
+
+    New database files get auto_vacuum=INCREMENTAL (see connection.py);
+    older ones keep auto_vacuum=NONE until a one-off `VACUUM` converts them.
+    """
+    if _run(db, "PRAGMA auto_vacuum")[0][0] != 2:
+        return 0
+    before = _run(db, "PRAGMA freelist_count")[0][0]
+    _run(db, f"PRAGMA incremental_vacuum({int(pages)})")
+    return before - _run(db, "PRAGMA freelist_count")[0][0]
+
+
+# Online backup
+# ---------------------
+def backup_path(source: Path, when: datetime = None) -> Path:
+    when = when or datetime.utcnow()
+    return BACKUP_DIR / f"{source.stem}-{when.strftime('%Y%m%d-%H%M%S')}.db"
+
+
+def backup(db: Session, pages: int = BACKUP_PAGES, sleep: float = BACKUP_SLEEP) -> int:
+    """Copy the session's database to BACKUP_DIR; returns the pages copied."""
+    bind = db.get_bind()
+    source = Path(bind.url.database)
+    BACKUP_DIR.mkdir(parents=True, exist_ok=True)
+    target = backup_path(source)
+    part = target.with_suffix(".part")
+    progress = {"pages": 0}
+
+    def step(status, remaining, total):
+        progress["pages"] = total
+
+    raw = bind.raw_connection()
+    try:
+        source_conn = raw.driver_connection
+        source_conn.execute("BEGIN")
+        source_conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()  # takes the snapshot
+        dest = sqlite3.connect(part)
+        try:
+            source_conn.backup(dest, pages=pages, progress=step, sleep=sleep)
+        finally:
+            dest.close()
+            source_conn.rollback()
+    finally:
+        raw.close()
+    os.replace(part, target)
+    prune_backups(source)
+    return progress["pages"]
+
+
+def prune_backups(source: Path, keep: int = BACKUP_KEEP) -> list:
+    """Delete all but the newest ``keep`` backups of ``source``."""
+    files = list_backups(source)
+    for old in files[keep:]:
+        old.unlink(missing_ok=True)
+    return files[keep:]
+
+
+def list_backups(source: Path) -> list:
+    """Backups of ``source``, newest first."""
+    if not BACKUP_DIR.exists():
+        return []
+    return sorted(BACKUP_DIR.glob(f"{source.stem}-????????-??????.db"), key=lambda p: p.name, reverse=True)
@@ -0,0 +1,88 @@
+from datetime import datetime
+from typing import Iterable, Optional
+from sqlalchemy import select, insert, update
+from sqlalchemy.orm import Session
+from app.database.models import Notification, User
+from app.services import events
+
+# In-app notifications
+# ---------------------
+# Producers build plain row dicts and hand them to notify(), which writes
+# them with multi-row INSERTs inside the caller's transaction. The unread
+# badge reads users.unread_notifications, which triggers on the
+# notifications table keep in step (see app/database/schema.py), so it never
+# has to count rows.
+
+INSERT_CHUNK = 150  # rows per INSERT; 6 columns stays under the 999 bound-parameter limit of older SQLite builds
+PAGE_SIZE = 20
+
+
+def message(
+    user_id: int,
+    title: str,
+    body: Optional[str] = None,
+    type: Optional[str] = None,
+    task_id: Optional[int] = None,
+    now: Optional[datetime] = None,
+) -> dict:
+    return {
+        "user_id": user_id,
+        "title": title,
+        "body": body,
+        "type": type,
+        "task_id": task_id,
+        "created_at": now or datetime.utcnow(),
+    }
+
+
+def notify(db: Session, messages: Iterable[dict]) -> int:
+    """Queue ``messages`` (see :func:`message`) in ``db``'s transaction; the caller commits."""
+    rows = [m for m in messages if m.get("user_id") is not None]
+    for start in range(0, len(rows), INSERT_CHUNK):
+        db.execute(insert(Notification).values(rows[start:start + INSERT_CHUNK]))
+    for m in rows:
+        events.publish_after_commit(
+            db, events.user_channel(m["user_id"]), "notification", title=m["title"], body=m.get("body")
+        )
+    return len(rows)
+
+
+def unread_count(db: Session, user_id: int) -> int:
+    n = db.execute(select(User.unread_notifications).where(User.id == user_id)).scalar()
+    return max(n or 0, 0)
+
+
+def mark_read(db: Session, user_id: int, notification_ids: Optional[Iterable[int]] = None) -> int:
+    """Mark the given notifications of ``user_id`` read, or all of them when no ids are given."""
+    stmt = (
+        update(Notification)
+        .where(Notification.user_id == user_id, Notification.read_at.is_(None))
+        .values(read_at=datetime.utcnow())
+    )
+    if notification_ids is not None:
+        ids = {int(i) for i in notification_ids}
+        if not ids:
+            return 0
+        stmt = stmt.where(Notification.id.in_(ids))
+    try:
+        n = db.execute(stmt, execution_options={"synchronize_session": False}).rowcount
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return n
+
+
+def parse_cursor(cursor: Optional[str]) -> Optional[tuple]:
+    # "<created_at iso>_<id>" of the last row on the previous page
+    if not cursor:
+        return None
+    try:
+        ts, _, nid = cursor.rpartition("_")
+        return datetime.fromisoformat(ts), int(nid)
+    except ValueError:
+        return None
+
+
+def make_cursor(created_at: Optional[datetime], notification_id: int) -> str:
+    return f"{(created_at or datetime.min).isoformat()}_{notification_id}"
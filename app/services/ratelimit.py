@@ -0,0 +1,184 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+from fastapi import Form
+from app.database.connection import BASE_DIR, current_db
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-memory backend
+    fcntl = None
+
+# Rate limiting
+# ---------------------
+# Token buckets keyed by "<limit>:<ip>" or "<limit>:<tenant>:<account>" (the
+# same email at two institutions is two accounts). A bucket holds up to
+# `burst` tokens and refills at `per_second`; each attempt takes one.
+# Per-IP limits run in RateLimitMiddleware, before routing, so a rejected
+# request never opens a session or touches the database. Per-account limits
+# run as a dependency on the form routes, still ahead of the user lookup.
+#
+# RATE_LIMIT_BACKEND=memory keeps buckets per process. RATE_LIMIT_BACKEND=file
+# shares them between workers through a fixed-size mmap'd file: keys hash to
+# a slot, each slot is locked on its own byte range, and two keys landing in
+# one slot just share a bucket (stricter, never looser).
+
+
+class Limit(NamedTuple):
+    burst: int
+    per_second: float
+
+
+def parse_limit(text: str) -> Limit:
+    """"10/60" -> 10 attempts, refilled over 60 seconds."""
+    count, seconds = text.split("/")
+    return Limit(int(count), int(count) / float(seconds))
+
+
+# name -> limit; override with RATE_LIMITS="login_ip=20/60,signup_ip=3/3600"
+LIMITS = {
+    "login_ip": parse_limit("20/60"),
+    "login_account": parse_limit("5/60"),
+    "signup_ip": parse_limit("5/600"),
+}
+for _item in filter(None, os.environ.get("RATE_LIMITS", "").split(",")):
+    _name, _, _value = _item.partition("=")
+    LIMITS[_name.strip()] = parse_limit(_value.strip())
+
+# (method, path) -> per-IP limit checked by the middleware
+ROUTE_LIMITS = {
+    ("POST", "/login"): "login_ip",
+    ("POST", "/signup"): "signup_ip",
+}
+
+TRUST_PROXY = os.environ.get("RATE_LIMIT_TRUST_PROXY", "0") == "1"
+SLOT = struct.Struct("dd")  # tokens, last refill (unix time)
+
+
+def _take(tokens: float, stamp: float, limit: Limit, now: float):
+    """Refill and try to take one token: (allowed, tokens, retry_after)."""
+    if stamp == 0:
+        tokens = limit.burst  # never seen: a full bucket
+    else:
+        tokens = min(limit.burst, tokens + (now - stamp) * limit.per_second)
+    if tokens >= 1:
+        return True, tokens - 1, 0.0
+    return False, tokens, (1 - tokens) / limit.per_second
+
+
+class MemoryBackend:
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, limit: Limit, now: float):
+        with self._lock:
+            tokens, stamp = self._buckets.pop(key, (0.0, 0.0))
+            allowed, tokens, retry = _take(tokens, stamp, limit, now)
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, retry
+
+
+class FileBackend:
+    def __init__(self, path=BASE_DIR / "ratelimit.bin", slots: int = 1 << 16):
+        self.slots = slots
+        size = slots * SLOT.size
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        if os.fstat(self._fd).st_size < size:
+            os.ftruncate(self._fd, size)  # zero-filled: every bucket starts full
+        self._map = mmap.mmap(self._fd, size)
+        # fcntl locks don't exclude threads of one process, so stripe thread locks too
+        self._locks = [threading.Lock() for _ in range(64)]
+
+    def hit(self, key: str, limit: Limit, now: float):
+        slot = int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big") % self.slots
+        offset = slot * SLOT.size
+        with self._locks[slot % len(self._locks)]:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, SLOT.size, offset)
+            try:
+                tokens, stamp = SLOT.unpack_from(self._map, offset)
+                allowed, tokens, retry = _take(tokens, stamp, limit, now)
+                SLOT.pack_into(self._map, offset, tokens, now)
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, SLOT.size, offset)
+        return allowed, retry
+
+
+def backend_from_env():
+    if os.environ.get("RATE_LIMIT_BACKEND", "memory") == "file" and fcntl is not None:
+        return FileBackend(os.environ.get("RATE_LIMIT_FILE", str(BASE_DIR / "ratelimit.bin")))
+    return MemoryBackend()
+
+
+backend = backend_from_env()
+
+
+class RateLimited(Exception):
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+
+
+def check(limit_name: str, subject: str) -> None:
+    """Take a token for ``subject`` under ``limit_name``; raise RateLimited when empty."""
+    limit = LIMITS.get(limit_name)
+    if limit is None:
+        return
+    allowed, retry = backend.hit(f"{limit_name}:{subject}", limit, time.time())
+    if not allowed:
+        raise RateLimited(retry)
+
+
+def too_many(retry_after: float) -> tuple[int, list, bytes]:
+    seconds = max(1, int(retry_after + 0.999))
+    body = json.dumps({"detail": f"Too many attempts. Try again in {seconds} seconds."}).encode("utf-8")
+    headers = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode("ascii")),
+        (b"retry-after", str(seconds).encode("ascii")),
+    ]
+    return 429, headers, body
+
+
+def client_ip(scope) -> str:
+    if TRUST_PROXY:
+        for name, value in scope.get("headers", ()):
+            if name == b"x-forwarded-for":
+                return value.decode("latin-1").split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+class RateLimitMiddleware:
+    """Per-IP limits from ROUTE_LIMITS, answered before the app sees the request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            name = ROUTE_LIMITS.get((scope["method"], scope["path"]))
+            if name:
+                try:
+                    check(name, client_ip(scope))
+                except RateLimited as e:
+                    status, headers, body = too_many(e.retry_after)
+                    await send({"type": "http.response.start", "status": status, "headers": headers})
+                    await send({"type": "http.response.body", "body": body})
+                    return
+        await self.app(scope, receive, send)
+
+
+def limit_account(limit_name: str):
+    """Dependency for form routes: one token per attempt on the submitted email at the current tenant."""
+    def dependency(email: str = Form("")) -> None:
+        check(limit_name, f"{current_db().name}:{(email or '').strip().lower()}")
+    return dependency
@@ -0,0 +1,180 @@
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import NamedTuple, Optional
+from sqlalchemy import event, select
+from sqlalchemy.engine import Engine
+from app.database.connection import current_db
+from app.database.read_models import DepartmentRow
+from app.database.models import Department, User
+from app.services import events
+
+# Reference data
+# ---------------------
+# Departments and the user pick-list (id, name, role) change rarely but are
+# read on every dashboard and form. They are loaded once into an immutable
+# snapshot and served from memory, typeahead included.
+#
+# There is one snapshot per database (tenant), tagged with a version. Any
+# committed INSERT, UPDATE or DELETE on `users` or `departments` through this
+# process's engines bumps that database's version, so the next read
+# reloads; the bump is also published on the event hub so other processes
+# drop theirs. CACHE_TTL is only a backstop for writes nobody announced
+# (another tool on the same database file).
+
+CACHE_TTL = 300
+LOOKUP_LIMIT = 10
+MAX_LOOKUP_LIMIT = 50
+CHANNEL = "refdata"
+TABLES = ("users", "departments")
+
+
+class UserPick(NamedTuple):
+    id: int
+    name: str
+    role: str
+
+
+# Version
+# ---------------------
+_versions: dict = defaultdict(int)  # database name -> version
+_version_lock = threading.Lock()
+_WRITE_RE = re.compile(
+    r'\s*(?:INSERT(?:\s+OR\s+\w+)?\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM|REPLACE\s+INTO)\s+"?(\w+)',
+    re.IGNORECASE,
+)
+
+
+def bump(database: str) -> None:
+    """Mark ``database``'s cached reference data stale in this process."""
+    with _version_lock:
+        _versions[database] += 1
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _note_write(conn, cursor, statement, parameters, context, executemany):
+    m = _WRITE_RE.match(statement)
+    if m and m.group(1).lower() in TABLES:
+        conn.info["refdata_written"] = True
+
+
+def _committed(conn) -> None:
+    database = conn.info.get("database")
+    if conn.info.pop("refdata_written", False) and database:
+        bump(database)
+        try:
+            events.hub.publish(CHANNEL, {"type": "invalidate", "database": database})
+        except Exception as e:
+            print("Failed to publish refdata invalidation:", e)
+
+
+event.listen(Engine, "commit", _committed)
+event.listen(Engine, "rollback", lambda conn: conn.info.pop("refdata_written", None))
+events.hub.listen(CHANNEL, lambda payload: bump(payload.get("database")))
+
+
+# Snapshot
+# ---------------------
+class _Snapshot(NamedTuple):
+    version: int
+    expires: float
+    departments: tuple  # DepartmentRow, by name
+    department_ids: dict  # lower(name) -> id
+    users: tuple  # UserPick, by name
+    by_id: dict  # id -> UserPick
+    tokens: list  # sorted (lower name word, index into users)
+
+
+def _load(database, version: int) -> _Snapshot:
+    with database.engine.connect() as conn:
+        deps = conn.execute(select(Department.id, Department.name).order_by(Department.name.asc())).all()
+        users = conn.execute(select(User.id, User.name, User.role).order_by(User.name.asc(), User.id.asc())).all()
+    departments = tuple(DepartmentRow(d.id, d.name) for d in deps)
+    picks = tuple(UserPick(u.id, u.name or "", (u.role or "").lower()) for u in users)
+    tokens = sorted(
+        (word, i) for i, p in enumerate(picks) for word in set(p.name.lower().split())
+    )
+    return _Snapshot(
+        version=version,
+        expires=time.monotonic() + CACHE_TTL,
+        departments=departments,
+        department_ids={(d.name or "").lower(): d.id for d in departments},
+        users=picks,
+        by_id={p.id: p for p in picks},
+        tokens=tokens,
+    )
+
+
+class RefData:
+    def __init__(self):
+        self._snaps: dict = {}  # database name -> _Snapshot
+        self._lock = threading.Lock()
+
+    def _fresh(self, snap: Optional[_Snapshot], version: int) -> bool:
+        return snap is not None and snap.version == version and snap.expires > time.monotonic()
+
+    def snapshot(self) -> _Snapshot:
+        database = current_db()
+        snap = self._snaps.get(database.name)
+        if self._fresh(snap, _versions[database.name]):
+            return snap
+        # one loader at a time; the others wait and take its result
+        with self._lock:
+            snap = self._snaps.get(database.name)
+            version = _versions[database.name]
+            if not self._fresh(snap, version):
+                # read the version first: a write committed while loading forces another reload
+                snap = self._snaps[database.name] = _load(database, version)
+            return snap
+
+    def clear(self) -> None:
+        self._snaps.clear()
+
+    def departments(self) -> tuple:
+        return self.snapshot().departments
+
+    def department_id(self, name: str) -> Optional[int]:
+        """Id of the department called ``name`` (case-insensitive), or None."""
+        return self.snapshot().department_ids.get((name or "").strip().lower())
+
+    def user(self, user_id: int) -> Optional[UserPick]:
+        return self.snapshot().by_id.get(user_id)
+
+    def users(self, role: Optional[str] = None) -> list:
+        picks = self.snapshot().users
+        return [p for p in picks if p.role == role] if role else list(picks)
+
+    def lookup_users(self, q: str, role: Optional[str] = None, limit: int = LOOKUP_LIMIT) -> list:
+        """Typeahead: users whose id is ``q`` or one of whose name words starts with it."""
+        q = (q or "").strip().lower()
+        if not q:
+            return []
+        snap = self.snapshot()
+        out, seen = [], set()
+        if q.isdigit():
+            pick = snap.by_id.get(int(q))
+            if pick and (not role or pick.role == role):
+                out.append(pick)
+                seen.add(pick.id)
+        first = q.split()[0]
+        rest = q.split()[1:]
+        i = bisect_left(snap.tokens, (first,))
+        while i < len(snap.tokens) and len(out) < limit:
+            word, idx = snap.tokens[i]
+            if not word.startswith(first):
+                break
+            pick = snap.users[idx]
+            i += 1
+            if pick.id in seen or (role and pick.role != role):
+                continue
+            # "jane do" matches "Jane Doe": later words narrow the hit
+            name = pick.name.lower()
+            if all(w in name for w in rest):
+                out.append(pick)
+                seen.add(pick.id)
+        return sorted(out, key=lambda p: (p.name.lower(), p.id))
+
+
+refdata = RefData()
@@ -0,0 +1,245 @@
+import argparse
+import os
+import threading
+import time
+import traceback
+from datetime import date, datetime, time as clock, timedelta
+from typing import Callable, Optional
+from sqlalchemy import String, select, update, insert, func, literal, cast, and_, exists
+from sqlalchemy.orm import Session
+from app.database import tenants
+from app.database.connection import current_db
+from app.database.models import Notification, SchedulerRun, Task
+from app.services import maintenance
+from app.services.changes import compact_changes
+
+# Periodic maintenance
+# ---------------------
+# Set-based jobs that keep derived task state stored instead of worked out on
+# every dashboard render, plus housekeeping such as change log compaction.
+# Each run is recorded in `scheduler_runs` with its duration and row count.
+# Every job is safe to run twice, so a second app process with its own
+# scheduler does no harm.
+#
+# Jobs listed in OFF_PEAK (statistics, vacuum, backups) only start inside
+# MAINTENANCE_WINDOW, local time, e.g. "02:00-05:00". They run once per
+# window occurrence rather than drifting a little later every day.
+#
+# In multi-tenant mode every tenant's file is its own database with its own
+# run history; each tick goes through them all (tenants.databases()).
+
+TICK_SECONDS = 30
+MAINTENANCE_WINDOW = os.environ.get("MAINTENANCE_WINDOW", "02:00-05:00")
+REMINDER_DAYS = 2
+OPEN_TASK_STATUSES = ("assigned", "in_progress")
+
+
+def mark_overdue_tasks(db: Session, today: Optional[date] = None) -> int:
+    """Flag every open task whose due date has passed as ``overdue``."""
+    today = today or date.today()
+    result = db.execute(
+        update(Task)
+        .where(
+            Task.due_date.is_not(None),
+            Task.due_date < today,
+            func.coalesce(Task.status, "assigned").in_(OPEN_TASK_STATUSES),
+        )
+        .values(status="overdue"),
+        execution_options={"synchronize_session": False},
+    )
+    db.commit()
+    return result.rowcount
+
+
+def create_deadline_reminders(db: Session, days: int = REMINDER_DAYS, today: Optional[date] = None) -> int:
+    """Notify students of open tasks due within ``days``; one reminder per task."""
+    today = today or date.today()
+    already_sent = exists().where(
+        Notification.task_id == Task.id,
+        Notification.type == "deadline_reminder",
+    )
+    due_soon = (
+        select(
+            Task.student_id,
+            literal("Task due soon"),
+            literal("'") + Task.title + "' is due on " + cast(Task.due_date, String),
+            literal("deadline_reminder"),
+            Task.id,
+            literal(datetime.utcnow()),
+        )
+        .where(
+            and_(Task.due_date >= today, Task.due_date <= today + timedelta(days=days)),
+            func.coalesce(Task.status, "assigned").in_(OPEN_TASK_STATUSES),
+            ~already_sent,
+        )
+    )
+    result = db.execute(
+        insert(Notification).from_select(
+            ["user_id", "title", "body", "type", "task_id", "created_at"], due_soon
+        )
+    )
+    db.commit()
+    return result.rowcount
+
+
+# name -> (interval in seconds, fn(db) returning rows affected)
+JOBS: dict[str, tuple[int, Callable[[Session], int]]] = {
+    "mark_overdue_tasks": (15 * 60, mark_overdue_tasks),
+    "deadline_reminders": (60 * 60, create_deadline_reminders),
+    "compact_changes": (24 * 60 * 60, compact_changes),
+    "wal_checkpoint": (5 * 60, maintenance.wal_checkpoint),
+    "optimize": (24 * 60 * 60, maintenance.optimize),
+    "analyze": (7 * 24 * 60 * 60, maintenance.analyze),
+    "truncate_wal": (24 * 60 * 60, maintenance.truncate_wal),
+    "incremental_vacuum": (24 * 60 * 60, maintenance.incremental_vacuum),
+    "backup": (int(os.environ.get("BACKUP_INTERVAL", 24 * 60 * 60)), maintenance.backup),
+}
+OFF_PEAK = {"optimize", "analyze", "truncate_wal", "incremental_vacuum", "backup"}
+
+
+def parse_window(text: str) -> tuple[clock, clock]:
+    """"02:00-05:00" -> (02:00, 05:00); the end may be past midnight ("23:00-04:00")."""
+    start, end = (clock.fromisoformat(part.strip()) for part in text.split("-"))
+    return start, end
+
+
+def in_window(now: datetime, window: tuple[clock, clock]) -> bool:
+    start, end = window
+    t = now.time()
+    return start <= t < end if start <= end else (t >= start or t < end)
+
+
+def window_seconds(window: tuple[clock, clock]) -> int:
+    start, end = window
+    seconds = (end.hour * 3600 + end.minute * 60) - (start.hour * 3600 + start.minute * 60)
+    return seconds if seconds > 0 else seconds + 24 * 3600
+
+
+def run_job(name: str) -> SchedulerRun:
+    """Run one scheduled job now on the current database and record it in its run history."""
+    _, fn = JOBS[name]
+    db = current_db().SessionLocal()
+    try:
+        started = datetime.utcnow()
+        t0 = time.perf_counter()
+        rows, status, error = None, "ok", None
+        try:
+            rows = fn(db)
+        except Exception:
+            db.rollback()
+            status, error = "error", traceback.format_exc()
+        run = SchedulerRun(
+            job=name,
+            started_at=started,
+            finished_at=datetime.utcnow(),
+            duration_ms=int((time.perf_counter() - t0) * 1000),
+            rows_affected=rows,
+            status=status,
+            error=error,
+        )
+        db.add(run)
+        db.commit()
+        db.refresh(run)
+        db.expunge(run)
+        return run
+    finally:
+        db.close()
+
+
+def due_jobs(db: Session, now: Optional[datetime] = None, local_now: Optional[datetime] = None) -> list:
+    """Names of jobs whose last recorded run is older than their interval."""
+    now = now or datetime.utcnow()
+    local_now = local_now or datetime.now()
+    window = parse_window(MAINTENANCE_WINDOW)
+    off_peak = in_window(local_now, window)
+    last = dict(db.execute(
+        select(SchedulerRun.job, func.max(SchedulerRun.started_at)).group_by(SchedulerRun.job)
+    ).all())
+    due = []
+    for name, (interval, _) in JOBS.items():
+        if name in OFF_PEAK:
+            if not off_peak:
+                continue
+            # a run early in the previous occurrence must not push this one out of the window
+            if interval > window_seconds(window):
+                interval -= window_seconds(window)
+        if last.get(name) is None or last[name] <= now - timedelta(seconds=interval):
+            due.append(name)
+    return due
+
+
+def run_due() -> list:
+    """Run whatever is due, database by database."""
+    runs = []
+    for database in tenants.databases():
+        with tenants.bound(database):
+            db = database.SessionLocal()
+            try:
+                names = due_jobs(db)
+            finally:
+                db.close()
+            runs.extend(run_job(name) for name in names)
+    return runs
+
+
+def run_everywhere(name: str) -> list:
+    runs = []
+    for database in tenants.databases():
+        with tenants.bound(database):
+            runs.append(run_job(name))
+    return runs
+
+
+def recent_runs(db: Session, limit: int = 20, jobs: Optional[list] = None) -> list:
+    stmt = select(SchedulerRun).order_by(SchedulerRun.started_at.desc()).limit(limit)
+    if jobs:
+        stmt = stmt.where(SchedulerRun.job.in_(jobs))
+    return list(db.scalars(stmt))
+
+
+# Scheduler thread
+# ---------------------
+class Scheduler:
+    """Checks every ``tick_seconds`` for jobs that are due and runs them in turn."""
+
+    def __init__(self, tick_seconds: float = TICK_SECONDS):
+        self.tick_seconds = tick_seconds
+        self._stop = None
+        self._thread = None
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                run_due()
+            except Exception:
+                traceback.print_exc()
+            self._stop.wait(self.tick_seconds)
+
+    def start(self) -> None:
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        if self._stop is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._stop = None
+        self._thread = None
+
+
+def scheduler_from_env() -> Optional[Scheduler]:
+    """Scheduler unless SCHEDULER_ENABLED=0; SCHEDULER_TICK sets the poll interval."""
+    if os.environ.get("SCHEDULER_ENABLED", "1") == "0":
+        return None
+    return Scheduler(tick_seconds=float(os.environ.get("SCHEDULER_TICK", TICK_SECONDS)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run scheduled maintenance jobs.")
+    parser.add_argument("jobs", nargs="*", help="job names to run now (default: whatever is due)")
+    args = parser.parse_args()
+    runs = [run for name in args.jobs for run in run_everywhere(name)] if args.jobs else run_due()
+    for run in runs:
+        print(f"{run.job}: {run.status}, {run.rows_affected} row(s) in {run.duration_ms} ms")
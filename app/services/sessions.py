@@ -0,0 +1,191 @@
+import base64
+import hashlib
+import hmac
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+from fastapi import Request
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.database.connection import BASE_DIR, current_db
+from app.database.models import User
+from app.services import events
+
+# Sessions
+# ---------------------
+# Login sets a signed cookie "<user id>.<issued at>.<mac>". A request is
+# authorised from the cookie and a cached Principal (id, role, department),
+# so the hot path costs no database query. The MAC also covers the user's
+# `stamp`, derived from the password hash and created_at: a password change,
+# or a new user that reuses a deleted user's id, invalidates old cookies.
+#
+# With tenants (app/database/tenants.py) the MAC and the cache key also
+# include the database name, so a cookie only works on the tenant that
+# issued it. Cached principals live for CACHE_TTL seconds. Changes to a user call
+# invalidate(), which drops the entry here at once and, through the event hub,
+# in every other process after the commit.
+
+COOKIE_NAME = "ims_session"
+MAX_AGE = int(os.environ.get("SESSION_MAX_AGE", str(7 * 24 * 3600)))
+COOKIE_SECURE = os.environ.get("SESSION_COOKIE_SECURE", "0") == "1"
+CACHE_SIZE = 4096
+CACHE_TTL = 300
+SECRET_PATH = BASE_DIR / ".session_secret"
+CHANNEL = "sessions"
+
+
+def _load_secret() -> bytes:
+    if os.environ.get("SESSION_SECRET"):
+        return os.environ["SESSION_SECRET"].encode("utf-8")
+    # first process to start writes it; every worker then signs with the same key
+    try:
+        fd = os.open(SECRET_PATH, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        return SECRET_PATH.read_bytes().strip()
+    key = base64.urlsafe_b64encode(os.urandom(32))
+    try:
+        os.write(fd, key)
+    finally:
+        os.close(fd)
+    return key
+
+
+SECRET = _load_secret()
+
+
+class Principal(NamedTuple):
+    id: int
+    role: str
+    department_id: Optional[int]
+    stamp: str
+
+
+class NotAuthenticated(Exception):
+    """No valid session, or the session's role isn't allowed here."""
+
+    def __init__(self, forbidden: bool = False):
+        self.forbidden = forbidden
+
+
+# Principal cache
+# ---------------------
+class PrincipalCache:
+    def __init__(self, size: int = CACHE_SIZE, ttl: float = CACHE_TTL):
+        self.size = size
+        self.ttl = ttl
+        self._items: OrderedDict = OrderedDict()  # (database, user id) -> (expires, Principal or None)
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> Optional[Principal]:
+        key = (current_db().name, user_id)
+        now = time.monotonic()
+        with self._lock:
+            hit = self._items.get(key)
+            if hit and hit[0] > now:
+                self._items.move_to_end(key)
+                return hit[1]
+        principal = load_principal(user_id)
+        with self._lock:
+            # deleted users are cached too (as None), so a stale cookie can't force a query per request
+            self._items[key] = (now + self.ttl, principal)
+            self._items.move_to_end(key)
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+        return principal
+
+    def invalidate(self, database: str, user_id: int) -> None:
+        with self._lock:
+            self._items.pop((database, user_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+def _stamp(password_hash, created_at) -> str:
+    return hashlib.sha256(f"{password_hash}|{created_at}".encode("utf-8")).hexdigest()[:16]
+
+
+def load_principal(user_id: int) -> Optional[Principal]:
+    with current_db().engine.connect() as conn:
+        row = conn.execute(
+            select(User.id, User.role, User.department_id, User.password_hash, User.created_at)
+            .where(User.id == user_id)
+        ).first()
+    if row is None:
+        return None
+    return Principal(row.id, (row.role or "").lower(), row.department_id, _stamp(row.password_hash, row.created_at))
+
+
+principals = PrincipalCache()
+events.hub.listen(CHANNEL, lambda payload: principals.invalidate(payload.get("database"), payload.get("user_id")))
+
+
+def invalidate(db: Session, user_id: int) -> None:
+    """Forget the cached principal for ``user_id``, here now and everywhere once ``db`` commits."""
+    database = db.info.get("database") or current_db().name
+    principals.invalidate(database, user_id)
+    events.publish_after_commit(db, CHANNEL, "invalidate", database=database, user_id=user_id)
+
+
+# Cookies
+# ---------------------
+def _mac(user_id: int, issued: int, stamp: str) -> str:
+    msg = f"{current_db().name}.{user_id}.{issued}.{stamp}".encode("utf-8")
+    digest = hmac.new(SECRET, msg, hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode("ascii")
+
+
+def issue(response, user_id: int) -> bool:
+    """Start a session for ``user_id`` on ``response``; False, and no cookie, if the user doesn't exist."""
+    # read the user afresh: the cache may still hold None for a deleted user whose id was reused
+    principals.invalidate(current_db().name, user_id)
+    principal = principals.get(user_id)
+    if principal is None:
+        return False
+    issued = int(time.time())
+    token = f"{user_id}.{issued}.{_mac(user_id, issued, principal.stamp)}"
+    response.set_cookie(
+        COOKIE_NAME, token, max_age=MAX_AGE, httponly=True, samesite="lax", secure=COOKIE_SECURE,
+    )
+    return True
+
+
+def clear(response) -> None:
+    response.delete_cookie(COOKIE_NAME, httponly=True, samesite="lax", secure=COOKIE_SECURE)
+
+
+def resolve(token: Optional[str]) -> Optional[Principal]:
+    try:
+        user_id, issued, mac = token.split(".")
+        user_id, issued = int(user_id), int(issued)
+    except (AttributeError, ValueError):
+        return None
+    if issued + MAX_AGE < time.time():
+        return None
+    principal = principals.get(user_id)
+    if principal is None or not hmac.compare_digest(mac, _mac(user_id, issued, principal.stamp)):
+        return None
+    return principal
+
+
+# Dependencies
+# ---------------------
+def current_principal(request: Request) -> Optional[Principal]:
+    if not hasattr(request.state, "principal"):
+        request.state.principal = resolve(request.cookies.get(COOKIE_NAME))
+    return request.state.principal
+
+
+def require(*roles: str):
+    """Dependency returning the caller's Principal; raises NotAuthenticated unless it has one of ``roles``."""
+    def dependency(request: Request) -> Principal:
+        principal = current_principal(request)
+        if principal is None:
+            raise NotAuthenticated()
+        if roles and principal.role not in roles:
+            raise NotAuthenticated(forbidden=True)
+        return principal
+    return dependency
@@ -0,0 +1,121 @@
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Callable, Hashable
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.database.connection import current_db
+
+# Request coalescing
+# ---------------------
+# Identical dashboard builds that arrive together share one computation: the
+# first request for a key runs it, the others wait for its result. The result
+# then serves the same key for MICRO_TTL seconds.
+#
+# Every key includes the database (tenant) and its data version, which moves
+# on each commit that wrote something to it through this process's engines. A build started before a write is
+# never handed to a request made after it, so a redirect that follows an
+# approve or a delete always sees the change. Writes from other processes are
+# picked up once the micro-TTL has passed.
+
+MICRO_TTL = 1.0
+MAX_ENTRIES = 256
+
+
+# Data version
+# ---------------------
+_versions: dict = defaultdict(int)  # database name -> version
+_version_lock = threading.Lock()
+_WRITES = ("INSERT", "UPDATE", "DELETE", "REPLACE")
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _note_write(conn, cursor, statement, parameters, context, executemany):
+    if statement.lstrip()[:7].upper().startswith(_WRITES):
+        conn.info["wrote"] = True
+
+
+def _bump(conn) -> None:
+    if conn.info.pop("wrote", False):
+        with _version_lock:
+            _versions[conn.info.get("database")] += 1
+
+
+event.listen(Engine, "commit", _bump)
+# a rolled back write changed nothing
+event.listen(Engine, "rollback", lambda conn: conn.info.pop("wrote", None))
+
+
+def data_version(database: str) -> int:
+    return _versions[database]
+
+
+# Single flight
+# ---------------------
+class _Flight:
+    __slots__ = ("done", "result", "error", "finished_at")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.finished_at = 0.0
+
+
+class SingleFlight:
+    def __init__(self, ttl: float = MICRO_TTL):
+        self.ttl = ttl
+        self._flights: dict = {}
+        self._lock = threading.Lock()
+        # view name -> {"computed", "deduplicated", "cached"}
+        self.stats: dict = defaultdict(Counter)
+
+    def do(self, name: str, params: Hashable, fn: Callable):
+        """Result of ``fn()`` for (``name``, ``params``), shared with concurrent and very recent callers."""
+        database = current_db().name
+        key = (name, params, database, data_version(database))
+        now = time.monotonic()
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None and flight.done.is_set() and (
+                flight.error is not None or now - flight.finished_at > self.ttl
+            ):
+                flight = None
+            if flight is None:
+                leader = True
+                flight = self._flights[key] = _Flight()
+                self.stats[name]["computed"] += 1
+                if len(self._flights) > MAX_ENTRIES:
+                    self._sweep(now)
+            else:
+                leader = False
+                self.stats[name]["cached" if flight.done.is_set() else "deduplicated"] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = fn()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            flight.finished_at = time.monotonic()
+            flight.done.set()
+        return flight.result
+
+    def _sweep(self, now: float) -> None:
+        # caller holds the lock
+        for key, flight in list(self._flights.items()):
+            if flight.done.is_set() and now - flight.finished_at > self.ttl:
+                del self._flights[key]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {name: dict(counts) for name, counts in self.stats.items()}
+
+
+flights = SingleFlight()
@@ -0,0 +1,140 @@
+import csv
+import io
+from datetime import date, datetime
+from typing import Iterable, Optional
+from sqlalchemy import select, insert, func, or_
+from sqlalchemy.orm import Session
+from app.database.models import InternshipSupervision, Task, User
+from app.services import events, notifications
+
+# Bulk task assignment
+# ---------------------
+# One task template fanned out over many supervisions: the targets are
+# validated with a single IN query and the tasks go in as multi-row INSERTs.
+
+INSERT_CHUNK = 100  # rows per INSERT; 8 columns stays under the 999 bound-parameter limit of older SQLite builds
+
+
+def _parse_date(value: str) -> Optional[date]:
+    value = (value or "").strip()
+    if not value:
+        return None
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def task_assigned_message(student_id: int, title: str, due_date: Optional[date], now: Optional[datetime] = None) -> dict:
+    due = f" Due {due_date:%Y-%m-%d}." if due_date else ""
+    return notifications.message(student_id, "New task assigned", f"{title}.{due}", type="task_assigned", now=now)
+
+
+def publish_task_assigned(db: Session, row: dict) -> None:
+    """Show a new task on the student's open dashboard once ``db`` commits."""
+    due = row.get("due_date")
+    events.publish_after_commit(
+        db, events.user_channel(row["student_id"]), "task", id=row.get("id"), action="created",
+        title=row["title"], description=row.get("description"), status=row.get("status"),
+        due_date=f"{due:%Y-%m-%d}" if due else None,
+    )
+
+
+def parse_due_date_csv(data: bytes) -> tuple[dict, list]:
+    """Read per-student due dates from an uploaded CSV.
+
+    The header must have ``due_date`` and one of ``supervision_id``,
+    ``student_id`` or ``student_email``. Returns ``({key: due_date}, errors)``
+    where keys are ``("supervision_id", int)``, ``("student_id", int)`` or
+    ``("student_email", str)``.
+    """
+    due_dates: dict = {}
+    errors: list = []
+    reader = csv.DictReader(io.StringIO(data.decode("utf-8-sig")))
+    fields = {(f or "").strip().lower() for f in (reader.fieldnames or [])}
+    key_field = next((f for f in ("supervision_id", "student_id", "student_email") if f in fields), None)
+    if key_field is None or "due_date" not in fields:
+        return {}, ["CSV needs a due_date column and one of supervision_id, student_id, student_email."]
+
+    for line_no, raw in enumerate(reader, start=2):
+        row = {(k or "").strip().lower(): (v or "").strip() for k, v in raw.items()}
+        try:
+            key = row[key_field].lower() if key_field == "student_email" else int(row[key_field])
+            due_dates[(key_field, key)] = _parse_date(row["due_date"])
+        except (ValueError, KeyError):
+            errors.append(f"line {line_no}: could not read {key_field} / due_date")
+    return due_dates, errors
+
+
+def bulk_assign_tasks(
+    db: Session,
+    mentor_id: int,
+    title: str,
+    description: str,
+    supervision_ids: Iterable[int] = (),
+    due_date: Optional[date] = None,
+    due_dates: Optional[dict] = None,
+) -> dict:
+    """Create one task per selected supervision of ``mentor_id``.
+
+    Supervisions come from ``supervision_ids`` and from the keys of
+    ``due_dates`` (see :func:`parse_due_date_csv`); a CSV date overrides
+    ``due_date`` for that student. Returns counts of ``created`` tasks and the
+    ``skipped`` selections that aren't this mentor's assigned supervisions.
+    """
+    due_dates = due_dates or {}
+    wanted_svs = {int(i) for i in supervision_ids}
+    wanted_svs |= {k for f, k in due_dates if f == "supervision_id"}
+    wanted_students = {k for f, k in due_dates if f == "student_id"}
+    wanted_emails = {k for f, k in due_dates if f == "student_email"}
+    if not (wanted_svs or wanted_students or wanted_emails):
+        return {"created": 0, "skipped": 0}
+
+    # One round trip to validate every target against this mentor
+    stmt = (
+        select(InternshipSupervision.id, InternshipSupervision.student_id, User.email)
+        .join(User, User.id == InternshipSupervision.student_id)
+        .where(
+            InternshipSupervision.mentor_id == mentor_id,
+            or_(
+                InternshipSupervision.id.in_(wanted_svs),
+                InternshipSupervision.student_id.in_(wanted_students),
+                func.lower(User.email).in_(wanted_emails),
+            ),
+        )
+    )
+    now = datetime.utcnow()
+    rows = []
+    matched = set()
+    for sv_id, student_id, email in db.execute(stmt):
+        email = (email or "").lower()
+        keys = (("supervision_id", sv_id), ("student_id", student_id), ("student_email", email))
+        matched.update(keys)
+        due = due_date
+        for key in keys:
+            if due_dates.get(key):
+                due = due_dates[key]
+        rows.append({
+            "title": title.strip(),
+            "description": description.strip(),
+            "due_date": due,
+            "assigned_by": mentor_id,
+            "student_id": student_id,
+            "supervision_id": sv_id,
+            "status": "assigned",
+            "created_at": now,
+        })
+    skipped = (
+        len({("supervision_id", k) for k in wanted_svs} - matched)
+        + len({("student_id", k) for k in wanted_students} - matched)
+        + len({("student_email", k) for k in wanted_emails} - matched)
+    )
+
+    try:
+        for start in range(0, len(rows), INSERT_CHUNK):
+            db.execute(insert(Task).values(rows[start:start + INSERT_CHUNK]))
+        notifications.notify(db, [task_assigned_message(r["student_id"], r["title"], r["due_date"], now) for r in rows])
+        for r in rows:
+            publish_task_assigned(db, r)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return {"created": len(rows), "skipped": skipped}
@@ -1,40 +1,70 @@
 from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, RedirectResponse, Response
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
-from app.routers import  auth, student, mentor, admin
+from app.routers import  auth, student, mentor, admin, notifications, changes, api, files as file_routes, events as event_routes
 from app.database.connection import engine
-from app.database import models
+from app.database import tenants
+from app.database.schema import migrate
+from app.services import events, files, jobs, ratelimit, scheduler, sessions
 import os
-from sqlalchemy import text
 
 app = FastAPI(title="Internship Management System")
+# per-IP limits on login/signup, checked before routing (app/services/ratelimit.py)
+app.add_middleware(ratelimit.RateLimitMiddleware)
+# per-institution database files picked by host or header (app/database/tenants.py)
+app.add_middleware(tenants.TenantMiddleware)
 
 # Create DB tables on startup (server process only)
 @app.on_event("startup")
 def on_startup():
-    models.Base.metadata.create_all(bind=engine)
+    migrate(engine)
+    # CVs uploaded before they moved out of /static (app/services/files.py)
+    moved = files.move_legacy_cvs()
+    if moved:
+        print(f"[Startup] Moved {moved} CV(s) out of static/uploads")
     try:
         print(f"[Startup] Using SQLite DB at: {engine.url.database}")
     except Exception:
         pass
 
-    try:
-        with engine.connect() as conn:
-            # Check columns in users table
-            cols = conn.execute(text("PRAGMA table_info('users')")).fetchall()
-            col_names = {c[1] for c in cols}
-            if 'profile_photo_url' not in col_names:
-                conn.execute(text("ALTER TABLE users ADD COLUMN profile_photo_url VARCHAR"))
-            if 'cv_url' not in col_names:
-                conn.execute(text("ALTER TABLE users ADD COLUMN cv_url VARCHAR"))
-            # Check columns in internships table
-            cols_int = conn.execute(text("PRAGMA table_info('internships')")).fetchall()
-            int_col_names = {c[1] for c in cols_int}
-            if 'requirements' not in int_col_names:
-                conn.execute(text("ALTER TABLE internships ADD COLUMN requirements TEXT"))
-            conn.commit()
-    except Exception:
-        pass
+    # Live update hub: tail the shared event file for this process's SSE clients
+    events.hub.start()
+    # Background job workers (JOB_WORKERS=0 when running `python -m app.services.jobs` separately)
+    app.state.job_pool = jobs.pool_from_env()
+    if app.state.job_pool:
+        app.state.job_pool.start()
+    # Overdue sweep and deadline reminders (SCHEDULER_ENABLED=0 to turn off)
+    app.state.scheduler = scheduler.scheduler_from_env()
+    if app.state.scheduler:
+        app.state.scheduler.start()
+
+
+@app.on_event("shutdown")
+def on_shutdown():
+    for worker in (getattr(app.state, "scheduler", None), getattr(app.state, "job_pool", None)):
+        if worker:
+            worker.stop()
+    events.hub.stop()
+
+# No session, or the wrong role: pages send the browser to the login form,
+# JSON callers (API, live forms, event streams) get a status code
+@app.exception_handler(sessions.NotAuthenticated)
+def not_authenticated(request: Request, exc: sessions.NotAuthenticated):
+    path = request.url.path
+    wants_json = (
+        path.startswith(("/api/", "/changes", "/events/", "/notifications", "/files/"))
+        or request.headers.get("x-live") == "1"
+    )
+    if wants_json:
+        code = 403 if exc.forbidden else 401
+        return JSONResponse({"detail": "Forbidden" if exc.forbidden else "Not authenticated"}, status_code=code)
+    return RedirectResponse(url="/login", status_code=303)
+
+@app.exception_handler(ratelimit.RateLimited)
+def rate_limited(request: Request, exc: ratelimit.RateLimited):
+    status, headers, body = ratelimit.too_many(exc.retry_after)
+    return Response(body, status_code=status, headers={k.decode(): v.decode() for k, v in headers})
 
 # Jinja2 templates for HTML rendering
 templates = Jinja2Templates(directory="app/templates")
@@ -50,6 +80,11 @@ app.include_router(auth.router)
 app.include_router(student.router)
 app.include_router(mentor.router)
 app.include_router(admin.router)
+app.include_router(notifications.router)
+app.include_router(changes.router)
+app.include_router(api.router)
+app.include_router(file_routes.router)
+app.include_router(event_routes.router)
 
 
 @app.get("/")
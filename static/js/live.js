@@ -0,0 +1,69 @@
+// Live dashboard updates
+// ---------------------
+// Opens the page's Server-Sent Events stream and hands each event to the
+// page's handlers, which patch the DOM in place. Forms marked data-live are
+// sent with fetch() and an X-Live header, so the server answers with JSON
+// instead of a redirect and the page is not rebuilt. Without EventSource or
+// fetch everything falls back to the normal form posts.
+(function () {
+  function toast(text) {
+    var box = document.getElementById('live-toasts');
+    if (!box) {
+      box = document.createElement('div');
+      box.id = 'live-toasts';
+      box.className = 'fixed bottom-4 right-4 z-50 flex flex-col gap-2';
+      document.body.appendChild(box);
+    }
+    var el = document.createElement('div');
+    el.className = 'rounded-md border bg-white px-4 py-2 text-sm text-gray-800 shadow-md';
+    el.textContent = text;
+    box.appendChild(el);
+    setTimeout(function () { el.remove(); }, 6000);
+  }
+
+  function bumpUnread(delta) {
+    document.querySelectorAll('[data-unread-count]').forEach(function (el) {
+      var n = Math.max(0, (parseInt(el.textContent, 10) || 0) + delta);
+      el.textContent = n;
+      if (el.hasAttribute('data-hide-when-zero')) el.classList.toggle('hidden', n === 0);
+    });
+  }
+
+  function connect(url, handlers) {
+    if (!window.EventSource) return null;
+    var source = new EventSource(url);
+    Object.keys(handlers).forEach(function (type) {
+      source.addEventListener(type, function (e) {
+        handlers[type](JSON.parse(e.data));
+      });
+    });
+    // the server dropped events for this page; start again from a fresh render
+    source.addEventListener('resync', function () { window.location.reload(); });
+    return source;
+  }
+
+  function wireForms(root) {
+    if (!window.fetch) return;
+    (root || document).querySelectorAll('form[data-live]').forEach(function (form) {
+      if (form.dataset.liveWired) return;
+      form.dataset.liveWired = '1';
+      form.addEventListener('submit', function (e) {
+        if (e.defaultPrevented) return;  // e.g. a confirm() that was cancelled
+        e.preventDefault();
+        var data = new FormData(form);
+        if (e.submitter && e.submitter.name) data.append(e.submitter.name, e.submitter.value);
+        fetch(form.action, { method: 'POST', body: data, headers: { 'X-Live': '1' } })
+          .then(function (r) { if (!r.ok) throw new Error(r.status); return r.json(); })
+          .then(function (result) {
+            var row = form.hasAttribute('data-live-remove') && form.closest('tr');
+            if (row) row.remove();
+            form.dispatchEvent(new CustomEvent('live:done', { detail: result, bubbles: true }));
+          })
+          .catch(function () { form.submit(); });
+      });
+    });
+  }
+
+  window.Live = { connect: connect, toast: toast, bumpUnread: bumpUnread, wireForms: wireForms };
+  document.addEventListener('DOMContentLoaded', function () { wireForms(document); });
+})();
@@ -0,0 +1,32 @@
+import os
+import tempfile
+from pathlib import Path
+
+# The app reads its configuration at import time, so point it away from the
+# working copy before any test imports it: a tenant database of its own,
+# uploads and backups in a temporary directory, no background workers.
+_TMP = Path(tempfile.mkdtemp(prefix="ims-tests-"))
+os.environ.update({
+    "TENANT_DIR": str(_TMP / "tenants"),
+    "TENANT": "pytest",
+    "UPLOAD_DIR": str(_TMP / "uploads"),
+    "BACKUP_DIR": str(_TMP / "backups"),
+    "SESSION_SECRET": "pytest",
+    "EVENTS_FILE": "",
+    "JOB_WORKERS": "0",
+    "SCHEDULER_ENABLED": "0",
+    "RATE_LIMITS": "login_ip=1000/1,login_account=1000/1,signup_ip=1000/1",
+})
+
+import pytest  # noqa: E402
+from app.database.connection import Database  # noqa: E402
+from app.database.schema import migrate  # noqa: E402
+
+
+@pytest.fixture
+def database(tmp_path):
+    """A fresh, migrated SQLite file with the app's connection settings (WAL, foreign keys)."""
+    db = Database.sqlite("pytest", tmp_path / "test.db")
+    migrate(db.engine)
+    yield db
+    db.dispose()
@@ -0,0 +1,78 @@
+import threading
+from sqlalchemy import func, select
+from app.database.models import Application, Internship, User
+from app.services import approvals
+
+WORKERS = 16
+
+
+def _seed(db, slots: int, applicants: int) -> list:
+    db.add_all([
+        User(id=i, name=f"s{i}", email=f"s{i}@example.com", password_hash="x", role="student")
+        for i in range(1, applicants + 1)
+    ])
+    db.add(Internship(id=1, title="t", company="c", slots=slots, filled_slots=0, status="open"))
+    apps = [Application(student_id=i, internship_id=1, status="pending") for i in range(1, applicants + 1)]
+    db.add_all(apps)
+    db.commit()
+    return [a.id for a in apps]
+
+
+def _approve_in_parallel(database, batches: list) -> list:
+    results, errors = [], []
+    start = threading.Barrier(len(batches))
+
+    def worker(ids):
+        db = database.SessionLocal()
+        try:
+            start.wait()
+            results.append(approvals.approve_applications(db, ids))
+        except Exception as e:
+            errors.append(e)
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=worker, args=(ids,)) for ids in batches]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    return results
+
+
+def _state(database):
+    with database.SessionLocal() as db:
+        internship = db.get(Internship, 1)
+        approved = db.scalar(
+            select(func.count()).select_from(Application).where(Application.status == "approved")
+        )
+        return internship, approved
+
+
+def test_last_slot_goes_to_exactly_one_approver(database):
+    with database.SessionLocal() as db:
+        ids = _seed(db, slots=1, applicants=WORKERS)
+
+    results = _approve_in_parallel(database, [[i] for i in ids])
+
+    internship, approved = _state(database)
+    assert internship.filled_slots <= internship.slots
+    assert approved == internship.filled_slots == 1
+    assert sum(len(r["approved"]) for r in results) == 1
+    assert sum(len(r["full"]) for r in results) == WORKERS - 1
+    assert internship.status == "closed"
+
+
+def test_overlapping_batches_never_overfill(database):
+    with database.SessionLocal() as db:
+        ids = _seed(db, slots=5, applicants=40)
+
+    # every worker races for the same applications in a different order
+    batches = [ids[n:] + ids[:n] for n in range(WORKERS)]
+    results = _approve_in_parallel(database, batches)
+
+    internship, approved = _state(database)
+    assert approved == internship.filled_slots == internship.slots == 5
+    approved_ids = [i for r in results for i in r["approved"]]
+    assert len(approved_ids) == len(set(approved_ids)) == 5
@@ -0,0 +1,56 @@
+from datetime import date
+import sqlite3
+from sqlalchemy import insert, select
+from app.database.models import Application, Internship, User
+from app.services import archive
+
+
+def _seed(db, student=True):
+    if student:
+        db.execute(insert(User), [dict(id=1, name="s", email="s@example.com", password_hash="x", role="student")])
+    db.execute(insert(Internship), [dict(id=1, title="old", company="c", end_date=date(2020, 1, 1))])
+    db.execute(insert(Application), [dict(id=1, student_id=1, internship_id=1, status="approved")])
+    db.commit()
+
+
+def _archived(path, table):
+    with sqlite3.connect(path) as conn:
+        return [r[0] for r in conn.execute(f"SELECT id FROM {table} ORDER BY id")]
+
+
+def test_rerun_after_a_half_committed_batch_copies_nothing_twice(database, tmp_path):
+    path = tmp_path / "archive.db"
+    with database.SessionLocal() as db:
+        _seed(db)
+        moved = archive.archive_finished_internships(bind=database.engine, archive_path=path)
+        assert moved["internships"] == moved["applications"] == 1
+
+        # as if the archive file committed and the main file didn't
+        _seed(db, student=False)
+        moved = archive.archive_finished_internships(bind=database.engine, archive_path=path)
+
+        assert moved["internships"] == moved["applications"] == 0
+        assert db.scalars(select(Internship.id)).all() == []
+        assert db.scalars(select(Application.id)).all() == []
+    assert _archived(path, "internships") == [1]
+    assert _archived(path, "applications") == [1]
+
+
+def test_archives_with_duplicates_get_a_unique_index(database, tmp_path):
+    path = tmp_path / "archive.db"
+    with database.SessionLocal() as db:
+        _seed(db)
+    archive.archive_finished_internships(bind=database.engine, archive_path=path)
+    with sqlite3.connect(path) as conn:
+        # an archive written before the unique index, with one batch copied twice
+        conn.execute("DROP INDEX ux_internships_id")
+        conn.execute("CREATE INDEX ix_internships_id ON internships (id)")
+        conn.execute("INSERT INTO internships SELECT * FROM internships")
+
+    archive.archive_finished_internships(bind=database.engine, archive_path=path)
+
+    assert _archived(path, "internships") == [1]
+    with sqlite3.connect(path) as conn:
+        indexes = {r[1]: r[2] for r in conn.execute("PRAGMA index_list('internships')")}
+    assert indexes.get("ux_internships_id") == 1
+    assert "ix_internships_id" not in indexes
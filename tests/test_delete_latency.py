@@ -0,0 +1,106 @@
+import time
+from sqlalchemy import func, insert, select, text
+from app.database.models import (
+    Application, Internship, InternshipSupervision, Notification, Report, Task, User,
+)
+from app.services import deletes
+
+# Deletes on a large seeded graph: one statement per root entity, with the
+# ON DELETE rules doing the rest. Run with -s to see the latencies.
+
+STUDENTS = 2000
+INTERNSHIPS = 10
+TASKS_PER_STUDENT = 20
+MAX_SECONDS = 5.0  # generous: a row-by-row walk of this graph takes far longer
+
+
+def _seed(db):
+    mentors = range(1, INTERNSHIPS + 1)
+    students = range(INTERNSHIPS + 1, INTERNSHIPS + STUDENTS + 1)
+    db.execute(insert(User), [
+        dict(id=i, name=f"m{i}", email=f"m{i}@example.com", password_hash="x", role="mentor") for i in mentors
+    ] + [
+        dict(id=i, name=f"s{i}", email=f"s{i}@example.com", password_hash="x", role="student") for i in students
+    ])
+    db.execute(insert(Internship), [
+        dict(id=i, title=f"t{i}", company="c", slots=STUDENTS, filled_slots=STUDENTS // INTERNSHIPS)
+        for i in range(1, INTERNSHIPS + 1)
+    ])
+    internship_of = {s: 1 + s % INTERNSHIPS for s in students}
+    db.execute(insert(Application), [
+        dict(student_id=s, internship_id=internship_of[s], status="approved") for s in students
+    ])
+    db.execute(insert(InternshipSupervision), [
+        dict(id=s, mentor_id=internship_of[s], internship_id=internship_of[s], student_id=s) for s in students
+    ])
+    db.execute(insert(Task), [
+        dict(supervision_id=s, student_id=s, assigned_by=internship_of[s], title="t")
+        for s in students for _ in range(TASKS_PER_STUDENT)
+    ])
+    db.execute(insert(Notification), [
+        dict(user_id=s, title="n", task_id=None) for s in students
+    ])
+    db.execute(insert(Report), [
+        dict(student_id=s, internship_id=internship_of[s], title="r") for s in students
+    ])
+    db.commit()
+
+
+def _count(db, model, *where):
+    return db.scalar(select(func.count()).select_from(model).where(*where))
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def test_delete_internship_cascades_in_one_statement(database):
+    with database.SessionLocal() as db:
+        _seed(db)
+        tasks_before = _count(db, Task)
+        per_internship = STUDENTS // INTERNSHIPS
+
+        deleted, seconds = _timed(deletes.delete_internship, db, 1)
+        print(f"\ndelete_internship: {seconds * 1000:.1f} ms for {per_internship * (TASKS_PER_STUDENT + 3)} rows")
+
+        assert deleted
+        assert seconds < MAX_SECONDS
+        for model in (Application, InternshipSupervision, Report):
+            assert _count(db, model, model.internship_id == 1) == 0
+        assert _count(db, Task) == tasks_before - per_internship * TASKS_PER_STUDENT
+        assert db.execute(text("PRAGMA foreign_key_check")).all() == []
+
+
+def test_delete_mentor_removes_their_supervisions_and_tasks(database):
+    with database.SessionLocal() as db:
+        _seed(db)
+        supervised = _count(db, InternshipSupervision, InternshipSupervision.mentor_id == 1)
+
+        deleted, seconds = _timed(deletes.delete_user, db, 1)
+        print(f"\ndelete_user (mentor): {seconds * 1000:.1f} ms for {supervised * (TASKS_PER_STUDENT + 1)} rows")
+
+        assert deleted and supervised
+        assert seconds < MAX_SECONDS
+        assert _count(db, InternshipSupervision, InternshipSupervision.mentor_id == 1) == 0
+        assert _count(db, Task, Task.assigned_by == 1) == 0
+        assert db.execute(text("PRAGMA foreign_key_check")).all() == []
+
+
+def test_delete_student_hands_back_their_slot(database):
+    with database.SessionLocal() as db:
+        _seed(db)
+        student = INTERNSHIPS + 1
+        internship = db.get(Internship, 1 + student % INTERNSHIPS)
+        filled = internship.filled_slots
+
+        assert deletes.delete_user(db, student)
+
+        db.refresh(internship)
+        assert internship.filled_slots == filled - 1
+        for column in (Application.student_id, Task.student_id, Notification.user_id, Report.student_id):
+            assert _count(db, column.class_, column == student) == 0
+        # the supervision stays with its mentor, without the student
+        assert _count(db, InternshipSupervision, InternshipSupervision.student_id == student) == 0
+        assert db.get(InternshipSupervision, student) is not None
@@ -0,0 +1,71 @@
+import threading
+import time
+from sqlalchemy import update
+from app.database import tenants
+from app.database.models import Job
+from app.services import jobs
+
+LEASE = 1  # seconds; the handlers below run for several leases
+
+
+def _queue(database, kind: str) -> int:
+    with database.SessionLocal() as db:
+        job = jobs.enqueue(db, kind)
+        db.commit()
+        return job.id
+
+
+def _job(database, job_id: int) -> Job:
+    with database.SessionLocal() as db:
+        return db.get(Job, job_id)
+
+
+def test_heartbeat_keeps_a_slow_job_leased(database, monkeypatch):
+    started, release = threading.Event(), threading.Event()
+
+    def slow(db, payload):
+        started.set()
+        release.wait(10)
+
+    monkeypatch.setitem(jobs.HANDLERS, "test_slow", slow)
+    job_id = _queue(database, "test_slow")
+
+    def first():
+        with tenants.bound(database):
+            jobs.run_one("worker-a", lease_seconds=LEASE)
+
+    runner = threading.Thread(target=first)
+    runner.start()
+    assert started.wait(5)
+    try:
+        # well past the original lease, the job still belongs to worker-a
+        time.sleep(LEASE * 3)
+        with tenants.bound(database):
+            assert jobs.run_one("worker-b", lease_seconds=LEASE) is False
+        job = _job(database, job_id)
+        assert job.locked_by == "worker-a"
+        assert job.status == "running"
+    finally:
+        release.set()
+        runner.join(10)
+
+    job = _job(database, job_id)
+    assert job.status == "done"
+    assert job.attempts == 1
+
+
+def test_finish_reports_a_lost_lease(database, monkeypatch, capsys):
+    def stolen(db, payload):
+        # as if the lease had run out and another worker had claimed the job
+        with database.SessionLocal() as other:
+            other.execute(update(Job).values(locked_by="worker-b"))
+            other.commit()
+
+    monkeypatch.setitem(jobs.HANDLERS, "test_stolen", stolen)
+    job_id = _queue(database, "test_stolen")
+    with tenants.bound(database):
+        assert jobs.run_one("worker-a", lease_seconds=LEASE)
+
+    out = capsys.readouterr().out
+    assert f"Job {job_id} is no longer leased to worker-a" in out
+    assert _job(database, job_id).status == "running"  # left for worker-b to settle
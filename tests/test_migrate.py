@@ -0,0 +1,33 @@
+from sqlalchemy import select, text
+from app.database.models import Application, Internship, User
+from app.database.schema import migrate
+
+
+def test_migrate_collapses_duplicate_applications_before_the_unique_index(database):
+    with database.engine.begin() as conn:
+        # a file from before the unique index, holding duplicate pairs
+        conn.execute(text("DROP INDEX uq_applications_student_internship"))
+    with database.SessionLocal() as db:
+        db.add_all([
+            User(id=1, name="s", email="s@example.com", password_hash="x", role="student"),
+            Internship(id=1, title="t", company="c", slots=3, filled_slots=2),
+            Application(id=1, student_id=1, internship_id=1, status="pending"),
+            Application(id=2, student_id=1, internship_id=1, status="approved"),
+            Application(id=3, student_id=1, internship_id=1, status="approved"),
+        ])
+        db.commit()
+
+    migrate(database.engine)
+
+    with database.SessionLocal() as db:
+        assert db.scalars(select(Application.id)).all() == [2]
+        assert db.get(Internship, 1).filled_slots == 1
+    with database.engine.connect() as conn:
+        assert conn.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE name = 'uq_applications_student_internship'"
+        )).first()
+        # the apply route's statement works again
+        conn.execute(text(
+            "INSERT INTO applications (student_id, internship_id, status) VALUES (1, 1, 'pending') "
+            "ON CONFLICT (student_id, internship_id) DO NOTHING"
+        ))
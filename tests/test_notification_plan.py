@@ -0,0 +1,27 @@
+from datetime import datetime
+import pytest
+from sqlalchemy import text
+from app.database import read_models as rm
+
+# Every inbox page should be one index range scan, already in order: no
+# full scan of notifications and no temporary B-tree for the ORDER BY.
+
+
+def _plan(database, monkeypatch, **kwargs) -> str:
+    captured = {}
+    monkeypatch.setattr(rm, "_rows", lambda db, stmt, row_type: captured.setdefault("stmt", stmt))
+    rm.notification_rows(None, 1, **kwargs)
+    sql = str(captured["stmt"].compile(database.engine, compile_kwargs={"literal_binds": True}))
+    with database.engine.connect() as conn:
+        return "\n".join(row[3] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+
+
+@pytest.mark.parametrize("unread_only, index", [
+    (False, "ix_notifications_user_created"),
+    (True, "ix_notifications_inbox"),
+])
+@pytest.mark.parametrize("before", [None, (datetime(2024, 1, 1), 500)])
+def test_inbox_pages_are_index_range_scans(database, monkeypatch, unread_only, index, before):
+    plan = _plan(database, monkeypatch, before=before, unread_only=unread_only)
+    assert f"SEARCH notifications USING INDEX {index} (user_id=?" in plan
+    assert "TEMP B-TREE" not in plan
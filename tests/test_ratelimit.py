@@ -0,0 +1,20 @@
+import pytest
+from app.database import tenants
+from app.database.connection import Database
+from app.services import ratelimit
+
+
+def test_account_buckets_are_per_tenant(database, tmp_path, monkeypatch):
+    monkeypatch.setitem(ratelimit.LIMITS, "test_account", ratelimit.parse_limit("2/3600"))
+    other = Database.sqlite("other", tmp_path / "other.db")
+    limit = ratelimit.limit_account("test_account")
+    try:
+        with tenants.bound(database):
+            limit(email="Same@Example.com")
+            limit(email="same@example.com ")
+            with pytest.raises(ratelimit.RateLimited):
+                limit(email="same@example.com")
+        with tenants.bound(other):
+            limit(email="same@example.com")  # a different institution's account
+    finally:
+        other.dispose()
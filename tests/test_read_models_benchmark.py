@@ -0,0 +1,113 @@
+import time
+import tracemalloc
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Mapper, joinedload
+from app.database import read_models as rm
+from app.database.models import Application, Internship, InternshipSupervision, Task, User
+
+# Micro-benchmark for the read models (user-026): the admin dashboard's task
+# and application sections built the old way (joinedload chains, full
+# entities copied into dicts) against app/database/read_models.py. The read
+# models shipped first with only an ad hoc measurement; this file is where
+# the benchmark lives. The assertions stick to deterministic costs (entities
+# hydrated, statements, peak memory); wall-clock times are printed, not
+# asserted, so a loaded machine can't fail the suite. Run with -s to see
+# the numbers per 1000 rows.
+
+ROWS = 1000
+REPEAT = 5
+
+
+def _seed(db):
+    db.execute(insert(User), [
+        dict(id=i, name=f"u{i}", email=f"u{i}@example.com", password_hash="x", role="student")
+        for i in range(1, ROWS + 2)
+    ])
+    db.execute(insert(Internship), [dict(
+        id=1, title="t", company="c", description="d" * 4000, requirements="r" * 4000,
+    )])
+    db.execute(insert(InternshipSupervision), [dict(id=1, mentor_id=1, internship_id=1, student_id=2)])
+    db.execute(insert(Task), [
+        dict(student_id=2 + i % ROWS, assigned_by=1, supervision_id=1, title="t",
+             description="d" * 500, feedback="f" * 2000)
+        for i in range(ROWS)
+    ])
+    db.execute(insert(Application), [
+        dict(student_id=2 + i, internship_id=1, status="pending", notes="n" * 2000)
+        for i in range(ROWS)
+    ])
+    db.commit()
+
+
+def _orm(db):
+    tasks = (
+        db.query(Task)
+        .options(
+            joinedload(Task.student), joinedload(Task.assigned_by_user),
+            joinedload(Task.internship_sv).joinedload(InternshipSupervision.internship),
+        )
+        .order_by(Task.created_at.desc())
+        .all()
+    )
+    apps = db.query(Application).options(joinedload(Application.student), joinedload(Application.internship)).all()
+    return (
+        [{"id": t.id, "title": t.title, "student_email": t.student.email,
+          "assigned_by_email": t.assigned_by_user.email, "internship_title": t.internship_sv.internship.title,
+          "description": t.description, "status": t.status} for t in tasks],
+        [{"id": a.id, "student_email": a.student.email, "internship_title": a.internship.title,
+          "status": a.status, "student_cv_url": a.student.cv_url} for a in apps],
+    )
+
+
+def _read_models(db):
+    return rm.admin_task_rows(db), rm.admin_application_rows(db)
+
+
+def _measure(database, build):
+    """(best ms, peak KiB, entities hydrated, statements) for building both sections from a fresh session."""
+    best = float("inf")
+    for _ in range(REPEAT):
+        with database.SessionLocal() as db:
+            start = time.perf_counter()
+            build(db)
+            best = min(best, time.perf_counter() - start)
+
+    statements, entities = [], []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    def count_entity(target, context):
+        entities.append(type(target))
+
+    event.listen(database.engine, "before_cursor_execute", count_statement)
+    event.listen(Mapper, "load", count_entity)
+    try:
+        with database.SessionLocal() as db:
+            tracemalloc.start()
+            try:
+                build(db)
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+    finally:
+        event.remove(database.engine, "before_cursor_execute", count_statement)
+        event.remove(Mapper, "load", count_entity)
+    return best * 1000, peak / 1024, len(entities), len(statements)
+
+
+def test_read_models_cost_less_than_orm_hydration(database):
+    with database.SessionLocal() as db:
+        _seed(db)
+        orm_tasks, orm_apps = _orm(db)
+        rm_tasks, rm_apps = _read_models(db)
+    assert len(rm_tasks) == len(orm_tasks) == ROWS
+    assert [r.id for r in rm_apps] == sorted(a["id"] for a in orm_apps)
+
+    orm_ms, orm_kib, orm_entities, orm_statements = _measure(database, _orm)
+    rm_ms, rm_kib, rm_entities, rm_statements = _measure(database, _read_models)
+    print(f"\nper {ROWS} rows: ORM {orm_ms / 2:.1f} ms, peak {orm_kib / 2:.0f} KiB, {orm_entities / 2:.0f} entities; "
+          f"read models {rm_ms / 2:.1f} ms, peak {rm_kib / 2:.0f} KiB, {rm_entities / 2:.0f} entities")
+    assert rm_entities == 0 < orm_entities
+    assert rm_statements <= orm_statements
+    assert rm_kib < orm_kib / 2
@@ -0,0 +1,97 @@
+import hashlib
+import time
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select, text
+from sqlalchemy.exc import OperationalError
+from app.database.connection import home
+from app.database.models import Application, Internship, User
+from main import app
+
+# GET handlers read through home.read_engine (mode=ro, WAL); POSTs write
+# through home.engine. Neither side should wait for the other.
+
+PASSWORD = "secret123"
+MAX_SECONDS = 2.0  # a blocked writer would sit out the 30 s busy timeout
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as c:
+        with home.SessionLocal() as db:
+            digest = hashlib.sha256(PASSWORD.encode("utf-8")).hexdigest()
+            db.add_all([
+                User(id=1, name="Admin", email="admin@example.com", password_hash=digest, role="admin"),
+                User(id=2, name="Student", email="student@example.com", password_hash=digest, role="student"),
+                Internship(id=1, title="t", company="c", slots=5, filled_slots=0, status="open"),
+            ])
+            db.commit()
+        r = c.post("/login", data={"role": "admin", "email": "admin@example.com", "password": PASSWORD},
+                   follow_redirects=False)
+        assert r.status_code == 303
+        yield c
+
+
+def _pending_application(internship_id: int = 1) -> int:
+    with home.SessionLocal() as db:
+        db.execute(Application.__table__.delete())
+        application = Application(student_id=2, internship_id=internship_id, status="pending")
+        db.add(application)
+        db.commit()
+        return application.id
+
+
+def _status(application_id: int):
+    with home.read_engine.connect() as conn:
+        return conn.scalar(select(Application.status).where(Application.id == application_id))
+
+
+def test_open_reader_does_not_block_approve(client):
+    application_id = _pending_application()
+
+    # a long dashboard read: a read transaction held open on the read-only pool
+    reader = home.read_engine.raw_connection()
+    try:
+        cursor = reader.cursor()
+        cursor.execute("BEGIN")
+        cursor.execute("SELECT count(*) FROM applications").fetchone()
+
+        start = time.perf_counter()
+        r = client.post("/admin/approve", data={"application_id": application_id}, follow_redirects=False)
+        elapsed = time.perf_counter() - start
+
+        assert r.status_code == 303
+        assert elapsed < MAX_SECONDS
+        # the reader keeps its snapshot until it ends
+        cursor.execute("SELECT status FROM applications WHERE id = ?", (application_id,))
+        assert cursor.fetchone()[0] == "pending"
+        cursor.execute("ROLLBACK")
+    finally:
+        reader.close()
+    assert _status(application_id) == "approved"
+
+
+def test_open_writer_does_not_block_dashboard(client):
+    _pending_application()
+
+    writer = home.engine.raw_connection()
+    try:
+        cursor = writer.cursor()
+        cursor.execute("BEGIN IMMEDIATE")  # holds the write lock
+        cursor.execute("UPDATE internships SET title = 'renamed' WHERE id = 1")
+
+        start = time.perf_counter()
+        r = client.get("/admin_dash")
+        elapsed = time.perf_counter() - start
+
+        assert r.status_code == 200
+        assert elapsed < MAX_SECONDS
+        cursor.execute("ROLLBACK")
+    finally:
+        writer.close()
+
+
+def test_read_pool_is_read_only():
+    with pytest.raises(OperationalError, match="readonly"):
+        with home.read_engine.begin() as conn:
+            conn.execute(text("DELETE FROM applications"))
@@ -0,0 +1,24 @@
+from starlette.responses import Response
+from app.database import tenants
+from app.database.models import User
+from app.services import sessions
+
+
+def test_issue_refuses_unknown_user(database):
+    response = Response()
+    with tenants.bound(database):
+        assert sessions.issue(response, 999) is False
+    assert "set-cookie" not in response.headers
+
+
+def test_issue_sees_a_user_created_after_a_cached_miss(database):
+    with tenants.bound(database):
+        assert sessions.principals.get(42) is None  # e.g. a stale cookie for a deleted user
+        with database.SessionLocal() as db:
+            db.add(User(id=42, name="New", email="new@example.com", password_hash="x", role="student"))
+            db.commit()
+
+        response = Response()
+        assert sessions.issue(response, 42) is True
+        token = response.headers["set-cookie"].split(";")[0].split("=", 1)[1]
+        assert sessions.resolve(token).id == 42
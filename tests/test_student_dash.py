@@ -0,0 +1,29 @@
+import hashlib
+from fastapi.testclient import TestClient
+from app.database.connection import home
+from app.database.models import Task, User
+from main import app
+
+PASSWORD = "secret123"
+
+
+def test_overdue_tasks_are_not_counted_as_completed():
+    digest = hashlib.sha256(PASSWORD.encode("utf-8")).hexdigest()
+    with TestClient(app) as client:
+        with home.SessionLocal() as db:
+            db.add_all([
+                User(id=101, name="Mentor", email="dash-mentor@example.com", password_hash=digest, role="mentor"),
+                User(id=102, name="Student", email="dash-student@example.com", password_hash=digest, role="student"),
+            ])
+            db.flush()
+            db.add_all([
+                Task(student_id=102, assigned_by=101, title=f"t-{status}", status=status)
+                for status in ("completed", "overdue", "assigned")
+            ])
+            db.commit()
+        client.post("/login", data={"role": "student", "email": "dash-student@example.com", "password": PASSWORD})
+
+        page = client.get("/student_dash").text
+
+    assert "1 of 3 tasks completed" in page
+    assert "1 overdue" in page
@@ -0,0 +1,39 @@
+import hashlib
+from fastapi.testclient import TestClient
+from app.database.connection import home
+from app.database.models import Internship, InternshipSupervision, User
+from app.services import events
+from main import app
+
+PASSWORD = "secret123"
+
+
+def test_assigning_a_task_is_pushed_to_the_student(monkeypatch):
+    published = []
+    monkeypatch.setattr(events.hub, "publish", lambda channel, payload: published.append((channel, payload)))
+    digest = hashlib.sha256(PASSWORD.encode("utf-8")).hexdigest()
+    with TestClient(app) as client:
+        with home.SessionLocal() as db:
+            db.add_all([
+                User(id=201, name="Mentor", email="ev-mentor@example.com", password_hash=digest, role="mentor"),
+                User(id=202, name="Student", email="ev-student@example.com", password_hash=digest, role="student"),
+                Internship(id=201, title="t", company="c"),
+            ])
+            db.flush()
+            db.add(InternshipSupervision(id=201, mentor_id=201, internship_id=201, student_id=202))
+            db.commit()
+            channel = events.user_channel(202)
+        client.post("/login", data={"role": "mentor", "email": "ev-mentor@example.com", "password": PASSWORD})
+
+        r = client.post("/mentor/task_create", data={
+            "student_id": 202, "internship_sv_id": 201, "title": "Write report", "desc": "two pages",
+            "deadline": "2030-01-31",
+        }, follow_redirects=False)
+
+    assert r.status_code == 303
+    created = [p for c, p in published if c == channel and p["type"] == "task"]
+    assert len(created) == 1
+    assert created[0]["action"] == "created"
+    assert created[0]["id"]
+    assert created[0]["title"] == "Write report"
+    assert created[0]["due_date"] == "2030-01-31"
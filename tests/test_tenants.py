@@ -0,0 +1,51 @@
+import threading
+import pytest
+from app.database import tenants
+
+
+def _scope(host: str) -> dict:
+    return {"type": "http", "headers": [(b"host", host.encode("latin-1"))]}
+
+
+@pytest.mark.parametrize("host, tenant", [
+    ("uni-a.ims.example.com", "uni-a"),
+    ("uni-a.ims.example.com:8443", "uni-a"),
+    ("ims.example.com", None),
+    ("www.ims.example.com", None),
+    ("www.example.com", None),
+    ("10.0.0.5", None),
+    ("localhost:8000", None),
+])
+def test_host_mode_only_reads_tenants_under_the_domain(monkeypatch, host, tenant):
+    monkeypatch.setattr(tenants, "TENANT_MODE", "host")
+    monkeypatch.setattr(tenants, "TENANT_DOMAIN", "ims.example.com")
+    assert tenants.tenant_from_scope(_scope(host)) == tenant
+
+
+def test_opening_one_tenant_does_not_block_another(monkeypatch):
+    monkeypatch.setattr(tenants, "TENANTS", {"slow", "fast"})
+    migrating, release = threading.Event(), threading.Event()
+    migrate = tenants.migrate
+
+    def slow_migrate(engine):
+        if engine.url.database.endswith("slow.db"):
+            migrating.set()
+            assert release.wait(10)
+        migrate(engine)
+
+    monkeypatch.setattr(tenants, "migrate", slow_migrate)
+    registry = tenants.TenantRegistry()
+    opened = []
+    slow = threading.Thread(target=lambda: opened.append(registry.get("slow")))
+    slow.start()
+    try:
+        assert migrating.wait(5)
+        # "slow" is still migrating; "fast" opens without waiting for it
+        assert registry.get("fast").name == "fast"
+    finally:
+        release.set()
+        slow.join(10)
+    assert opened[0].name == "slow"
+    assert registry.get("slow") is opened[0]
+    for name in registry.open_names():
+        registry.cached(name).dispose()